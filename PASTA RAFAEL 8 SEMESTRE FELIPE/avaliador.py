@@ -0,0 +1,439 @@
+import contextlib
+import ctypes
+import importlib
+import importlib.util
+import math
+import os
+import threading
+import time
+from executor_async import ExecutorAssincrono, opcoes_execucao
+from servidor_modelo import PoolServidores
+from lote_modelo import opcoes_lote, rodar_lote
+from trace_avaliacoes import EmuladorTrace
+from metricas import MetricasAvaliacao
+from espaco_busca import EspacoBusca
+from restricoes import abrir_restricoes
+from vagas_compartilhadas import cliente_vagas
+
+# ==============================================================================
+# MOTOR ÚNICO DE AVALIAÇÃO (usado por main, swarm, pattern e simplex)
+# O backend vem do JSON ("backend"); o padrão é "argv":
+#   - argv       : um .exe por avaliação, parâmetros na linha de comando (executor_async.py:
+#                  timeout, limites de memória/CPU e várias execuções num event loop só)
+#   - servidor   : .exe aberto uma vez por worker, uma linha no stdin por avaliação
+#   - python     : função Python chamada no próprio processo
+#   - biblioteca : .so/.dll carregada via ctypes, função C double f(const double*, int)
+#   - replay     : responde a partir de um trace gravado com --trace (sem o .exe)
+# O cache de avaliações, o trace e o modo lote ficam aqui, valendo para todos os backends.
+# Lançado pelo servico.py, cada avaliação segura uma vaga do pool compartilhado
+# (no argv e no lote, quem pede a vaga é o executor assíncrono, por .exe).
+# ==============================================================================
+BACKENDS = ('argv', 'servidor', 'python', 'biblioteca', 'replay')
+
+def ler_valor_saida(output):
+    """Lê 'Valor de saída: x' (ou um número puro) do texto impresso pelo modelo"""
+    output = output.strip()
+    for line in output.splitlines():
+        if 'Valor de saída:' in line:
+            try: return float(line.split(':')[-1].strip())
+            except ValueError: pass
+    if output:
+        try: return float(output)
+        except ValueError: return None
+    return None
+
+def valor_da_execucao(codigo, saida, medicao=None):
+    """Lê o resultado de uma execução do .exe (código != 0, timeout ou saída sem número = None)"""
+    t0 = time.perf_counter()
+    valor = ler_valor_saida(saida) if codigo == 0 and saida is not None else None
+    if medicao is not None: medicao['parse'] = time.perf_counter() - t0
+    return valor
+
+# --- BACKENDS ---
+class BackendArgv:
+    def __init__(self, config):
+        self.executavel = config['executavel']
+        self.arquivo_modelo = self.executavel
+        self.variante = ()
+        self.executor = ExecutorAssincrono(**opcoes_execucao(config))
+
+    def disponivel(self):
+        return os.path.exists(self.executavel)
+
+    def avaliar(self, argumentos, params, lista_de_parametros, medicao=None):
+        codigo, saida = self.executor.rodar([self.executavel, *argumentos], medicao=medicao)
+        return valor_da_execucao(codigo, saida, medicao)
+
+    def avaliar_varios(self, lista_argumentos, limite=None, parar_quando=None, medicoes=None):
+        """Várias execuções concorrentes no event loop; parar_quando(indice, valor) cancela o resto"""
+        parar = None
+        if parar_quando is not None:
+            parar = lambda i, codigo, saida: parar_quando(i, valor_da_execucao(codigo, saida))
+        saidas = self.executor.rodar_varios([[self.executavel, *a] for a in lista_argumentos], limite, parar, medicoes)
+        return [valor_da_execucao(codigo, saida, medicoes[i] if medicoes is not None else None)
+                for i, (codigo, saida) in enumerate(saidas)]
+
+    def interromper(self):
+        self.executor.interromper()
+
+    def fechar(self):
+        self.executor.fechar()
+
+class BackendServidor(BackendArgv):
+    avaliar_varios = None  # Cada servidor já atende uma avaliação por vez; o pool faz a concorrência
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.variante = tuple(config.get('argumentos_servidor', []))  # Outros argumentos fixos = outro modelo
+        self.pool = PoolServidores(self.executavel, config.get('argumentos_servidor', []), self.executor.pastas,
+                                  self.executor.timeout)
+
+    def avaliar(self, argumentos, params, lista_de_parametros, medicao=None):
+        return self.pool.avaliar(argumentos)
+
+    def interromper(self):
+        self.pool.interromper()
+
+    def fechar(self):
+        self.pool.fechar()
+        self.executor.fechar()
+
+class BackendPython:
+    """
+    "python": {"modulo": "modelo.py", "funcao": "avaliar"}
+    A função recebe o dict de parâmetros e devolve o valor (None/exceção = falha).
+    """
+    def __init__(self, config):
+        opcoes = config['python']
+        modulo = opcoes['modulo']
+        if modulo.endswith('.py'):
+            self.arquivo_modelo = os.path.abspath(modulo)
+            spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(modulo))[0], modulo)
+            mod = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(mod)
+        else:
+            mod = importlib.import_module(modulo)
+            self.arquivo_modelo = getattr(mod, '__file__', None) or modulo
+        self.variante = (opcoes.get('funcao', 'avaliar'),)  # Duas funções do mesmo arquivo não dividem o cache
+        self.funcao = getattr(mod, self.variante[0])
+
+    def disponivel(self):
+        return True
+
+    def avaliar(self, argumentos, params, lista_de_parametros, medicao=None):
+        try:
+            valor = self.funcao(dict(params))
+            return None if valor is None else float(valor)
+        except Exception:
+            return None
+
+    def interromper(self): pass  # Sem processo para matar: a chamada em andamento termina sozinha
+    def fechar(self): pass
+
+class BackendBiblioteca:
+    """
+    "biblioteca": {"arquivo": "libmodelo.so", "funcao": "avaliar", "reentrante": false}
+    Assinatura C: double avaliar(const double *x, int n). Categóricos chegam como o
+    índice em "limites". NaN = falha. Sem "reentrante", as chamadas são serializadas.
+    """
+    def __init__(self, config):
+        opcoes = config['biblioteca']
+        self.arquivo_modelo = os.path.abspath(opcoes['arquivo'])
+        self.lib = ctypes.CDLL(self.arquivo_modelo)
+        self.variante = (opcoes.get('funcao', 'avaliar'),)
+        self.funcao = getattr(self.lib, self.variante[0])
+        self.funcao.restype = ctypes.c_double
+        self.funcao.argtypes = [ctypes.POINTER(ctypes.c_double), ctypes.c_int]
+        self._lock = None if opcoes.get('reentrante', False) else threading.Lock()
+
+    def disponivel(self):
+        return True
+
+    def avaliar(self, argumentos, params, lista_de_parametros, medicao=None):
+        try:
+            vetor = []
+            for p in lista_de_parametros:
+                valor = params[p['nome']]
+                vetor.append(float(p['limites'].index(valor)) if p['tipo'] == 'categorico' else float(valor))
+            buffer = (ctypes.c_double * len(vetor))(*vetor)
+            if self._lock is None:
+                valor = self.funcao(buffer, len(vetor))
+            else:
+                with self._lock: valor = self.funcao(buffer, len(vetor))
+            return None if math.isnan(valor) else valor
+        except Exception:
+            return None
+
+    def interromper(self): pass
+    def fechar(self): pass
+
+class BackendReplay:
+    """
+    "replay": {"trace": "trace.jsonl", "modo": "idw", "vizinhos": 4, "latencia": 0}
+    Pontos do trace voltam exatamente; pontos novos vêm dos vizinhos (trace_avaliacoes.py).
+    """
+    def __init__(self, config):
+        opcoes = config['replay']
+        self.arquivo_modelo = os.path.abspath(opcoes['trace'])
+        self.latencia = float(opcoes.get('latencia', 0))
+        self.variante = (opcoes.get('modo', 'idw'), opcoes.get('vizinhos', 4))  # A previsão dos pontos novos muda com eles
+        self.emulador = EmuladorTrace(self.arquivo_modelo, config['parametros'], *self.variante)
+
+    def disponivel(self):
+        return True
+
+    def avaliar(self, argumentos, params, lista_de_parametros, medicao=None):
+        if self.latencia > 0: time.sleep(self.latencia)
+        return self.emulador.avaliar(params)
+
+    def interromper(self): pass
+    def fechar(self): pass
+
+_CLASSES_BACKEND = {
+    'argv': BackendArgv,
+    'servidor': BackendServidor,
+    'python': BackendPython,
+    'biblioteca': BackendBiblioteca,
+    'replay': BackendReplay,
+}
+
+def nome_backend(config):
+    # "modo_avaliacao" é o nome antigo da chave, mantido por compatibilidade
+    return config.get('backend', config.get('modo_avaliacao', 'argv'))
+
+# --- AVALIADOR ---
+class Avaliador:
+    def __init__(self, config, cache=None, trace=None, metricas=None):
+        nome = nome_backend(config)
+        if nome not in _CLASSES_BACKEND:
+            raise ValueError(f"Backend desconhecido: {nome} (use {', '.join(BACKENDS)})")
+        self.config = config
+        self.lista_de_parametros = config['parametros']
+        self.espaco = EspacoBusca(self.lista_de_parametros)  # Argumentos do .exe montados sem reler o JSON
+        self.cache = cache
+        self.trace = trace
+        self.metricas = metricas if metricas is not None else MetricasAvaliacao()
+        self.triagem = None  # Substituto (triagem.py, ligado por abrir_triagem) aprende com cada resultado
+        self.restricoes = abrir_restricoes(config, self.espaco)
+        self.backend = _CLASSES_BACKEND[nome](config)
+        if trace is not None: trace.registrar_config(config)
+        self.nome_backend = nome
+        self.variante_cache = (nome, *self.backend.variante)
+        # Lote só faz sentido quando cada avaliação paga um processo novo
+        self.opcoes_lote = opcoes_lote(config) if nome == 'argv' else None
+        self.vagas = cliente_vagas() if nome != 'argv' else None
+        self.avaliacoes = 0  # Avaliações pedidas (inclui acertos de cache)
+        self.execucoes = 0   # Chamadas reais ao modelo
+        self.rejeitadas = 0  # Candidatos inviáveis pelas restrições (nunca chegam ao modelo)
+        self._maior = self._menor = None  # (params, valor) extremos já vistos (recorde no Ctrl+C)
+        self._lock_contagem = threading.Lock()
+
+    def _contar(self, avaliacoes, execucoes):
+        with self._lock_contagem:
+            self.avaliacoes += avaliacoes
+            self.execucoes += execucoes
+
+    def _registrar(self, params, valor):
+        """Todo resultado (modelo ou cache): alimenta a triagem e guarda o maior e o menor já vistos"""
+        if self.triagem is not None: self.triagem.registrar(params, valor)
+        if valor is None: return
+        with self._lock_contagem:
+            if self._maior is None or valor > self._maior[1]: self._maior = (params, valor)
+            if self._menor is None or valor < self._menor[1]: self._menor = (params, valor)
+
+    def melhor(self, objetivo):
+        """(params, valor) do melhor resultado desta execução, mesmo que a estratégia não o tenha visto ainda"""
+        return (self._maior if objetivo == 'maximizar' else self._menor) or (None, None)
+
+    def viaveis(self, lista_params):
+        """
+        Um bool por combinação, checadas numa conta só (sem "restricoes" no JSON, todas viáveis).
+        As inviáveis entram em self.rejeitadas: quem chama não deve mandá-las ao modelo.
+        """
+        resultado = [True] * len(lista_params)
+        if self.restricoes is None: return resultado
+        completas = [i for i, params in enumerate(lista_params) if self.montar_argumentos(params) is not None]
+        for i, ok in zip(completas, self.restricoes.viaveis([lista_params[i] for i in completas]).tolist()):
+            resultado[i] = ok
+        with self._lock_contagem: self.rejeitadas += resultado.count(False)
+        return resultado
+
+    def projetar(self, vetores):
+        """Limites, malha e restrições lineares (vetores do espaco_busca; simplex e SPSA)"""
+        if self.restricoes is None: return self.espaco.projetar(vetores)
+        return self.restricoes.projetar(vetores)
+
+    def ajustar(self, lista_params):
+        """
+        Candidatos inviáveis trocados pela projeção nas restrições lineares (a busca desliza
+        ao longo da borda em vez de parar nela); None quando nem projetado fica viável.
+        """
+        if self.restricoes is None: return list(lista_params)
+        resultado = list(lista_params)
+        fora = [i for i, ok in enumerate(self.restricoes.viaveis(resultado).tolist()) if not ok]
+        if not fora: return resultado
+        projetados = self.restricoes.projetar(self.espaco.codificar_varios([resultado[i] for i in fora]))
+        for i, vetor, ok in zip(fora, projetados, self.restricoes.viaveis_vetores(projetados).tolist()):
+            resultado[i] = self.espaco.decodificar(vetor) if ok else None
+        with self._lock_contagem: self.rejeitadas += resultado.count(None)
+        return resultado
+
+    def vizinhos(self, params, passos=None):
+        """espaco.vizinhos já ajustados às restrições (sem repetidos nem o próprio ponto)"""
+        vizinhos = self.espaco.vizinhos(params, passos)
+        if self.restricoes is None: return vizinhos
+        vistos, resultado = {self.espaco.chave(params)}, []
+        for (nome, _, _), ajustado in zip(vizinhos, self.ajustar([v[2] for v in vizinhos])):
+            if ajustado is None or self.espaco.chave(ajustado) in vistos: continue
+            vistos.add(self.espaco.chave(ajustado))
+            resultado.append((nome, ajustado[nome], ajustado))
+        return resultado
+
+    @property
+    def suporta_lote(self):
+        return self.opcoes_lote is not None
+
+    @property
+    def suporta_concorrente(self):
+        """Backend que roda várias avaliações num event loop só (argv sem lote)"""
+        return getattr(self.backend, 'avaliar_varios', None) is not None and not self.suporta_lote
+
+    @property
+    def tamanho_lote(self):
+        return self.opcoes_lote['tamanho_maximo'] if self.opcoes_lote else 0
+
+    def montar_argumentos(self, params_dict):
+        return self.espaco.argumentos(params_dict)
+
+    def avaliar(self, params_dict):
+        """Avalia uma combinação: cache primeiro, depois o backend. None = falha"""
+        self._contar(1, 0)
+        argumentos = self.montar_argumentos(params_dict)
+        if argumentos is None or not self.backend.disponivel(): return None
+        if not self.viaveis([params_dict])[0]: return None
+
+        if self.cache is not None:
+            em_cache = self.cache.buscar(self.backend.arquivo_modelo, argumentos, self.variante_cache)
+            if em_cache is not None:
+                self.metricas.registrar_cache()
+                self._registrar(params_dict, em_cache)
+                return em_cache
+
+        self._contar(0, 1)
+        inicio = time.time()
+        marcador = self.metricas.iniciar()
+        medicao = {}
+        with self.vagas.vaga() if self.vagas is not None else contextlib.nullcontext():
+            valor = self.backend.avaliar(argumentos, params_dict, self.lista_de_parametros, medicao)
+        self.metricas.finalizar(marcador, valor is not None, medicao)
+        if self.trace is not None: self.trace.registrar(params_dict, valor, time.time() - inicio)
+        self._registrar(params_dict, valor)
+        if self.cache is not None:
+            self.cache.gravar(self.backend.arquivo_modelo, argumentos, valor, self.variante_cache)
+        return valor
+
+    def avaliar_lote(self, lista_params):
+        """Avalia várias combinações; com "lote" no JSON, as que faltam no cache vão numa execução só"""
+        if not self.suporta_lote:
+            return [self.avaliar(params) for params in lista_params]
+
+        self._contar(len(lista_params), 0)
+        resultados = [None] * len(lista_params)
+        if not self.backend.disponivel(): return resultados
+
+        viaveis = self.viaveis(lista_params)
+        pendentes = []
+        for i, params in enumerate(lista_params):
+            argumentos = self.montar_argumentos(params)
+            if argumentos is None: continue
+            if not viaveis[i]: continue
+            if self.cache is not None:
+                em_cache = self.cache.buscar(self.backend.arquivo_modelo, argumentos, self.variante_cache)
+                if em_cache is not None:
+                    resultados[i] = em_cache
+                    self.metricas.registrar_cache()
+                    self._registrar(params, em_cache)
+                    continue
+            pendentes.append((i, argumentos))
+
+        tamanho = self.tamanho_lote
+        for inicio in range(0, len(pendentes), tamanho):
+            bloco = pendentes[inicio:inicio + tamanho]
+            self._contar(0, 1)
+            t0 = time.time()
+            marcador = self.metricas.iniciar()
+            saidas = rodar_lote(self.backend.executavel, [argumentos for _, argumentos in bloco], self.opcoes_lote,
+                                self.backend.executor)
+            self.metricas.finalizar_lote(marcador, [v is not None for v in saidas])
+            duracao = (time.time() - t0) / len(bloco)  # Tempo do lote dividido entre as linhas
+            for (i, argumentos), valor in zip(bloco, saidas):
+                resultados[i] = valor
+                if self.trace is not None: self.trace.registrar(lista_params[i], valor, duracao)
+                self._registrar(lista_params[i], valor)
+                if self.cache is not None: self.cache.gravar(self.backend.arquivo_modelo, argumentos, valor, self.variante_cache)
+        return resultados
+
+    def avaliar_concorrente(self, lista_params, limite=None, parar_quando=None):
+        """
+        Avalia várias combinações ao mesmo tempo no executor assíncrono (sem thread por execução).
+        parar_quando(indice, valor) -> True cancela as que ainda estão rodando (o resto fica None).
+        Só contam como avaliadas as que terminaram (ou vieram do cache).
+        """
+        resultados = [None] * len(lista_params)
+        if not self.backend.disponivel():
+            self._contar(len(lista_params), 0)
+            return resultados
+
+        viaveis = self.viaveis(lista_params)
+        pendentes = []
+        for i, params in enumerate(lista_params):
+            argumentos = self.montar_argumentos(params)
+            if argumentos is None:
+                self._contar(1, 0)
+                continue
+            if not viaveis[i]:
+                self._contar(1, 0)
+                continue
+            if self.cache is not None:
+                em_cache = self.cache.buscar(self.backend.arquivo_modelo, argumentos, self.variante_cache)
+                if em_cache is not None:
+                    self._contar(1, 0)
+                    resultados[i] = em_cache
+                    self.metricas.registrar_cache()
+                    self._registrar(params, em_cache)
+                    if parar_quando is not None and parar_quando(i, em_cache): return resultados
+                    continue
+            pendentes.append((i, argumentos))
+        if not pendentes: return resultados
+
+        medicoes = [{} for _ in pendentes]
+        parar = (lambda k, valor: parar_quando(pendentes[k][0], valor)) if parar_quando is not None else None
+        marcador = self.metricas.iniciar()
+        valores = self.backend.avaliar_varios([a for _, a in pendentes], limite, parar, medicoes)
+        for (i, argumentos), valor, medicao in zip(pendentes, valores, medicoes):
+            # Cancelada pelo oportunista (antes ou durante a execução): não é resultado do modelo
+            if 'spawn' not in medicao or medicao.pop('cancelada', False): continue
+            self._contar(1, 1)
+            resultados[i] = valor
+            latencia = sum(medicao.get(c, 0.0) for c in ('spawn', 'modelo', 'parse'))
+            self.metricas.finalizar(marcador, valor is not None, medicao, latencia=latencia)
+            if self.trace is not None: self.trace.registrar(lista_params[i], valor, latencia)
+            self._registrar(lista_params[i], valor)
+            if self.cache is not None: self.cache.gravar(self.backend.arquivo_modelo, argumentos, valor, self.variante_cache)
+        return resultados
+
+    def texto_desempenho(self):
+        """Bloco "DESEMPENHO DAS AVALIAÇÕES" dos relatórios (métricas + triagem, se ligada)"""
+        texto = self.metricas.texto_relatorio()
+        if self.triagem is not None: texto += '\n\n' + self.triagem.texto_relatorio()
+        if self.restricoes is not None: texto += '\n\n' + self.restricoes.texto_relatorio(self.rejeitadas)
+        return texto
+
+    def interromper(self):
+        """Ctrl+C no meio de avaliações concorrentes: mata o que está rodando sem esperar"""
+        self.backend.interromper()
+
+    def fechar(self):
+        self.backend.fechar()
+        if self.trace is not None: self.trace.fechar()
+        self.metricas.fechar()
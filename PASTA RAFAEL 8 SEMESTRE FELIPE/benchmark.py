@@ -0,0 +1,173 @@
+import json
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from modelos_sinteticos import MODELOS, gerar_config
+
+# ==============================================================================
+# BENCHMARK DAS ESTRATÉGIAS (main, swarm, pattern, simplex, spsa) COM MODELOS SINTÉTICOS
+# Cada combinação estratégia x modelo roda o script de verdade, num subprocesso
+# e numa pasta temporária, com orçamento fixo. As métricas saem do trace que o
+# modelo sintético grava a cada avaliação:
+#   avaliacoes, avaliacoes_por_segundo, avaliacoes_ate_alvo, tempo_total,
+#   tempo_no_modelo, overhead (tempo fora do modelo) e melhor_valor.
+# Resultado: uma linha JSON por execução (--saida) + resumo na tela.
+# ==============================================================================
+PASTA = os.path.dirname(os.path.abspath(__file__))
+ESTRATEGIAS = ('hibrido', 'swarm', 'pattern', 'simplex', 'spsa')
+
+def montar_comando(estrategia, arquivo_config, objetivo, orcamento, tempo_max, workers, extras):
+    flag = '--max' if objetivo == 'maximizar' else '--min'
+    base = ['-c', arquivo_config, flag, '--sem-cache']
+    limites = ['--max-avaliacoes', str(orcamento), '--tempo-max', str(tempo_max)]
+    if estrategia == 'hibrido':
+        comando = ['main.py', *base, '-t', str(max(1, orcamento // 5)), '--workers', str(workers), *limites]
+    elif estrategia == 'swarm':
+        comando = ['optimize_swarm_infinito.py', *base, '--workers', str(workers), *limites]
+    elif estrategia == 'pattern':
+        comando = ['optimize_pattern_infinito.py', *base, '--workers', str(workers), *limites]
+    elif estrategia == 'spsa':
+        comando = ['optimize_spsa.py', *base, '--workers', str(workers), *limites]
+    else:
+        # Motor nativo do Simplex: mesmos critérios de parada; --maxiter só não pode cortar antes do orçamento
+        comando = ['optimize_simplex.py', *base, '--motor', 'nativo', '--workers', str(workers), '--maxiter', str(orcamento),
+                   *limites]
+    return [sys.executable, os.path.join(PASTA, comando[0]), *comando[1:], *extras.get(estrategia, [])]
+
+def rodar_processo(comando, pasta, ambiente, tempo_max):
+    """Roda até terminar; passou do tempo, manda Ctrl+C (o script gera o relatório) e depois mata"""
+    kwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == 'nt' else {}
+    proc = subprocess.Popen(comando, cwd=pasta, env=ambiente, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, **kwargs)
+    try:
+        _, erro = proc.communicate(timeout=tempo_max + 5)
+    except subprocess.TimeoutExpired:
+        proc.send_signal(signal.CTRL_BREAK_EVENT if os.name == 'nt' else signal.SIGINT)
+        try: _, erro = proc.communicate(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill(); _, erro = proc.communicate()
+    return proc.returncode, erro
+
+def ler_trace(arquivo):
+    if not os.path.exists(arquivo): return []
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+def calcular_metricas(trace, modelo, inicio, fim, workers):
+    maximizar = modelo['objetivo'] == 'maximizar'
+    melhor, ate_alvo = None, None
+    for i, item in enumerate(sorted(trace, key=lambda x: x['t1']), start=1):
+        v = item['valor']
+        if melhor is None or (v > melhor if maximizar else v < melhor): melhor = v
+        if ate_alvo is None and (melhor >= modelo['alvo'] if maximizar else melhor <= modelo['alvo']): ate_alvo = i
+    tempo_total = fim - inicio
+    tempo_no_modelo = sum(item['t1'] - item['t0'] for item in trace)
+    return {
+        'avaliacoes': len(trace),
+        'avaliacoes_por_segundo': len(trace) / tempo_total if tempo_total > 0 else 0.0,
+        'avaliacoes_ate_alvo': ate_alvo,
+        'tempo_total': tempo_total,
+        'tempo_no_modelo': tempo_no_modelo,
+        # Com vários workers as avaliações se sobrepõem: divide pelo paralelismo
+        'overhead': max(0.0, tempo_total - tempo_no_modelo / max(1, workers)),
+        'melhor_valor': melhor,
+        'distancia_otimo': abs(melhor - modelo['otimo']) if melhor is not None else None,
+    }
+
+def criar_lancador(pasta, nome):
+    """Executável externo para o backend argv (custo real de abrir um processo por avaliação)"""
+    script = os.path.join(PASTA, 'modelos_sinteticos.py')
+    if os.name == 'nt':
+        caminho = os.path.join(pasta, f'{nome}.bat')
+        with open(caminho, 'w', encoding='utf-8') as f: f.write(f'@"{sys.executable}" "{script}" {nome} %*\n')
+    else:
+        caminho = os.path.join(pasta, nome)
+        with open(caminho, 'w', encoding='utf-8') as f: f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" {nome} "$@"\n')
+        os.chmod(caminho, 0o755)
+    # Nome simples (a pasta entra no PATH): os relatórios usam o nome do executável no nome do arquivo
+    return os.path.basename(caminho)
+
+def rodar_benchmark(estrategias, modelos, orcamento, tempo_max, latencia, repeticoes, workers, backend, extras, saida):
+    resultados = []
+    for nome_modelo in modelos:
+        modelo = MODELOS[nome_modelo]
+        for estrategia in estrategias:
+            for rep in range(1, repeticoes + 1):
+                with tempfile.TemporaryDirectory(prefix='bench_') as pasta:
+                    executavel = criar_lancador(pasta, nome_modelo) if backend == 'argv' else None
+                    arquivo_config = os.path.join(pasta, 'config.json')
+                    with open(arquivo_config, 'w', encoding='utf-8') as f:
+                        json.dump(gerar_config(nome_modelo, executavel), f, ensure_ascii=False)
+                    arquivo_trace = os.path.join(pasta, 'trace.jsonl')
+                    ambiente = dict(os.environ, BENCH_LATENCIA=str(latencia), BENCH_TRACE=arquivo_trace, PYTHONIOENCODING='utf-8',
+                                    PATH=pasta + os.pathsep + os.environ.get('PATH', ''))
+
+                    comando = montar_comando(estrategia, arquivo_config, modelo['objetivo'], orcamento, tempo_max, workers, extras)
+                    print(f"[{nome_modelo} | {estrategia} | rep {rep}] rodando...", end=' ', flush=True)
+                    inicio = time.time()
+                    codigo, erro = rodar_processo(comando, pasta, ambiente, tempo_max)
+                    fim = time.time()
+
+                    linha = {
+                        'data': datetime.now().isoformat(timespec='seconds'),
+                        'estrategia': estrategia, 'modelo': nome_modelo, 'backend': backend,
+                        'repeticao': rep, 'orcamento': orcamento, 'tempo_max': tempo_max,
+                        'latencia': latencia, 'workers': workers, 'codigo_saida': codigo,
+                        **calcular_metricas(ler_trace(arquivo_trace), modelo, inicio, fim, workers),
+                    }
+                    if codigo not in (0, None) and erro: linha['erro'] = erro.strip().splitlines()[-1][:300]
+                resultados.append(linha)
+                with open(saida, 'a', encoding='utf-8') as f: f.write(json.dumps(linha, ensure_ascii=False) + '\n')
+                print(f"{linha['avaliacoes']} aval. em {linha['tempo_total']:.1f}s -> {linha['melhor_valor']}")
+    return resultados
+
+def imprimir_resumo(resultados):
+    print("\n" + "=" * 104)
+    print(f"{'MODELO':<14}{'ESTRATÉGIA':<10}{'AVAL.':>8}{'AVAL/S':>10}{'ATÉ ALVO':>10}{'TEMPO(s)':>10}"
+          f"{'OVERHEAD(s)':>13}{'MELHOR':>14}{'DIST. ÓTIMO':>14}")
+    print("-" * 104)
+    for r in resultados:
+        ate_alvo = '-' if r['avaliacoes_ate_alvo'] is None else str(r['avaliacoes_ate_alvo'])
+        melhor = '-' if r['melhor_valor'] is None else f"{r['melhor_valor']:.4f}"
+        dist = '-' if r['distancia_otimo'] is None else f"{r['distancia_otimo']:.4f}"
+        print(f"{r['modelo']:<14}{r['estrategia']:<10}{r['avaliacoes']:>8}{r['avaliacoes_por_segundo']:>10.1f}{ate_alvo:>10}"
+              f"{r['tempo_total']:>10.2f}{r['overhead']:>13.2f}{melhor:>14}{dist:>14}")
+    print("=" * 104)
+
+# ==============================================================================
+# EXECUÇÃO
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das estratégias com modelos sintéticos")
+    parser.add_argument('--estrategias', nargs='+', choices=ESTRATEGIAS, default=list(ESTRATEGIAS))
+    parser.add_argument('--modelos', nargs='+', choices=list(MODELOS), default=list(MODELOS))
+    parser.add_argument('--orcamento', type=int, default=500, help="Máximo de avaliações por execução")
+    parser.add_argument('--tempo-max', type=float, default=120, help="Máximo de segundos por execução")
+    parser.add_argument('--latencia', type=float, default=0.0, help="Segundos por avaliação (imita o .exe)")
+    parser.add_argument('--repeticoes', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--backend', choices=('python', 'argv'), default='python',
+                        help="python: modelo no processo | argv: um processo por avaliação, como o .exe")
+    parser.add_argument('--extra', action='append', default=[], metavar='ESTRATEGIA=ARGS',
+                        help="Argumentos extras para uma estratégia, ex.: --extra 'pattern=--motor hooke-jeeves'")
+    parser.add_argument('--saida', default=f"benchmark_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.jsonl")
+    args = parser.parse_args()
+
+    extras = {}
+    for item in args.extra:
+        estrategia, _, resto = item.partition('=')
+        if estrategia not in ESTRATEGIAS: parser.error(f"--extra: estratégia desconhecida '{estrategia}'")
+        extras[estrategia] = extras.get(estrategia, []) + resto.split()
+
+    try:
+        resultados = rodar_benchmark(args.estrategias, args.modelos, args.orcamento, args.tempo_max, args.latencia,
+                                     args.repeticoes, args.workers, args.backend, extras, args.saida)
+    except KeyboardInterrupt:
+        print("\nBenchmark interrompido."); sys.exit(1)
+    imprimir_resumo(resultados)
+    print(f"Resultados em: {args.saida}")
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ==============================================================================
+# CACHE PERSISTENTE DE AVALIAÇÕES (compartilhado por todas as estratégias)
+# A chave é o conteúdo do executável (caminho + hash), a variante do backend
+# (tipo, função chamada, argumentos fixos do servidor) e a tupla ordenada de
+# argumentos enviada a ele. Assim, nenhuma combinação já avaliada roda de novo,
+# nem na mesma execução nem em execuções futuras (main, swarm, pattern, simplex).
+# Com --monitorar (modelos com ruído) o cache fica desligado.
+# ==============================================================================
+ARQUIVO_CACHE_PADRAO = 'cache_avaliacoes.sqlite'
+
+_HASHES_EXECUTAVEIS = {}
+
+def identificar_executavel(executavel):
+    """Retorna 'caminho_absoluto|sha256' do executável (memorizado por mtime/tamanho)"""
+    caminho = os.path.abspath(executavel)
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+
+    marca = (caminho, info.st_mtime_ns, info.st_size)
+    if marca not in _HASHES_EXECUTAVEIS:
+        h = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+        _HASHES_EXECUTAVEIS[marca] = f"{caminho}|{h.hexdigest()}"
+    return _HASHES_EXECUTAVEIS[marca]
+
+class CacheAvaliacoes:
+    """Cache em disco (SQLite) de resultados do modelo black-box"""
+
+    def __init__(self, arquivo=ARQUIVO_CACHE_PADRAO):
+        self.arquivo = arquivo
+        self.acertos = 0
+        self.faltas = 0
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(arquivo, timeout=30, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS avaliacoes ("
+            " chave TEXT PRIMARY KEY,"
+            " executavel TEXT NOT NULL,"
+            " argumentos TEXT NOT NULL,"
+            " resultado REAL NOT NULL,"
+            " criado_em REAL NOT NULL)"
+        )
+        self._conexao.commit()
+
+    @staticmethod
+    def _chave(id_executavel, argumentos, variante):
+        texto = json.dumps([id_executavel, [str(a) for a in argumentos], [str(v) for v in variante]], ensure_ascii=False)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def buscar(self, executavel, argumentos, variante=()):
+        """Retorna o resultado salvo ou None se a combinação nunca foi avaliada"""
+        id_exe = identificar_executavel(executavel)
+        if id_exe is None: return None
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT resultado FROM avaliacoes WHERE chave = ?",
+                (self._chave(id_exe, argumentos, variante),)
+            ).fetchone()
+            if linha is None:
+                self.faltas += 1
+                return None
+            self.acertos += 1
+            return linha[0]
+
+    def gravar(self, executavel, argumentos, resultado, variante=()):
+        """Salva um resultado válido (falhas não são guardadas para permitir nova tentativa)"""
+        if resultado is None: return
+        id_exe = identificar_executavel(executavel)
+        if id_exe is None: return
+        with self._lock:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO avaliacoes VALUES (?, ?, ?, ?, ?)",
+                (self._chave(id_exe, argumentos, variante), id_exe,
+                 json.dumps([str(a) for a in argumentos], ensure_ascii=False),
+                 float(resultado), time.time())
+            )
+            self._conexao.commit()
+
+    def resumo(self):
+        total = self.acertos + self.faltas
+        taxa = (100.0 * self.acertos / total) if total else 0.0
+        return f"{self.acertos} acertos / {total} consultas ({taxa:.1f}%)"
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+def abrir_cache(args):
+    """Cria o cache a partir das flags --cache / --sem-cache (None se desativado)"""
+    if getattr(args, 'sem_cache', False): return None
+    if getattr(args, 'monitorar', False):
+        # Modelo com ruído: repetir o poll nos mesmos vizinhos é o objetivo, e o cache só devolveria o valor antigo
+        print("[CACHE] --monitorar: cache desligado (cada poll roda o modelo de novo).")
+        return None
+    try:
+        return CacheAvaliacoes(getattr(args, 'cache', None) or ARQUIVO_CACHE_PADRAO)
+    except sqlite3.Error as e:
+        print(f"[CACHE] Não foi possível abrir o cache ({e}). Seguindo sem cache.")
+        return None
+
+def adicionar_argumentos_cache(parser):
+    parser.add_argument('--cache', type=str, default=ARQUIVO_CACHE_PADRAO, help="Arquivo SQLite do cache de avaliações")
+    parser.add_argument('--sem-cache', action='store_true', help="Desativa o cache de avaliações")
@@ -0,0 +1,124 @@
+import json
+import os
+import re
+import time
+from datetime import datetime
+import optuna
+from optuna.trial import TrialState
+
+# ==============================================================================
+# CHECKPOINT / RETOMADA DE EXECUÇÕES
+# Cada execução ganha uma pasta execucoes/<run-id>/ com:
+#   - estado.json       : config, objetivo e o estado da estratégia (incumbente,
+#                         passos, iteração, simplex...), gravado de forma atômica
+#   - optuna.journal    : estudo Optuna em disco (Fase 1 do main.py e swarm)
+# Depois de um crash, reboot ou kill, basta rodar de novo com --resume <run-id>.
+# Avaliações já feitas não são repetidas (o estudo e o cache ficam em disco).
+# Dentro dos laços o estado.json é regravado no máximo a cada INTERVALO_GRAVACAO
+# segundos (salvar_periodico); o estado completo é gravado sempre ao sair.
+# ==============================================================================
+DIRETORIO_EXECUCOES = 'execucoes'
+INTERVALO_GRAVACAO = 5.0  # Segundos entre duas gravações do estado.json dentro de um laço
+
+def _gravar_json_atomico(caminho, dados):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+def criar_storage_journal(caminho):
+    """Storage Optuna em arquivo de journal (aceita vários processos no mesmo arquivo)"""
+    try:
+        from optuna.storages.journal import JournalFileBackend
+        backend = JournalFileBackend(caminho)
+    except ImportError: # Optuna < 4
+        backend = optuna.storages.JournalFileStorage(caminho)
+    return optuna.storages.JournalStorage(backend)
+
+class Checkpoint:
+    def __init__(self, run_id, estado, nova=False):
+        self.run_id = run_id
+        self.pasta = os.path.join(DIRETORIO_EXECUCOES, run_id)
+        self.estado = estado
+        self._gravado_em = 0.0
+        if not nova:
+            os.makedirs(self.pasta, exist_ok=True)
+            return
+        try: os.makedirs(self.pasta)  # Exclusivo: duas execuções nunca dividem a mesma pasta (e o journal)
+        except FileExistsError:
+            raise ValueError(f"A execução '{run_id}' já existe em {DIRETORIO_EXECUCOES}/ "
+                             f"(use --resume {run_id} ou outro --run-id)") from None
+
+    @property
+    def retomado(self):
+        return self.estado.get('retomadas', 0) > 0
+
+    def caminho(self, nome):
+        return os.path.join(self.pasta, nome)
+
+    def salvar(self, **campos):
+        """Atualiza o estado e grava estado.json (nunca fica meio escrito)"""
+        self.estado.update(campos)
+        self.estado['atualizado_em'] = datetime.now().isoformat(timespec='seconds')
+        _gravar_json_atomico(self.caminho('estado.json'), self.estado)
+        self._gravado_em = time.monotonic()
+
+    def salvar_periodico(self, **campos):
+        """Para chamar a cada iteração: atualiza o estado em memória e só grava se já passou INTERVALO_GRAVACAO"""
+        self.estado.update(campos)
+        if time.monotonic() - self._gravado_em >= INTERVALO_GRAVACAO: self.salvar()
+
+    def storage_optuna(self):
+        return criar_storage_journal(self.caminho('optuna.journal'))
+
+    def criar_ou_carregar_estudo(self, direction, sampler=None):
+        """Cria o estudo no journal; na retomada, carrega e fecha como FAIL os trials que morreram RUNNING"""
+        study = optuna.create_study(
+            study_name=self.run_id, storage=self.storage_optuna(),
+            direction=direction, sampler=sampler, load_if_exists=self.retomado
+        )
+        for trial in study.get_trials(deepcopy=False, states=(TrialState.RUNNING,)):
+            try: study.tell(trial.number, state=TrialState.FAIL)
+            except Exception: pass
+        return study
+
+def gerar_run_id(estrategia, config):
+    """estrategia_modelo_data_pid (o pid separa execuções iniciadas no mesmo segundo)"""
+    modelo = re.sub(r'[^A-Za-z0-9_-]+', '_', os.path.basename(config.get('executavel', 'modelo')).replace('.exe', ''))
+    return f"{estrategia}_{modelo}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{os.getpid()}"
+
+def abrir_checkpoint(args, estrategia, config=None, objetivo=None):
+    """
+    Com --resume, carrega a execução anterior (config e objetivo vêm do estado salvo).
+    Sem --resume, cria uma execução nova (id de --run-id ou gerado automaticamente);
+    ValueError se a pasta já existe, em vez de misturar duas execuções.
+    """
+    if getattr(args, 'resume', None):
+        caminho = os.path.join(DIRETORIO_EXECUCOES, args.resume, 'estado.json')
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f: estado = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Não foi possível retomar '{args.resume}': {e}")
+        if estado.get('estrategia') != estrategia:
+            raise ValueError(f"A execução '{args.resume}' é da estratégia {estado.get('estrategia')}, não {estrategia}")
+        estado['retomadas'] = estado.get('retomadas', 0) + 1
+        checkpoint = Checkpoint(args.resume, estado)
+        checkpoint.salvar()
+        return checkpoint
+
+    run_id = getattr(args, 'run_id', None) or gerar_run_id(estrategia, config)
+    checkpoint = Checkpoint(run_id, {
+        'estrategia': estrategia,
+        'config_file': getattr(args, 'config', None),
+        'config': config,
+        'objetivo': objetivo,
+        'retomadas': 0,
+    }, nova=True)
+    checkpoint.salvar()
+    return checkpoint
+
+def adicionar_argumentos_checkpoint(parser):
+    parser.add_argument('--resume', type=str, default=None, metavar='RUN_ID', help="Retoma uma execução salva em execucoes/")
+    parser.add_argument('--run-id', type=str, default=None, help="Nome da pasta desta execução (padrão: automático)")
@@ -0,0 +1,102 @@
+import threading
+import time
+
+# ==============================================================================
+# CRITÉRIOS DE PARADA
+# Substituem o "Monitorando..." infinito: a busca termina sozinha, libera a
+# máquina e gera o relatório quando qualquer um dos critérios dispara.
+#   --max-avaliacoes N : orçamento de avaliações (inclui acertos de cache)
+#   --tempo-max S      : orçamento de tempo de relógio, em segundos
+#   --alvo V           : para ao atingir (ou passar) o valor V
+#   --paciencia K      : para após K rodadas seguidas sem melhoria
+# A malha mínima (passos já no menor tamanho e nenhum vizinho melhor) é checada
+# pelo próprio Pattern Search; --monitorar mantém o comportamento antigo.
+# O --max-avaliacoes é um teto: o poll e os trials simultâneos/em lote do Optuna
+# só pedem as avaliações que ainda cabem (reservar/devolver). Simplex e SPSA
+# checam entre iterações e podem passar por até uma iteração (n+1 ou 2 pontos).
+# ==============================================================================
+OTIMO_PASSO_FIXO = "ÓTIMO LOCAL (PASSO FIXO)"  # Pattern da Fase 2: nenhum vizinho melhora, mas o passo nunca diminuiu
+
+class CriteriosParada:
+    def __init__(self, objetivo_escolhido, max_avaliacoes=None, tempo_max=None, alvo=None, paciencia=None):
+        self.objetivo = objetivo_escolhido
+        self.max_avaliacoes = max_avaliacoes
+        self.tempo_max = tempo_max
+        self.alvo = alvo
+        self.paciencia = paciencia
+        self.inicio = time.time()
+        self.sem_melhoria = 0
+        self._liberadas = 0  # Avaliações já entregues aos polls (as em voo inclusive)
+        self._trava = threading.Lock()
+
+    def registrar_rodada(self, houve_melhoria):
+        self.sem_melhoria = 0 if houve_melhoria else self.sem_melhoria + 1
+
+    def alvo_atingido(self, melhor_resultado):
+        if self.alvo is None or melhor_resultado is None: return False
+        if self.objetivo == 'maximizar': return melhor_resultado >= self.alvo
+        return melhor_resultado <= self.alvo
+
+    def verificar(self, melhor_resultado, avaliacoes):
+        """Retorna o motivo da parada (texto) ou None para continuar"""
+        if self.alvo_atingido(melhor_resultado):
+            return f"ALVO ATINGIDO ({self.alvo})"
+        if self.max_avaliacoes is not None and avaliacoes >= self.max_avaliacoes:
+            return f"LIMITE DE AVALIAÇÕES ({self.max_avaliacoes})"
+        if self.tempo_max is not None and time.time() - self.inicio >= self.tempo_max:
+            return f"LIMITE DE TEMPO ({self.tempo_max:.0f}s)"
+        if self.paciencia is not None and self.sem_melhoria >= self.paciencia:
+            return f"SEM MELHORIA EM {self.paciencia} RODADAS"
+        return None
+
+    # --- TETO DE AVALIAÇÕES ---
+    def limite_avaliacoes(self):
+        """Teto para o contador do Avaliador (None = sem limite)"""
+        return self.max_avaliacoes
+
+    def restantes(self, avaliacoes):
+        limite = self.limite_avaliacoes()
+        return None if limite is None else max(0, limite - avaliacoes)
+
+    def reservar(self, n, avaliacoes):
+        """
+        Quantos dos n candidatos de um poll ainda cabem no teto. A parte entregue fica
+        reservada até devolver(): buscas simultâneas (multi-start) não gastam a mesma sobra.
+        """
+        limite = self.limite_avaliacoes()
+        if limite is None: return n
+        with self._trava:
+            self._liberadas = max(self._liberadas, avaliacoes)  # Avaliações fora dos polls também contam
+            k = max(0, min(n, limite - self._liberadas))
+            self._liberadas += k
+        return k
+
+    def devolver(self, k):
+        """Reserva que o poll não usou (oportunista que parou antes, candidatos cancelados)"""
+        with self._trava: self._liberadas -= k
+
+class OrcamentoPoll:
+    """O que o PollParalelo enxerga dos critérios: reserva a parte do poll que cabe no teto"""
+    def __init__(self, criterios, avaliador):
+        self.criterios = criterios
+        self.avaliador = avaliador
+
+    def reservar(self, n):
+        return self.criterios.reservar(n, self.avaliador.avaliacoes)
+
+    def devolver(self, k):
+        self.criterios.devolver(k)
+
+def orcamento_do_poll(criterios, avaliador):
+    """OrcamentoPoll para o PollParalelo, ou None quando não há teto de avaliações"""
+    if criterios is None or criterios.limite_avaliacoes() is None: return None
+    return OrcamentoPoll(criterios, avaliador)
+
+def adicionar_argumentos_parada(parser):
+    parser.add_argument('--max-avaliacoes', type=int, default=None, help="Para após N avaliações")
+    parser.add_argument('--tempo-max', type=float, default=None, help="Para após S segundos")
+    parser.add_argument('--alvo', type=float, default=None, help="Para ao atingir este valor")
+    parser.add_argument('--paciencia', type=int, default=None, help="Para após K rodadas sem melhoria")
+
+def criterios_de_args(args, objetivo_escolhido):
+    return CriteriosParada(objetivo_escolhido, args.max_avaliacoes, args.tempo_max, args.alvo, args.paciencia)
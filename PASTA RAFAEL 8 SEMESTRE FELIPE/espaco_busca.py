@@ -0,0 +1,118 @@
+import numpy as np
+
+# ==============================================================================
+# ESPAÇO DE BUSCA COMPILADO (montado uma vez a partir do JSON)
+# Os laços quentes (vizinhos do Pattern Search, argumentos do .exe, vértices do
+# simplex, previsões da triagem) liam "parametros" do JSON e recriavam listas e
+# dicts a cada candidato. Aqui os limites, passos e tabelas de categorias são
+# montados uma vez, em tuplas (por eixo) e vetores numpy:
+#   - vetor  : float64, um valor por parâmetro (categórico = índice em "limites")
+#   - params : o dict que o resto do código usa (e que a função Python recebe)
+# Projeção na malha e normalização trabalham sobre matrizes (um ponto por
+# linha: simplex inteiro, lote da triagem). Com uns 10 parâmetros o numpy
+# custa mais do que ganha num ponto só, então os vizinhos e as conversões de
+# um ponto seguem em Python puro sobre as tuplas pré-montadas.
+# ==============================================================================
+PASSO_MINIMO_TIPO = {'inteiro': 1, 'float': 0.001, 'categorico': 0}
+
+class EspacoBusca:
+    def __init__(self, lista_de_parametros):
+        self.parametros = lista_de_parametros
+        self.nomes = tuple(p['nome'] for p in lista_de_parametros)
+        self.n = len(self.nomes)
+        tipos = [p['tipo'] for p in lista_de_parametros]
+        self.categorico = np.array([t == 'categorico' for t in tipos])
+        self.inteiro = np.array([t == 'inteiro' for t in tipos])
+        self.na_malha = self.categorico | self.inteiro  # Arredondados na projeção
+        self.categorias = tuple(tuple(p['limites']) if p['tipo'] == 'categorico' else None for p in lista_de_parametros)
+        self.minimos = np.array([0.0 if c is not None else float(p['limites'][0])
+                                 for p, c in zip(lista_de_parametros, self.categorias)])
+        self.maximos = np.array([float(len(c) - 1) if c is not None else float(p['limites'][1])
+                                 for p, c in zip(lista_de_parametros, self.categorias)])
+        self.faixas = np.where(self.maximos > self.minimos, self.maximos - self.minimos, 1.0)
+        self.passos = np.array([0.0 if c is not None else float(p.get('passo', 1))
+                                for p, c in zip(lista_de_parametros, self.categorias)])
+        self.passos_minimos = np.array([PASSO_MINIMO_TIPO[t] for t in tipos], dtype=float)
+        # Passo de partida dos motores contínuos (simplex, SPSA): o "passo" do JSON ou 5% da faixa
+        self.passos_iniciais = np.array([0.0 if c is not None else max(minimo, float(p.get('passo') or 0.05 * faixa))
+                                         for p, c, minimo, faixa in zip(lista_de_parametros, self.categorias,
+                                                                        self.passos_minimos, self.maximos - self.minimos)])
+        self._indices = tuple({v: i for i, v in enumerate(c)} if c is not None else None for c in self.categorias)
+        self._conversores = tuple(
+            (lambda v, c=c: c[int(v)]) if c is not None else (int if t == 'inteiro' else float)
+            for c, t in zip(self.categorias, tipos))
+        # Um eixo por parâmetro: (nome, categorias, passo do JSON, passo mínimo, mínimo, máximo, é inteiro)
+        self._eixos = tuple(zip(self.nomes, self.categorias, self.passos.tolist(), self.passos_minimos.tolist(),
+                                self.minimos.tolist(), self.maximos.tolist(), self.inteiro.tolist()))
+
+    # --- CONVERSÕES ---
+    def _linha(self, params):
+        return [indices.get(params[nome], 0) if indices is not None else params[nome]
+                for nome, indices in zip(self.nomes, self._indices)]
+
+    def codificar(self, params):
+        """dict -> vetor (categoria fora de "limites" vira o índice 0)"""
+        return np.array(self._linha(params), dtype=float)
+
+    def codificar_varios(self, lista_params):
+        """Lista de dicts -> matriz com um ponto por linha"""
+        return np.array([self._linha(params) for params in lista_params], dtype=float).reshape(-1, self.n)
+
+    def decodificar(self, vetor):
+        """vetor (já projetado) -> dict com os tipos do JSON (int, float ou a categoria)"""
+        return {nome: converter(v) for nome, converter, v in zip(self.nomes, self._conversores, vetor.tolist())}
+
+    def argumentos(self, params):
+        """dict -> lista de argumentos do .exe (mesmo texto de str(valor)); None se falta um parâmetro"""
+        try:
+            return [str(params[nome]) for nome in self.nomes]
+        except KeyError:
+            return None
+
+    def chave(self, params):
+        """Chave hashável de uma combinação (os argumentos do .exe)"""
+        argumentos = self.argumentos(params)
+        return tuple(argumentos) if argumentos is not None else None
+
+    def distancia(self, a, b):
+        """Maior diferença entre coordenadas, em fração dos limites (categórico diferente conta 1)"""
+        try: diferencas = np.abs(self.codificar(a) - self.codificar(b))
+        except KeyError: return 1.0
+        return float(np.max(np.where(self.categorico, diferencas > 0, diferencas / self.faixas), initial=0.0))
+
+    # --- OPERAÇÕES VETORIZADAS (um vetor ou uma matriz com um ponto por linha) ---
+    def projetar(self, vetores):
+        """Prende nos limites e arredonda inteiros e índices de categorias"""
+        projetado = np.minimum(np.maximum(np.asarray(vetores, dtype=float), self.minimos), self.maximos)
+        return np.where(self.na_malha, np.round(projetado), projetado)
+
+    def normalizar(self, vetores):
+        """Coordenadas em [0, 1] pelos limites (categórico: índice / (n - 1))"""
+        return (np.asarray(vetores, dtype=float) - self.minimos) / self.faixas
+
+    def valores_vizinhos(self, i, atual, passo=None):
+        """
+        Valores vizinhos de `atual` no eixo i: +passo e -passo nos numéricos (dentro dos limites)
+        ou as outras categorias. passo=None usa o "passo" do JSON; um passo adaptativo (Pattern
+        Search, Hooke-Jeeves) é protegido pelo passo mínimo do tipo.
+        """
+        _, categorias, passo_json, passo_minimo, mini, maxi, inteiro = self._eixos[i]
+        if categorias is not None: return [v for v in categorias if v != atual]
+        passo = passo_json if passo is None else max(passo_minimo, passo)
+        valores = (atual + passo, atual - passo)
+        if inteiro: valores = [int(round(v)) for v in valores]
+        return [v for v in valores if mini <= v <= maxi and v != atual]
+
+    def vizinhos(self, params, passos=None):
+        """
+        Vizinhos coordenados do ponto como (nome, valor, params), na ordem dos parâmetros
+        (valores_vizinhos em cada eixo). passos: dict nome->passo, ou None para o do JSON.
+        """
+        vizinhos = []
+        for i, nome in enumerate(self.nomes):
+            passo = None if passos is None else (passos.get(nome) or 0.0)
+            for valor in self.valores_vizinhos(i, params[nome], passo):
+                teste = dict(params)
+                teste[nome] = valor
+                vizinhos.append((nome, valor, teste))
+        return vizinhos
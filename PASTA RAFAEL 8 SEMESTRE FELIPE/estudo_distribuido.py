@@ -0,0 +1,73 @@
+import optuna
+from optuna.trial import TrialState
+from checkpoint import criar_storage_journal
+from optuna_paralelo import criar_sampler
+
+# ==============================================================================
+# ESTUDO DISTRIBUÍDO (vários processos/máquinas no mesmo estudo Optuna)
+# Todos apontam para o mesmo --storage (journal num disco compartilhado ou uma
+# URL de banco, ex.: sqlite:///estudo.db) e o mesmo --study-name:
+#   - coordenador : grava config e objetivo no estudo, gera o relatório e, ao
+#                   terminar (critério de parada ou Ctrl+C), sinaliza a parada
+#   - --worker    : só entra no estudo e roda trials até o sinal de parada
+# O worker não precisa do JSON: config, objetivo e sampler vêm do próprio estudo.
+# ==============================================================================
+ATRIBUTO_PARADA = 'parar'
+
+def abrir_storage(storage):
+    """URL (sqlite:///, postgresql://...) vai direto ao Optuna; caminho vira journal em arquivo"""
+    if '://' in storage: return storage
+    return criar_storage_journal(storage)
+
+def criar_estudo_compartilhado(storage, nome, direction, sampler, config, objetivo, nome_sampler='tpe'):
+    """Coordenador: cria (ou reabre) o estudo e publica config/objetivo/sampler para os workers"""
+    study = optuna.create_study(
+        study_name=nome, storage=abrir_storage(storage),
+        direction=direction, sampler=sampler, load_if_exists=True
+    )
+    study.set_user_attr('config', config)
+    study.set_user_attr('objetivo', objetivo)
+    study.set_user_attr('sampler', nome_sampler)
+    study.set_user_attr(ATRIBUTO_PARADA, False)
+    return study
+
+def entrar_no_estudo(storage, nome, workers=1):
+    """Worker: abre o estudo do coordenador (com o mesmo sampler). Retorna (study, config, objetivo, nome_sampler)"""
+    try:
+        study = optuna.load_study(study_name=nome, storage=abrir_storage(storage))
+    except KeyError:
+        raise ValueError(f"Estudo '{nome}' não existe em {storage} (inicie o coordenador primeiro)")
+    atributos = study.user_attrs
+    if 'config' not in atributos:
+        raise ValueError(f"Estudo '{nome}' não foi criado por um coordenador")
+    nome_sampler = atributos.get('sampler', 'tpe')
+    study.sampler = criar_sampler(workers, True, nome_sampler)
+    return study, atributos['config'], atributos['objetivo'], nome_sampler
+
+def sinalizar_parada(study):
+    try: study.set_user_attr(ATRIBUTO_PARADA, True)
+    except Exception: pass
+
+def sinal_distribuido(study, n_trials_total=None):
+    """
+    Função para ParadaOptuna(sinal=...): devolve o motivo quando o coordenador mandou
+    parar ou quando o estudo inteiro (todos os processos) já fez n_trials_total trials.
+    """
+    def sinal():
+        if study.user_attrs.get(ATRIBUTO_PARADA): return "PARADA PELO COORDENADOR"
+        if n_trials_total is not None:
+            feitos = len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED)))
+            if feitos >= n_trials_total: return f"ORÇAMENTO GLOBAL DE TRIALS ({n_trials_total})"
+        return None
+    return sinal
+
+def adicionar_argumentos_distribuido(parser):
+    parser.add_argument('--storage', type=str, default=None, help="Journal compartilhado (arquivo) ou URL de banco")
+    parser.add_argument('--study-name', type=str, default=None, help="Nome do estudo compartilhado")
+    parser.add_argument('--worker', action='store_true', help="Só roda trials no estudo de um coordenador")
+
+def validar_argumentos_distribuido(parser, args):
+    if (args.storage is None) != (args.study_name is None):
+        parser.error("--storage e --study-name andam juntos")
+    if args.worker and args.storage is None:
+        parser.error("--worker precisa de --storage e --study-name")
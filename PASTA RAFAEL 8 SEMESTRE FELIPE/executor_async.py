@@ -0,0 +1,239 @@
+import asyncio
+import locale
+import os
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import CancelledError
+from vagas_compartilhadas import cliente_vagas
+from pastas_isoladas import opcoes_pastas
+
+# ==============================================================================
+# EXECUTOR ASSÍNCRONO DE PROCESSOS (núcleo do backend argv e do modo lote)
+# Um único event loop (numa thread de fundo) roda todos os .exe:
+#   - semáforo limita quantos rodam ao mesmo tempo
+#   - timeout por avaliação: o .exe travado é morto junto com os filhos
+#     (grupo de processos) e a avaliação conta como falha
+#   - limites opcionais de memória/CPU (POSIX, via setrlimit no filho)
+#   - Ctrl+C / fechar(): tudo o que está rodando é cancelado e morto
+#   - "pasta_isolada": cada .exe simultâneo roda na sua própria pasta de
+#     trabalho, de preferência em /dev/shm (pastas_isoladas.py)
+#   - lançado pelo servico.py: cada .exe também espera uma vaga do pool
+#     compartilhado entre os trabalhos (vagas_compartilhadas.py)
+# Declarado no JSON (tudo opcional):
+#     "execucao": {"timeout": 600, "max_simultaneos": 8, "memoria_mb": 4096, "cpu_segundos": 900,
+#                  "pasta_isolada": true, "raiz_pastas": "/dev/shm", "arquivos_entrada": ["dados.txt"]}
+# ==============================================================================
+# Mesma codificação que subprocess(text=True) usaria (no Windows o .exe escreve em cp1252/cp850)
+CODIFICACAO = locale.getpreferredencoding(False)
+
+def opcoes_execucao(config):
+    execucao = config.get('execucao') or {}
+    return {
+        'timeout': execucao.get('timeout'),
+        'max_simultaneos': max(1, int(execucao.get('max_simultaneos') or os.cpu_count() or 1)),
+        'memoria_mb': execucao.get('memoria_mb'),
+        'cpu_segundos': execucao.get('cpu_segundos'),
+        'pastas': opcoes_pastas(config),
+    }
+
+def _cpu_filhos():
+    """CPU acumulada dos filhos já encerrados (None no Windows)"""
+    try:
+        import resource
+        uso = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return uso.ru_utime + uso.ru_stime
+    except ImportError:
+        return None
+
+def _matar_grupo(proc):
+    """Mata o processo e todos os filhos que ele abriu"""
+    if proc.returncode is not None: return
+    try:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)  # start_new_session: pgid == pid
+    except (OSError, ProcessLookupError):
+        try: proc.kill()
+        except ProcessLookupError: pass
+
+class ExecutorAssincrono:
+    def __init__(self, timeout=None, max_simultaneos=1, memoria_mb=None, cpu_segundos=None, pastas=None):
+        self.timeout = timeout
+        self.max_simultaneos = max_simultaneos
+        self.memoria_mb = memoria_mb
+        self.cpu_segundos = cpu_segundos
+        self.pastas = pastas  # PastasIsoladas ou None (roda na pasta atual)
+        self.timeouts = 0
+        self._rodando = 0
+        self._inicios = 0
+        self._loop = None
+        self._thread = None
+        self._semaforo = None
+        self._lock = threading.Lock()
+        self.vagas = cliente_vagas()
+
+    # --- EVENT LOOP EM SEGUNDO PLANO ---
+    def _garantir_loop(self):
+        with self._lock:
+            if self._loop is not None: return
+            self._loop = asyncio.new_event_loop()
+            pronto = threading.Event()
+            def rodar_loop():
+                asyncio.set_event_loop(self._loop)
+                self._semaforo = asyncio.Semaphore(self.max_simultaneos)
+                pronto.set()
+                self._loop.run_forever()
+            self._thread = threading.Thread(target=rodar_loop, name='executor-async', daemon=True)
+            self._thread.start()
+            pronto.wait()
+
+    def _kwargs_processo(self):
+        if os.name == 'nt':
+            return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        kwargs = {'start_new_session': True}
+        if self.memoria_mb or self.cpu_segundos:
+            memoria, cpu = self.memoria_mb, self.cpu_segundos
+            def aplicar_limites():
+                import resource
+                if memoria:
+                    limite = int(memoria) * 1024 * 1024
+                    resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+                if cpu:
+                    resource.setrlimit(resource.RLIMIT_CPU, (int(cpu), int(cpu)))
+            kwargs['preexec_fn'] = aplicar_limites
+        return kwargs
+
+    async def _rodar(self, comando, entrada, medicao):
+        async with self._semaforo:
+            vaga = await self.vagas.pedir_async() if self.vagas is not None else None
+            try:
+                return await self._executar(comando, entrada, medicao)
+            finally:
+                if vaga is not None: vaga.close()  # Fechar a conexão devolve a vaga ao serviço
+
+    async def _executar(self, comando, entrada, medicao):
+        # A CPU dos filhos só é atribuível a este .exe se ele rodou sozinho
+        sozinho = self._rodando == 0
+        self._rodando += 1
+        self._inicios += 1
+        inicios, cpu_antes = self._inicios, _cpu_filhos()
+        loop = asyncio.get_running_loop()
+        pasta = None
+        try:
+            if self.pastas is not None:
+                # Copiar as entradas / limpar a pasta é I/O de disco: roda fora do event loop
+                pasta = await loop.run_in_executor(None, self.pastas.pegar)
+                comando = [self.pastas.executavel(comando[0]), *comando[1:]]
+            t0 = time.perf_counter()
+            criacao = asyncio.ensure_future(asyncio.create_subprocess_exec(
+                *comando, stdin=asyncio.subprocess.PIPE if entrada is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL, cwd=pasta, **self._kwargs_processo()))
+            try:
+                proc = await asyncio.shield(criacao)
+            except asyncio.CancelledError:
+                # Cancelar no meio do spawn deixa o processo órfão para o child watcher: termina o spawn e mata
+                proc = await criacao
+                _matar_grupo(proc)
+                await proc.wait()
+                raise
+            t1 = time.perf_counter()
+            if medicao is not None: medicao['spawn'] = t1 - t0
+            try:
+                dados = entrada.encode(CODIFICACAO) if entrada is not None else None
+                saida, _ = await asyncio.wait_for(proc.communicate(dados), self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                _matar_grupo(proc)
+                await proc.wait()
+                if medicao is not None: medicao['modelo'] = time.perf_counter() - t1
+                return None, None
+            except asyncio.CancelledError:
+                if medicao is not None: medicao['cancelada'] = True
+                _matar_grupo(proc)
+                await proc.wait()
+                raise
+            if medicao is not None:
+                medicao['modelo'] = time.perf_counter() - t1
+                if sozinho and self._inicios == inicios and cpu_antes is not None:
+                    medicao['cpu'] = _cpu_filhos() - cpu_antes
+            return proc.returncode, saida.decode(CODIFICACAO, errors='replace')
+        finally:
+            self._rodando -= 1
+            if pasta is not None: await asyncio.shield(loop.run_in_executor(None, self.pastas.devolver, pasta))
+
+    # --- API SÍNCRONA (usada pelas estratégias) ---
+    def rodar(self, comando, entrada=None, medicao=None):
+        """Roda um comando. Retorna (codigo_saida, stdout); (None, None) em timeout ou erro"""
+        self._garantir_loop()
+        futuro = asyncio.run_coroutine_threadsafe(self._rodar(comando, entrada, medicao), self._loop)
+        try:
+            return futuro.result()
+        except KeyboardInterrupt:
+            futuro.cancel()
+            raise
+        except (Exception, CancelledError):  # .exe inexistente, executor fechado...
+            return None, None
+
+    def rodar_varios(self, comandos, limite=None, parar_quando=None, medicoes=None):
+        """
+        Roda vários comandos no mesmo loop (no máximo `limite` ao mesmo tempo, além do semáforo).
+        parar_quando(indice, codigo, stdout) -> True cancela os que faltam (poll oportunista).
+        Retorna a lista de (codigo, stdout), com (None, None) para falhas e cancelados.
+        """
+        self._garantir_loop()
+        async def um(i, comando, semaforo):
+            async with semaforo:
+                return await self._rodar(comando, None, medicoes[i] if medicoes is not None else None)
+        async def todos():
+            semaforo = asyncio.Semaphore(limite or len(comandos) or 1)
+            tarefas = {asyncio.ensure_future(um(i, c, semaforo)): i for i, c in enumerate(comandos)}
+            resultados = [(None, None)] * len(comandos)
+            try:
+                pendentes = set(tarefas)
+                while pendentes:
+                    prontas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                    parar = False
+                    for tarefa in prontas:
+                        i = tarefas[tarefa]
+                        if tarefa.exception() is None: resultados[i] = tarefa.result()
+                        if parar_quando is not None and parar_quando(i, *resultados[i]): parar = True
+                    if parar: break
+            finally:
+                for tarefa in tarefas: tarefa.cancel()
+                await asyncio.gather(*tarefas, return_exceptions=True)
+            return resultados
+        futuro = asyncio.run_coroutine_threadsafe(todos(), self._loop)
+        try:
+            return futuro.result()
+        except KeyboardInterrupt:
+            futuro.cancel()
+            raise
+        except CancelledError:
+            return [(None, None)] * len(comandos)
+
+    @staticmethod
+    def _cancelar_tudo(loop):
+        async def cancelar_tudo():
+            tarefas = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tarefas: t.cancel()
+            await asyncio.gather(*tarefas, return_exceptions=True)
+        try: asyncio.run_coroutine_threadsafe(cancelar_tudo(), loop).result(timeout=10)
+        except Exception: pass
+
+    def interromper(self):
+        """Ctrl+C: cancela tudo o que está rodando (os processos morrem), sem parar o loop"""
+        loop = self._loop
+        if loop is not None: self._cancelar_tudo(loop)
+
+    def fechar(self):
+        """Cancela tudo o que está rodando (os processos morrem) e para o loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            self._cancelar_tudo(loop)
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=10)
+        if self.pastas is not None: self.pastas.fechar()
@@ -0,0 +1,159 @@
+import heapq
+import json
+import os
+import random
+from collections import deque
+import optuna
+from optuna.distributions import distribution_to_json, json_to_distribution
+from optuna.trial import TrialState
+
+# ==============================================================================
+# MEMÓRIA LIMITADA PARA O SWARM INFINITO (--memoria-limitada N)
+# Num estudo normal, cada FrozenTrial fica na memória para sempre e o TPE
+# relê todo o histórico a cada sugestão: em rodadas de dias (100k+ trials) a
+# memória cresce e os trials/s caem. Com --memoria-limitada N, o estudo em
+# memória guarda no máximo ~N trials, que são o que o sampler enxerga:
+#   - os N/4 melhores trials de toda a execução (o TPE não esquece o ótimo)
+#   - um reservatório aleatório de N/4 trials antigos (amostra uniforme do
+#     passado, algoritmo R: a distribuição "de fundo" continua representativa)
+#   - a janela dos N/2 trials mais recentes
+# A cada N/2 trials novos o estudo é recompactado nesse conjunto. O log
+# completo de todos os trials vai para execucoes/<run-id>/historico.jsonl
+# (só anexa, uma linha por trial); na retomada ele é relido em streaming
+# para remontar melhores, reservatório e janela sem carregar tudo.
+# ==============================================================================
+ARQUIVO_HISTORICO = 'historico.jsonl'
+FRACAO_MELHORES = 0.25
+FRACAO_RESERVATORIO = 0.25
+CAPACIDADE_MINIMA = 40
+
+def adicionar_argumentos_memoria(parser):
+    parser.add_argument('--memoria-limitada', type=int, default=None, metavar='N',
+                        help="Mantém só ~N trials em memória (melhores + amostra do passado + recentes); "
+                             "o log completo vai para historico.jsonl")
+
+def validar_argumentos_memoria(parser, args):
+    if args.memoria_limitada is None: return
+    if args.memoria_limitada < CAPACIDADE_MINIMA: parser.error(f"--memoria-limitada precisa ser pelo menos {CAPACIDADE_MINIMA}")
+    if args.storage or args.worker: parser.error("--memoria-limitada não combina com o estudo distribuído (--storage)")
+
+class HistoricoLimitado:
+    def __init__(self, capacidade, direction, criar_sampler, caminho_log):
+        self.capacidade = capacidade
+        self.direction = direction
+        self.criar_sampler = criar_sampler  # Sampler novo a cada compactação (caches internos presos ao estudo antigo)
+        self.caminho_log = caminho_log
+        self.n_melhores = max(1, int(capacidade * FRACAO_MELHORES))
+        self.n_reservatorio = int(capacidade * FRACAO_RESERVATORIO)
+        self.recentes = deque(maxlen=capacidade - self.n_melhores - self.n_reservatorio)
+        self.intervalo = self.recentes.maxlen  # Trials novos entre duas compactações
+        self.melhores = []        # heap de (-chave, número, trial): o pior dos melhores no topo
+        self.reservatorio = []    # [(número, trial)]
+        self.total = 0            # Trials terminados em toda a execução (inclui retomadas)
+        self.concluidos = 0       # Dos quais COMPLETE
+        self.compactacoes = 0
+        self._antigos = 0         # Trials que já saíram da janela (base do algoritmo R)
+        self._distribuicoes = None
+        self._rng = random.Random()
+        self._ler_log()
+        self._log = open(caminho_log, 'a', encoding='utf-8')
+        self.estudo = self._novo_estudo()
+
+    # --- HISTÓRICO ---
+    def _chave(self, valor):
+        return -valor if self.direction == 'maximize' else valor  # Menor chave = melhor
+
+    def _acolher(self, numero, trial):
+        """Distribui um trial terminado entre melhores, janela e reservatório"""
+        self.total += 1
+        if trial.state == TrialState.COMPLETE:
+            self.concluidos += 1
+            item = (-self._chave(trial.value), numero, trial)
+            if len(self.melhores) < self.n_melhores: heapq.heappush(self.melhores, item)
+            elif item[0] > self.melhores[0][0]: heapq.heapreplace(self.melhores, item)
+        elif trial.state != TrialState.PRUNED:
+            return  # FAIL fica só no log
+        if len(self.recentes) == self.recentes.maxlen:
+            antigo = self.recentes[0]
+            self._antigos += 1
+            if len(self.reservatorio) < self.n_reservatorio:
+                self.reservatorio.append(antigo)
+            else:
+                i = self._rng.randrange(self._antigos)
+                if i < self.n_reservatorio: self.reservatorio[i] = antigo
+        self.recentes.append((numero, trial))
+
+    def registrar(self, trial):
+        """Chamado a cada trial terminado: grava no log e atualiza o que fica em memória"""
+        if self._distribuicoes is None and trial.distributions:
+            self._distribuicoes = dict(trial.distributions)
+            self._log.write(json.dumps({'distribuicoes': {n: distribution_to_json(d) for n, d in self._distribuicoes.items()}}) + '\n')
+        numero = self.total
+        linha = {'n': numero, 'estado': trial.state.name, 'valor': trial.value, 'params': trial.params}
+        if trial.constraints: linha['restricoes'] = trial.constraints  # Violações (restricoes.py) voltam na retomada
+        self._log.write(json.dumps(linha, ensure_ascii=False) + '\n')
+        self._log.flush()
+        self._acolher(numero, trial)
+
+    def _ler_log(self):
+        """Retomada: relê o log em streaming (memória limitada mesmo com milhões de linhas)"""
+        if not os.path.exists(self.caminho_log): return
+        with open(self.caminho_log, 'r', encoding='utf-8') as f:
+            for texto in f:
+                try: linha = json.loads(texto)
+                except ValueError: continue  # Última linha cortada por um kill
+                if 'distribuicoes' in linha:
+                    self._distribuicoes = {n: json_to_distribution(d) for n, d in linha['distribuicoes'].items()}
+                    continue
+                estado = TrialState[linha['estado']]
+                if estado not in (TrialState.COMPLETE, TrialState.PRUNED):
+                    self.total += 1
+                    continue
+                trial = optuna.trial.create_trial(
+                    params=linha['params'], distributions=self._distribuicoes, state=estado,
+                    value=linha['valor'] if estado == TrialState.COMPLETE else None,
+                    constraints=linha.get('restricoes'))
+                self._acolher(linha['n'], trial)
+
+    # --- ESTUDO EM MEMÓRIA ---
+    def _retidos(self):
+        retidos = {numero: trial for _, numero, trial in self.melhores}
+        retidos.update(self.reservatorio)
+        retidos.update(self.recentes)
+        return [retidos[n] for n in sorted(retidos)]
+
+    def _novo_estudo(self, atributos=None):
+        self._storage = optuna.storages.InMemoryStorage()
+        estudo = optuna.create_study(storage=self._storage, direction=self.direction, sampler=self.criar_sampler())
+        self._id_estudo = self._storage.get_study_id_from_name(estudo.study_name)
+        for chave, valor in (atributos or {}).items():
+            self._storage.set_study_system_attr(self._id_estudo, chave, valor)  # Ex.: posição na sequência do QMC
+        estudo.add_trials(self._retidos())
+        return estudo
+
+    def compactar(self):
+        """Troca o estudo por um novo só com os trials retidos (chamar sem trials em voo)"""
+        self.estudo = self._novo_estudo(self._storage.get_study_system_attrs(self._id_estudo))
+        self.compactacoes += 1
+        return self.estudo
+
+    # --- RESULTADOS ---
+    def melhor(self):
+        if not self.melhores: return None, {}
+        _, _, trial = max(self.melhores, key=lambda item: (item[0], -item[1]))  # Empate: o mais antigo
+        return trial.value, dict(trial.params)
+
+    def fechar(self):
+        self._log.close()
+
+    def texto_relatorio(self):
+        return (f"{len(self.estudo.get_trials(deepcopy=False))} trials em memória (até {self.capacidade + self.intervalo}: "
+                f"{self.n_melhores} melhores + reservatório de {self.n_reservatorio} + {self.recentes.maxlen} recentes) | "
+                f"{self.total} trials no log, {self.compactacoes} compactações")
+
+def abrir_historico(args, checkpoint, direction, criar_sampler):
+    """None sem --memoria-limitada (na retomada, vale o modo da execução original)"""
+    capacidade = checkpoint.estado.get('memoria_limitada') if checkpoint.retomado else args.memoria_limitada
+    if not capacidade: return None
+    checkpoint.salvar(memoria_limitada=capacidade)
+    return HistoricoLimitado(capacidade, direction, criar_sampler, checkpoint.caminho(ARQUIVO_HISTORICO))
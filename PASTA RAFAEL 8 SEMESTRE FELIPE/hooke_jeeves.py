@@ -0,0 +1,161 @@
+import sys
+import time
+import numpy as np
+from poll_paralelo import eh_melhor
+
+# ==============================================================================
+# MOTOR HOOKE-JEEVES (busca direta acelerada)
+# Em vez de andar uma coordenada por vez com passo fixo:
+#   1. Exploração: testa +passo/-passo em cada coordenada, acumulando as melhorias
+#   2. Movimento padrão: salta de novo na direção do deslocamento total
+#      (x_novo + (x_novo - x_base)) e explora em volta; repete enquanto melhorar
+#   3. Passos: dobram numa coordenada que melhora em 2 explorações seguidas e
+#      caem pela metade quando nenhuma coordenada melhora
+# Converge quando nenhuma coordenada melhora com todos os passos no mínimo
+# (inteiro: 1, float: 0.001 — os mesmos mínimos do Pattern Search, em espaco_busca.py).
+# Paralelismo: a exploração é sequencial por coordenada (cada uma parte do
+# ponto que a anterior melhorou), então cada poll tem só o par ±passo e
+# --workers N roda no máximo 2 avaliações ao mesmo tempo. Workers sobrando
+# rendem mais com o Pattern Search (2N vizinhos por poll) ou o multi-start.
+# ==============================================================================
+MOTORES = ('pattern', 'hooke-jeeves')
+
+def adicionar_argumentos_motor(parser, outros=None):
+    """outros: motores a mais que o script aceita (nome -> descrição), ex.: o SPSA na Fase 2 do main.py"""
+    outros = outros or {}
+    parser.add_argument('--motor', choices=MOTORES + tuple(outros), default='pattern',
+                        help=" | ".join(["pattern: uma coordenada por vez", "hooke-jeeves: exploração + movimento padrão (até 2 avaliações simultâneas)",
+                                         *(f"{nome}: {descricao}" for nome, descricao in outros.items())]))
+
+class HookeJeeves:
+    """
+    O estado (base, valor_base, passos, iteracao) fica no objeto, então depois de um
+    Ctrl+C o chamador ainda tem o incumbente. `estado` retoma de um checkpoint.
+    `rotulo` prefixa as mensagens (multi-start: várias buscas ao mesmo tempo).
+    """
+    def __init__(self, avaliador, objetivo_escolhido, poll, params_iniciais=None, valor_inicial=None,
+                 estado=None, rotulo=''):
+        self.avaliador = avaliador
+        self.rotulo = rotulo
+        self.objetivo = objetivo_escolhido
+        self.poll = poll
+        espaco = self.espaco = avaliador.espaco
+        # Eixos numéricos: (nome, passo mínimo, metade da faixa, é inteiro)
+        self._numericos = [(nome, int(minimo) if inteiro else minimo, faixa / 2, inteiro)
+                           for nome, categorico, minimo, faixa, inteiro
+                           in zip(espaco.nomes, espaco.categorico.tolist(), espaco.passos_minimos.tolist(),
+                                  espaco.faixas.tolist(), espaco.inteiro.tolist()) if not categorico]
+        self._sucessos = {nome: 0 for nome in espaco.nomes}
+        if estado:
+            self.base = estado['melhores_params']
+            self.valor_base = estado['melhor_resultado']
+            self.passos = estado['passos_atuais']
+            self.iteracao = estado['iteracao']
+        else:
+            self.base = dict(params_iniciais)
+            self.valor_base = valor_inicial
+            self.passos = {nome: None if categorico else (int(passo) if inteiro else passo) for nome, categorico, passo, inteiro
+                           in zip(espaco.nomes, espaco.categorico.tolist(), espaco.passos.tolist(), espaco.inteiro.tolist())}
+            self.iteracao = 0
+
+    def estado(self):
+        return {'melhores_params': self.base, 'melhor_resultado': self.valor_base,
+                'passos_atuais': self.passos, 'iteracao': self.iteracao}
+
+    # --- MOVIMENTOS ---
+    def explorar(self, ponto, valor):
+        """
+        Uma varredura coordenada a coordenada a partir de `ponto`. Retorna (ponto, valor, nomes_que_melhoraram).
+        Cada poll só tem os candidatos de uma coordenada (o par ±passo): é o teto de paralelismo do motor.
+        """
+        melhoraram = []
+        for i, nome in enumerate(self.espaco.nomes):
+            candidatos = []
+            for v in self.espaco.valores_vizinhos(i, ponto[nome], self.passos[nome] or 0.0):
+                teste = dict(ponto)
+                teste[nome] = v
+                candidatos.append(teste)
+            candidatos = [c for c in self.avaliador.ajustar(candidatos) if c is not None and c != ponto]
+            indice, res = self.poll.avaliar(self.avaliador.avaliar, candidatos, valor, self.objetivo)
+            if indice is not None:
+                ponto, valor = candidatos[indice], res
+                melhoraram.append(nome)
+        return ponto, valor, melhoraram
+
+    def _movimento_padrao(self, anterior, atual):
+        """x_atual + (x_atual - x_anterior), preso aos limites (categóricos ficam como estão)"""
+        x = self.espaco.codificar(atual)
+        salto = np.where(self.espaco.categorico, x, 2 * x - self.espaco.codificar(anterior))
+        return self.espaco.decodificar(self.espaco.projetar(salto))
+
+    def _ajustar_passos(self, melhoraram):
+        for nome, minimo, meia_faixa, inteiro in self._numericos:
+            if nome in melhoraram:
+                self._sucessos[nome] += 1
+                if self._sucessos[nome] >= 2:
+                    self.passos[nome] = min(self.passos[nome] * 2, max(minimo, meia_faixa))
+                    if inteiro: self.passos[nome] = int(self.passos[nome])
+                    self._sucessos[nome] = 0
+            else:
+                self._sucessos[nome] = 0
+
+    def _reduzir_passos(self):
+        """Metade de cada passo; False se todos já estavam no mínimo"""
+        reduziu = False
+        for nome, minimo, _, inteiro in self._numericos:
+            if self.passos[nome] > minimo:
+                metade = self.passos[nome] / 2
+                self.passos[nome] = max(minimo, int(metade) if inteiro else metade)
+                reduziu = True
+            self._sucessos[nome] = 0
+        return reduziu
+
+    # --- LOOP PRINCIPAL ---
+    def iterar(self):
+        """Uma iteração (exploração + movimentos padrão). Retorna 'melhorou', 'reduziu' ou 'convergiu'"""
+        self.iteracao += 1
+        novo, valor, melhoraram = self.explorar(self.base, self.valor_base)
+        if not melhoraram:
+            if self.poll.esgotado: return 'esgotou'  # Exploração cortada pelo --max-avaliacoes
+            return 'reduziu' if self._reduzir_passos() else 'convergiu'
+
+        self._ajustar_passos(melhoraram)
+        saltos = 0
+        while True:
+            anterior, self.base, self.valor_base = self.base, novo, valor
+            ponto_padrao = self.avaliador.ajustar([self._movimento_padrao(anterior, novo)])[0]
+            if ponto_padrao is None or ponto_padrao == novo: break
+            # Pelo poll (e não direto no avaliador): o salto também respeita o --max-avaliacoes
+            indice, valor_padrao = self.poll.avaliar(self.avaliador.avaliar, [ponto_padrao], None, self.objetivo)
+            if indice is None: break
+            novo, valor, _ = self.explorar(ponto_padrao, valor_padrao)
+            if not eh_melhor(valor, self.valor_base, self.objetivo): break
+            saltos += 1
+        print(f"  {self.rotulo}[Iteração {self.iteracao}] ✨ MELHORIA! {', '.join(melhoraram)} "
+              f"(+{saltos} movimento(s) padrão) -> {self.valor_base}")
+        return 'melhorou'
+
+    def rodar(self, criterios=None, monitorar=False, ao_iterar=None):
+        """
+        Itera até convergir ou um critério disparar. Retorna o motivo da parada.
+        Ctrl+C é repassado; o incumbente continua em self.base/self.valor_base.
+        """
+        while True:
+            resultado = self.iterar()
+            if resultado == 'reduziu':
+                print(f"  [Iteração {self.iteracao}] Reduzindo passos: {self.passos}")
+            elif resultado == 'convergiu':
+                if not monitorar:
+                    print(f"  [Iteração {self.iteracao}] Topo alcançado ({self.valor_base}) com a malha mínima.")
+                    return "CONVERGIU (MALHA MÍNIMA)"
+                sys.stdout.write(f"\r  [Iteração {self.iteracao}] Topo alcançado ({self.valor_base}). Monitorando...")
+                sys.stdout.flush()
+                time.sleep(0.5)
+
+            if ao_iterar is not None: ao_iterar(self)
+            if criterios is not None:
+                criterios.registrar_rodada(resultado == 'melhorou')
+                motivo = criterios.verificar(self.valor_base, self.avaliador.avaliacoes)
+                if motivo:
+                    print(f"  [Iteração {self.iteracao}] Critério de parada: {motivo}")
+                    return motivo
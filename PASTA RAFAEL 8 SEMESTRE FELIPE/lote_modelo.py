@@ -0,0 +1,67 @@
+import os
+import subprocess
+import tempfile
+
+# ==============================================================================
+# MODO LOTE (várias combinações por execução do .exe)
+# Declarado no JSON com a seção "lote":
+#     "lote": {"entrada": "arquivo", "argumentos": ["--lote", "{arquivo}"], "tamanho_maximo": 64}
+# O .exe recebe K linhas de parâmetros (num arquivo ou no stdin) e responde K
+# linhas, na mesma ordem: "Valor de saída: x" (ou só o número) ou "ERRO..." para
+# uma linha que falhou. As outras linhas não perdem o resultado por causa disso.
+# ==============================================================================
+def opcoes_lote(config):
+    """Lê a seção "lote" do JSON (None se o modelo não declara suporte)"""
+    lote = config.get('lote')
+    if not lote: return None
+    return {
+        'entrada': lote.get('entrada', 'arquivo'),
+        'argumentos': lote.get('argumentos', ['{arquivo}']),
+        'tamanho_maximo': max(1, int(lote.get('tamanho_maximo', 64))),
+    }
+
+def _ler_saidas(output, quantidade):
+    """Lê as respostas em ordem; linhas de log (sem número) são ignoradas"""
+    resultados = []
+    for line in output.splitlines():
+        line = line.strip()
+        if not line: continue
+        if line.upper().startswith('ERRO'):
+            resultados.append(None)
+        elif 'Valor de saída:' in line:
+            try: resultados.append(float(line.split(':')[-1].strip()))
+            except ValueError: resultados.append(None)
+        else:
+            try: resultados.append(float(line))
+            except ValueError: continue
+        if len(resultados) == quantidade: break
+    # Linhas que ficaram sem resposta contam como falha
+    return resultados + [None] * (quantidade - len(resultados))
+
+def rodar_lote(executavel, linhas, opcoes, executor=None):
+    """
+    Roda o .exe uma vez com K linhas de argumentos e devolve K resultados (float ou None).
+    Com `executor` (ExecutorAssincrono), vale o timeout/limites do JSON.
+    """
+    texto = '\n'.join(' '.join(str(a) for a in linha) for linha in linhas) + '\n'
+    arquivo = None
+    try:
+        if opcoes['entrada'] == 'stdin':
+            command = [executavel, *opcoes['argumentos']]
+            entrada = texto
+        else:
+            # Caminho absoluto: com "pasta_isolada" o .exe roda em outra pasta
+            fd, arquivo = tempfile.mkstemp(prefix='lote_', suffix='.txt', dir=os.getcwd())
+            with os.fdopen(fd, 'w', encoding='utf-8') as f: f.write(texto)
+            command = [executavel, *[a.replace('{arquivo}', arquivo) for a in opcoes['argumentos']]]
+            entrada = None
+        # Sem check=True: um código de saída != 0 não descarta as linhas que deram certo
+        if executor is not None:
+            _, saida = executor.rodar(command, entrada=entrada)
+            return _ler_saidas(saida or '', len(linhas))
+        result = subprocess.run(command, input=entrada, capture_output=True, text=True)
+        return _ler_saidas(result.stdout, len(linhas))
+    except Exception:
+        return [None] * len(linhas)
+    finally:
+        if arquivo and os.path.exists(arquivo): os.remove(arquivo)
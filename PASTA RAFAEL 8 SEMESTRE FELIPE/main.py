@@ -1,52 +1,43 @@
-import subprocess
-import copy
 import json
 import argparse
 import sys
 import optuna
-import logging
 import time
-import os
 from datetime import datetime
+from cache_avaliacoes import abrir_cache, adicionar_argumentos_cache
+from trace_avaliacoes import abrir_trace, adicionar_argumentos_trace
+from metricas import abrir_metricas, adicionar_argumentos_metricas
+from triagem import abrir_triagem, adicionar_argumentos_triagem
+from avaliador import Avaliador
+from restricoes import marcar_trial
+from poll_paralelo import PollParalelo, adicionar_argumentos_poll, eh_melhor
+from criterios_parada import OTIMO_PASSO_FIXO, adicionar_argumentos_parada, criterios_de_args, orcamento_do_poll
+from optuna_paralelo import (ParadaOptuna, criar_sampler, otimizar_em_paralelo, otimizar_em_lotes,
+                             tamanho_lote_sampler, adicionar_argumentos_sampler, validar_argumentos_sampler)
+from checkpoint import abrir_checkpoint, adicionar_argumentos_checkpoint
+from hooke_jeeves import HookeJeeves, adicionar_argumentos_motor
+from spsa import SPSA, MOTOR_SPSA, adicionar_argumentos_spsa, validar_argumentos_spsa, opcoes_spsa
+from multi_start import MultiStart, selecionar_inicios, adicionar_argumentos_multi_start, validar_argumentos_multi_start
+from orcamento import (TROCA_DE_FASE, CriteriosDaFase, abrir_orcamento, adicionar_argumentos_orcamento,
+                       validar_argumentos_orcamento)
+from estudo_distribuido import (adicionar_argumentos_distribuido, validar_argumentos_distribuido,
+                                criar_estudo_compartilhado, entrar_no_estudo, sinal_distribuido, sinalizar_parada)
+from optuna.trial import TrialState
+
+CACHE_AVALIACOES = None  # Preenchido na execução principal (--cache / --sem-cache)
+TRACE_AVALIACOES = None  # Preenchido na execução principal (--trace)
 
 # ==============================================================================
-# 1. FUNÇÃO BLACK BOX (Executa o .exe e lê o resultado)
+# 1. FUNÇÃO BLACK BOX (motor único em avaliador.py: argv, servidor, python, biblioteca)
 # ==============================================================================
-def rodar_modelo_e_ler_saida(executavel, params_dict, lista_de_parametros):
-    command = [executavel]
-    try:
-        for param_info in lista_de_parametros:
-            nome_param = param_info['nome']
-            valor = params_dict[nome_param]
-            command.append(str(valor))
-    except KeyError:
-        return None
-        
-    try:
-        if not os.path.exists(executavel): return None
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        output_completo = result.stdout.strip()
-        
-        # Tenta achar "Valor de saída:"
-        for line in output_completo.splitlines():
-            if 'Valor de saída:' in line:
-                try:
-                    return float(line.split(':')[-1].strip())
-                except: pass
-
-        # Tenta ler apenas o número
-        return float(output_completo)
-
-    except Exception:
-        return None
+AVALIADOR = None  # Criado na execução principal a partir do JSON
 
 # ==============================================================================
 # 2. FASE 1: EXPLORAÇÃO GLOBAL (Optuna)
 # ==============================================================================
 CONFIG_GLOBAL = {}
 
-def objective_optuna(trial):
-    executavel = CONFIG_GLOBAL['executavel']
+def sugerir_parametros(trial):
     lista_de_parametros = CONFIG_GLOBAL['parametros']
     params_teste = {}
     
@@ -64,86 +55,243 @@ def objective_optuna(trial):
             mini, maxi = param_info['limites']
             passo = param_info.get('passo_sugestao', 0.1)
             params_teste[nome] = trial.suggest_float(nome, mini, maxi, step=passo)
+    marcar_trial(trial, AVALIADOR.restricoes, params_teste)
+    return params_teste
+
+def objective_optuna(trial):
+    params_teste = sugerir_parametros(trial)
 
-    resultado = rodar_modelo_e_ler_saida(executavel, params_teste, lista_de_parametros)
+    resultado = AVALIADOR.avaliar(params_teste)
     
     if resultado is None:
         raise optuna.exceptions.TrialPruned()
         
     return resultado
 
+def rodar_fase1(study, n_trials, parada, workers, sampler='tpe'):
+    """Roda os trials da Fase 1 (lote, paralelo ou sequencial). n_trials=None = até a parada"""
+    lote = tamanho_lote_sampler(sampler, CONFIG_GLOBAL, AVALIADOR.tamanho_lote)
+    workers = tamanho_lote_sampler(sampler, CONFIG_GLOBAL, workers)
+    if lote:
+        otimizar_em_lotes(study, sugerir_parametros, AVALIADOR.avaliar_lote, n_trials=n_trials, tamanho_lote=lote, parada=parada)
+    elif workers > 1:
+        otimizar_em_paralelo(study, objective_optuna, n_trials=n_trials, workers=workers, parada=parada, metricas=AVALIADOR.metricas,
+                             interromper=AVALIADOR.interromper)
+    else:
+        study.optimize(objective_optuna, n_trials=n_trials, show_progress_bar=n_trials is not None, callbacks=[parada.callback])
+
+def rodar_como_worker(args):
+    """--worker: ajuda na Fase 1 de um coordenador até ele mandar parar (sem relatório)"""
+    global CONFIG_GLOBAL, AVALIADOR
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    try: study, CONFIG_GLOBAL, objetivo, sampler = entrar_no_estudo(args.storage, args.study_name, args.workers)
+    except ValueError as e:
+        print(e); sys.exit(1)
+    AVALIADOR = Avaliador(CONFIG_GLOBAL, CACHE_AVALIACOES, TRACE_AVALIACOES, abrir_metricas(args))
+    print(f">>> WORKER no estudo '{args.study_name}' ({objetivo.upper()}, sampler {sampler}, {args.workers} worker(s))")
+    parada = ParadaOptuna(criterios_de_args(args, objetivo), AVALIADOR, usar_paciencia=False, sinal=sinal_distribuido(study))
+    try:
+        rodar_fase1(study, None, parada, args.workers, sampler)
+        print(f"Worker encerrado: {parada.motivo}")
+    except KeyboardInterrupt:
+        print("\nWorker interrompido.")
+    finally:
+        AVALIADOR.fechar()
+
 # ==============================================================================
 # 3. FASE 2: REFINAMENTO LOCAL (Pattern Search) - MODO INFINITO
 # ==============================================================================
-def refinar_com_pattern_search(config, params_iniciais, objetivo_escolhido):
-    executavel = config['executavel']
-    lista_de_parametros = config['parametros']
-    
-    print(f"\n>>> Iniciando FASE 2: Refinamento Contínuo (Pattern Search) <<<")
-    print("(O programa ficará rodando para sempre. Pressione Ctrl+C para parar e salvar)")
-    
-    melhores_params = copy.deepcopy(params_iniciais)
-    melhor_resultado = rodar_modelo_e_ler_saida(executavel, melhores_params, lista_de_parametros)
+def gerar_vizinhos(params_base):
+    """Lista os vizinhos coordenados do ponto atual como (nome, valor, params), com o passo do JSON (ou 1)"""
+    return AVALIADOR.vizinhos(params_base)
+
+def refinar_com_pattern_search(params_iniciais, objetivo_escolhido, workers=1, modo_poll='oportunista',
+                               criterios=None, monitorar=False, checkpoint=None, motor='pattern', opcoes_motor=None):
+    """Retorna (melhores_params, melhor_resultado, motivo_da_parada). opcoes_motor: kwargs do SPSA"""
+    print(f"\n>>> Iniciando FASE 2: Refinamento Contínuo (Pattern Search, motor {motor}) <<<")
+    print(f"(Poll {modo_poll} com {workers} worker(s). Pressione Ctrl+C para parar e salvar)")
     
-    if melhor_resultado is None: return params_iniciais, 0
+    salvo = checkpoint.estado.get('fase2') if checkpoint is not None else None
+    if salvo:
+        # Retomada: continua do incumbente do último checkpoint
+        melhores_params = salvo['melhores_params']
+        melhor_resultado = salvo['melhor_resultado']
+        iteracao = salvo['iteracao']
+        print(f"Retomando da iteração {iteracao}: {melhor_resultado}")
+    else:
+        melhores_params = dict(params_iniciais)
+        melhor_resultado = AVALIADOR.avaliar(melhores_params)
+        
+        if melhor_resultado is None: return params_iniciais, 0, "ERRO NO PONTO INICIAL"
 
-    print(f"Ponto de partida (vindo do Optuna): {melhor_resultado}")
+        print(f"Ponto de partida (vindo do Optuna): {melhor_resultado}")
+        iteracao = 0
     
-    iteracao = 0
+    avaliar_lote = AVALIADOR.avaliar_lote if AVALIADOR.suporta_lote else None
+    avaliar_concorrente = AVALIADOR.avaliar_concorrente if AVALIADOR.suporta_concorrente else None
+    poll = PollParalelo(workers, modo_poll, avaliar_lote, AVALIADOR.metricas, avaliar_concorrente, AVALIADOR.triagem,
+                        AVALIADOR.viaveis, orcamento_do_poll(criterios, AVALIADOR))
     
+    if motor in ('hooke-jeeves', MOTOR_SPSA):
+        if motor == MOTOR_SPSA:
+            # O gradiente avalia os seus pontos de uma vez (sem poll): os workers vão direto para o SPSA
+            motor_local = SPSA(AVALIADOR, objetivo_escolhido, workers, melhores_params,
+                               melhor_resultado, estado=salvo if salvo and 'escala' in salvo else None,
+                               **(opcoes_motor or {}))
+        else:
+            motor_local = HookeJeeves(AVALIADOR, objetivo_escolhido, poll, melhores_params,
+                                      melhor_resultado, estado=salvo if salvo and 'passos_atuais' in salvo else None)
+        salvar = (lambda m: checkpoint.salvar_periodico(fase2=m.estado())) if checkpoint is not None else None
+        try:
+            motivo = motor_local.rodar(criterios, monitorar, salvar)
+            return motor_local.base, motor_local.valor_base, motivo
+        except KeyboardInterrupt:
+            print("\n\n⚠️  INTERRUPÇÃO DETECTADA NA FASE 2!")
+            print("Salvando o melhor resultado encontrado até agora...")
+            return motor_local.base, motor_local.valor_base, "INTERROMPIDO"
+        finally:
+            poll.fechar()
+
     # --- BLINDAGEM: TRY/EXCEPT DENTRO DO LOOP ---
     try:
-        while True: # LOOP INFINITO
+        while True: # Até convergir, um critério de parada ou Ctrl+C
             iteracao += 1
-            houve_melhoria = False
-            
-            for param_info in lista_de_parametros:
-                nome = param_info['nome']
-                tipo = param_info['tipo']
-                params_base = copy.deepcopy(melhores_params)
-
-                candidatos = []
-                if tipo == 'categorico':
-                    candidatos = [v for v in param_info['limites'] if v != params_base[nome]]
-                else:
-                    passo = param_info.get('passo', 1) # Usa passo do JSON ou 1
-                    val = params_base[nome]
-                    mini, maxi = param_info['limites']
-                    vizinhos = [val + passo, val - passo]
-                    if tipo == 'inteiro': vizinhos = [int(round(c)) for c in vizinhos]
-                    candidatos = [c for c in vizinhos if mini <= c <= maxi and c != val]
-
-                for val_teste in candidatos:
-                    params_teste = copy.deepcopy(params_base)
-                    params_teste[nome] = val_teste
-                    
-                    res = rodar_modelo_e_ler_saida(executavel, params_teste, lista_de_parametros)
-                    if res is None: continue
-
-                    melhorou = False
-                    if objetivo_escolhido == 'maximizar' and res > melhor_resultado: melhorou = True
-                    if objetivo_escolhido == 'minimizar' and res < melhor_resultado: melhorou = True
-                    
-                    if melhorou:
-                        print(f"  [Iteração {iteracao}] ✨ MELHORIA! {nome}: {val_teste} -> {res}")
-                        melhor_resultado = res
-                        melhores_params = copy.deepcopy(params_teste)
-                        houve_melhoria = True
-                        params_base = copy.deepcopy(melhores_params)
-
-            if not houve_melhoria:
-                # Em vez de parar, avisa e espera um pouco
+            vizinhos = gerar_vizinhos(melhores_params)
+            indice, res = poll.avaliar(AVALIADOR.avaliar, [v[2] for v in vizinhos], melhor_resultado, objetivo_escolhido)
+
+            if indice is not None:
+                nome, val_teste, params_teste = vizinhos[indice]
+                print(f"  [Iteração {iteracao}] ✨ MELHORIA! {nome}: {val_teste} -> {res}")
+                melhor_resultado = res
+                melhores_params = params_teste
+                if checkpoint is not None:
+                    checkpoint.salvar_periodico(fase2={'melhores_params': melhores_params, 'melhor_resultado': melhor_resultado,
+                                                       'iteracao': iteracao})
+            elif monitorar:
+                # Modelos com ruído: em vez de parar, avisa e espera um pouco
                 sys.stdout.write(f"\r  [Iteração {iteracao}] Estável em {melhor_resultado}. Monitorando...")
                 sys.stdout.flush()
                 time.sleep(0.5) # Pausa para não sobrecarregar CPU
+            elif not poll.esgotado: # Poll cortado pelo --max-avaliacoes: quem responde é o critério abaixo
+                # Passos fixos: nenhum vizinho melhor = ótimo local na malha do JSON
+                print(f"  [Iteração {iteracao}] Estável em {melhor_resultado}. Nenhum vizinho melhora.")
+                return melhores_params, melhor_resultado, OTIMO_PASSO_FIXO
+
+            if criterios is not None:
+                criterios.registrar_rodada(indice is not None)
+                motivo = criterios.verificar(melhor_resultado, AVALIADOR.avaliacoes)
+                if motivo:
+                    print(f"\n  [Iteração {iteracao}] Critério de parada: {motivo}")
+                    return melhores_params, melhor_resultado, motivo
                 
     except KeyboardInterrupt:
         print("\n\n⚠️  INTERRUPÇÃO DETECTADA NA FASE 2!")
         print("Salvando o melhor resultado encontrado até agora...")
         # A exceção é tratada aqui para retornar os dados limpos
-        return melhores_params, melhor_resultado
-            
-    return melhores_params, melhor_resultado
+        return melhores_params, melhor_resultado, "INTERROMPIDO"
+    finally:
+        poll.fechar()
+
+def refinar_multi_start(inicios, objetivo_escolhido, workers=1, modo_poll='oportunista', criterios=None,
+                        checkpoint=None, motor='pattern', margem=0.05, opcoes_motor=None):
+    """Fase 2 a partir de vários trials ao mesmo tempo. Retorna (melhores_params, melhor_resultado, motivo, texto_otimos)"""
+    salvo = checkpoint.estado.get('fase2') if checkpoint is not None else None
+    if salvo and 'multi_start' in salvo:
+        inicios = [tuple(i) for i in salvo['inicios']]  # Retomada: os mesmos inícios, cada um do seu incumbente
+        print(f"Retomando {len(inicios)} buscas do multi-start...")
+
+    print(f"\n>>> Iniciando FASE 2: Multi-Start ({len(inicios)} buscas, motor {motor}) <<<")
+    print(f"(Poll {modo_poll}, {max(1, workers // len(inicios))} worker(s) por busca. Pressione Ctrl+C para parar e salvar)")
+    for i, (_, valor, trial) in enumerate(inicios):
+        print(f"  [Início {i + 1}] trial {trial}: {valor}")
+
+    multi = MultiStart(AVALIADOR, objetivo_escolhido, inicios, workers, modo_poll, motor, margem,
+                       gerar_vizinhos, salvo['multi_start'] if salvo and 'multi_start' in salvo else None, opcoes_motor)
+    salvar = None
+    if checkpoint is not None:
+        salvar = lambda m: checkpoint.salvar_periodico(fase2={'inicios': inicios, 'multi_start': m.estado()})
+        salvar(multi)
+    try:
+        motivo = multi.rodar(criterios, salvar)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  INTERRUPÇÃO DETECTADA NA FASE 2!")
+        print("Salvando o melhor resultado encontrado até agora...")
+        motivo = "INTERROMPIDO"
+    if checkpoint is not None: checkpoint.salvar(fase2={'inicios': inicios, 'multi_start': multi.estado()})
+    melhores_params, melhor_resultado = multi.melhor()
+    return melhores_params, melhor_resultado, motivo, multi.texto_relatorio()
+
+def otimizar_com_orcamento(study, agendador, objetivo_escolhido, criterios, args, checkpoint, sampler):
+    """
+    --budget-evals / --budget-time: alterna Fase 1 e Fase 2 pelo ritmo de melhoria (orcamento.py)
+    até o orçamento acabar. Retorna (melhores_params, melhor_resultado, motivo_da_parada, texto_otimos)
+    """
+    salvo = checkpoint.estado.get('orcamento') or {}
+    melhores_params, melhor_resultado = salvo.get('melhores_params'), salvo.get('melhor_resultado')
+    refinados = salvo.get('refinados', [])  # Pontos de partida já refinados (não repete a mesma busca)
+    otimos_locais = None
+    motor = checkpoint.estado['motor']
+    avisado = False
+
+    def salvar():
+        checkpoint.salvar(orcamento=dict(agendador.estado(AVALIADOR.avaliacoes), melhores_params=melhores_params,
+                                         melhor_resultado=melhor_resultado, refinados=refinados))
+
+    def guardar(params, valor):
+        nonlocal melhores_params, melhor_resultado
+        if valor is not None and eh_melhor(valor, melhor_resultado, objetivo_escolhido):
+            melhores_params, melhor_resultado = params, valor
+        salvar()
+
+    def melhor_do_estudo():
+        try: return study.best_trial
+        except ValueError: return None
+
+    while True:
+        # --- FASE 1: explora até estagnar (ou o orçamento acabar) ---
+        melhor_trial = melhor_do_estudo()
+        if agendador.fase != 'exploracao':
+            agendador.iniciar_fase('exploracao', melhor_trial.value if melhor_trial else None, AVALIADOR.avaliacoes)
+        parada = ParadaOptuna(CriteriosDaFase(agendador, criterios), AVALIADOR, usar_paciencia=False)
+        parada.melhor = melhor_trial.value if melhor_trial else None
+        try:
+            rodar_fase1(study, None, parada, args.workers, sampler)
+        except KeyboardInterrupt:
+            print("\n⚠️ Interrupção na Fase 1! Usando o melhor resultado parcial...")
+            parada.motivo = "INTERROMPIDO"
+        melhor_trial = melhor_do_estudo()
+        if melhor_trial is not None: guardar(melhor_trial.params, melhor_trial.value)
+        if parada.motivo != TROCA_DE_FASE:
+            agendador.encerrar_fase(AVALIADOR.avaliacoes)
+            salvar()
+            return melhores_params, melhor_resultado, parada.motivo, otimos_locais
+
+        # --- FASE 2: refina a partir do melhor trial, se ele ainda não foi refinado ---
+        inicios = [i for i in selecionar_inicios(study, args.multi_start, AVALIADOR.espaco)
+                   if i[0] not in refinados]
+        if melhor_trial is None or not inicios or inicios[0][2] != melhor_trial.number:
+            if not avisado: print("[ORÇAMENTO] Nenhum trial melhor para refinar: a exploração continua")
+            avisado = True
+            agendador.reiniciar_janela(parada.melhor, AVALIADOR.avaliacoes)
+            continue
+        refinados.extend(params for params, _, _ in inicios)
+        avisado = False
+        agendador.iniciar_fase('refinamento', inicios[0][1], AVALIADOR.avaliacoes)
+        criterios_fase = CriteriosDaFase(agendador, criterios)
+        if len(inicios) > 1:
+            params, valor, motivo, otimos_locais = refinar_multi_start(
+                inicios, objetivo_escolhido, args.workers, args.poll, criterios_fase, None, motor,
+                args.multi_start_margem, opcoes_spsa(args))
+        else:
+            params, valor, motivo = refinar_com_pattern_search(
+                inicios[0][0], objetivo_escolhido, args.workers, args.poll, criterios_fase, False, None,
+                motor, opcoes_spsa(args))
+        if motivo == "ERRO NO PONTO INICIAL": continue
+        guardar(params, valor)
+        if motivo not in (TROCA_DE_FASE, "CONVERGIU (MALHA MÍNIMA)", OTIMO_PASSO_FIXO):
+            agendador.encerrar_fase(AVALIADOR.avaliacoes)
+            salvar()
+            return melhores_params, melhor_resultado, motivo, otimos_locais
 
 # ==============================================================================
 # 4. GERADOR DE RELATÓRIO AUTOMÁTICO
@@ -174,6 +322,16 @@ def gerar_relatorio_arquivo(dados):
             if diff < 0: texto_impacto = f"SUCESSO: A Fase 2 reduziu o valor em {diff:.4f} unidades."
             else: texto_impacto = "NEUTRO: A Fase 1 já havia encontrado o mínimo local."
 
+    secao_otimos = ""
+    linha_orcamento = f"\nOrçamento Adaptativo    : {dados['orcamento']}" if dados.get('orcamento') else ""
+    if dados.get('otimos_locais'):
+        secao_otimos = f"""
+--------------------------------------------------------------------------------
+                     ÓTIMOS LOCAIS ENCONTRADOS (MULTI-START)
+--------------------------------------------------------------------------------
+{dados['otimos_locais']}
+"""
+
     conteudo = f"""
 ================================================================================
                         RELATÓRIO DE OTIMIZAÇÃO HÍBRIDA
@@ -188,7 +346,15 @@ Objetivo da Otimização: {dados['objetivo'].upper()}
                             ESTATÍSTICAS DE TEMPO
 --------------------------------------------------------------------------------
 Tempo Total de Execução : {dados['tempo_total']:.2f} segundos
-Tentativas Exploratórias: {dados['trials']} (Optuna)
+Tentativas Exploratórias: {dados['trials']} (Optuna, sampler {dados['sampler']})
+Avaliações do Modelo    : {dados['avaliacoes']}
+Motor da Fase 2         : {dados['motor']}
+Critério de Parada      : {dados['motivo_parada']}{linha_orcamento}
+
+--------------------------------------------------------------------------------
+                          DESEMPENHO DAS AVALIAÇÕES
+--------------------------------------------------------------------------------
+{dados['metricas']}
 
 --------------------------------------------------------------------------------
                             EVOLUÇÃO DOS RESULTADOS
@@ -198,7 +364,7 @@ Tentativas Exploratórias: {dados['trials']} (Optuna)
 
 >>> ANÁLISE DE IMPACTO:
 {texto_impacto}
-
+{secao_otimos}
 --------------------------------------------------------------------------------
                        MELHOR COMBINAÇÃO DE PARÂMETROS
 --------------------------------------------------------------------------------
@@ -218,13 +384,37 @@ Tentativas Exploratórias: {dados['trials']} (Optuna)
 # ==============================================================================
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument('-c', '--config', type=str, required=True, help="Arquivo JSON")
+    parser.add_argument('-c', '--config', type=str, default=None, help="Arquivo JSON")
     parser.add_argument('-t', '--trials', type=int, default=50, help="Tentativas Optuna")
     group = parser.add_mutually_exclusive_group(required=False)
     group.add_argument('--max', action='store_true', help="Forçar Maximizar")
     group.add_argument('--min', action='store_true', help="Forçar Minimizar")
+    adicionar_argumentos_cache(parser)
+    adicionar_argumentos_trace(parser)
+    adicionar_argumentos_metricas(parser)
+    adicionar_argumentos_poll(parser)
+    adicionar_argumentos_parada(parser)
+    parser.add_argument('--monitorar', action='store_true', help="Fase 2 não para ao convergir (modelos com ruído)")
+    adicionar_argumentos_checkpoint(parser)
+    adicionar_argumentos_distribuido(parser)
+    adicionar_argumentos_motor(parser, {MOTOR_SPSA: "gradiente por perturbação simultânea (2 avaliações por iteração)"})
+    adicionar_argumentos_spsa(parser)
+    adicionar_argumentos_sampler(parser)
+    adicionar_argumentos_triagem(parser)
+    adicionar_argumentos_multi_start(parser)
+    adicionar_argumentos_orcamento(parser)
     
     args = parser.parse_args()
+    validar_argumentos_distribuido(parser, args)
+    validar_argumentos_sampler(parser, args)
+    validar_argumentos_multi_start(parser, args)
+    validar_argumentos_orcamento(parser, args)
+    validar_argumentos_spsa(parser, args)
+    if not args.config and not args.resume and not args.worker: parser.error("informe --config (ou --resume RUN_ID)")
+    CACHE_AVALIACOES = abrir_cache(args)
+    TRACE_AVALIACOES = abrir_trace(args)
+    if args.worker:
+        rodar_como_worker(args); sys.exit(0)
     status_execucao = "CONCLUÍDO"
     
     melhor_fase1 = None
@@ -233,17 +423,31 @@ if __name__ == "__main__":
     params_finais = {}
     inicio_total = time.time()
     objetivo_cliente = "DESCONHECIDO"
+    motivo_parada = "-"
+    otimos_locais = None
+    agendador = None
+    checkpoint = None
 
     try:
-        try:
-            with open(args.config, 'r', encoding='utf-8') as f:
-                CONFIG_GLOBAL = json.load(f)
-        except:
-            print("Erro ao abrir config JSON."); sys.exit(1)
+        if args.resume:
+            try: checkpoint = abrir_checkpoint(args, 'hibrido')
+            except ValueError as e:
+                print(e); sys.exit(1)
+            CONFIG_GLOBAL = checkpoint.estado['config']
+        else:
+            try:
+                with open(args.config, 'r', encoding='utf-8') as f:
+                    CONFIG_GLOBAL = json.load(f)
+            except:
+                print("Erro ao abrir config JSON."); sys.exit(1)
+        # A triagem aprende já com a Fase 1 (o TPE é o substituto dela) e atua no poll da Fase 2
+        AVALIADOR = Avaliador(CONFIG_GLOBAL, CACHE_AVALIACOES, TRACE_AVALIACOES, abrir_metricas(args))
+        abrir_triagem(args, AVALIADOR)
 
         # --- LÓGICA DE ESCOLHA ---
         objetivo_cliente = None
-        if args.max: objetivo_cliente = 'maximizar'
+        if checkpoint is not None: objetivo_cliente = checkpoint.estado['objetivo']
+        elif args.max: objetivo_cliente = 'maximizar'
         elif args.min: objetivo_cliente = 'minimizar'
 
         if objetivo_cliente is None:
@@ -265,21 +469,56 @@ if __name__ == "__main__":
                 except EOFError:
                     print("\nErro de entrada. Use flags."); sys.exit(1)
 
+        if checkpoint is None:
+            try: checkpoint = abrir_checkpoint(args, 'hibrido', CONFIG_GLOBAL, objetivo_cliente)
+            except ValueError as e:
+                print(e); sys.exit(1)
+        if 'motor' not in checkpoint.estado: checkpoint.salvar(motor=args.motor)  # Na retomada, vale o motor original
+        if 'sampler' not in checkpoint.estado: checkpoint.salvar(sampler=args.sampler)
+        if 'multi_start' not in checkpoint.estado: checkpoint.salvar(multi_start=args.multi_start)
+        sampler = checkpoint.estado['sampler']
+        print(f"Execução: {checkpoint.run_id} (para retomar: --resume {checkpoint.run_id})")
+
         print(f"\n--- INICIANDO OTIMIZAÇÃO: {objetivo_cliente.upper()} ---")
         print("(Você pode parar a qualquer momento com Ctrl+C que o relatório será gerado)")
 
         # FASE 1: OPTUNA
         optuna.logging.set_verbosity(optuna.logging.WARNING)
         direcao = 'maximize' if objetivo_cliente == 'maximizar' else 'minimize'
-        study = optuna.create_study(direction=direcao)
-        
-        print(f"Rodando Fase 1 (Exploração Global - {args.trials} tentativas)...")
+        lote = AVALIADOR.tamanho_lote
+        storage = args.storage or checkpoint.estado.get('storage')
+        if storage:
+            # Coordenador: os workers (--worker) dividem a Fase 1; -t vale para o estudo inteiro
+            study_name = args.study_name or checkpoint.estado['study_name']
+            study = criar_estudo_compartilhado(storage, study_name, direcao,
+                                               criar_sampler(max(args.workers, lote), True, sampler),
+                                               CONFIG_GLOBAL, objetivo_cliente, sampler)
+            checkpoint.salvar(storage=storage, study_name=study_name)
+            print(f"Coordenando o estudo '{study_name}' em {storage}")
+            print(f"  Workers: python main.py --storage {storage} --study-name {study_name} --worker")
+        else:
+            study = checkpoint.criar_ou_carregar_estudo(direcao, criar_sampler(max(args.workers, lote), False, sampler))
+        # Na retomada, os trials já terminados (no journal) não são refeitos
+        feitos = len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED)))
+        restantes = 0 if 'fase2' in checkpoint.estado else max(0, args.trials - feitos)
+        # Com orçamento (--budget-evals / --budget-time), o agendador decide quando trocar de fase
+        agendador = abrir_orcamento(args, objetivo_cliente, CONFIG_GLOBAL, checkpoint.estado.get('orcamento'))
+        if agendador is not None: restantes = 0
+        else:
+            print(f"Rodando Fase 1 (Exploração Global - {restantes} de {args.trials} tentativas, sampler {sampler}, "
+                  f"{tamanho_lote_sampler(sampler, CONFIG_GLOBAL, args.workers)} worker(s))...")
+        # Os critérios valem para a execução inteira; a paciência só na Fase 2
+        criterios = criterios_de_args(args, objetivo_cliente)
+        parada = ParadaOptuna(criterios, AVALIADOR, usar_paciencia=False,
+                              sinal=sinal_distribuido(study, args.trials) if storage else None)
         
         try:
-            study.optimize(objective_optuna, n_trials=args.trials, show_progress_bar=True)
+            if restantes > 0: rodar_fase1(study, None if storage else restantes, parada, args.workers, sampler)
         except KeyboardInterrupt:
             print("\n⚠️ Interrupção na Fase 1! Usando o melhor resultado parcial...")
             status_execucao = "INTERROMPIDO"
+        finally:
+            if storage: sinalizar_parada(study)  # Fase 1 acabou: libera os workers
 
         if len(study.trials) > 0:
             try:
@@ -295,9 +534,34 @@ if __name__ == "__main__":
             melhor_fase1 = 0
 
         # FASE 2: PATTERN SEARCH (Só se não parou na Fase 1)
-        if status_execucao != "INTERROMPIDO":
-            print(f"Rodando Fase 2 (Refinamento Local)...")
-            params_finais, resultado_final = refinar_com_pattern_search(CONFIG_GLOBAL, params_fase1, objetivo_cliente)
+        if agendador is not None:
+            print(f"Orçamento adaptativo: {agendador.resumo(AVALIADOR.avaliacoes)} "
+                  f"(janela de {agendador.janela} avaliações, sampler {sampler})")
+            params_finais, resultado_final, motivo_parada, otimos_locais = otimizar_com_orcamento(
+                study, agendador, objetivo_cliente, criterios, args, checkpoint, sampler)
+            if motivo_parada == "INTERROMPIDO": status_execucao = "INTERROMPIDO"
+            if len(study.trials) > 0:
+                try: melhor_fase1, params_fase1 = study.best_trial.value, study.best_trial.params
+                except ValueError: pass
+        elif parada.motivo and not parada.por_sinal:
+            print(f"-> Critério de parada já atingido na Fase 1: {parada.motivo}")
+            motivo_parada = parada.motivo
+            params_finais = params_fase1
+            resultado_final = melhor_fase1
+        elif status_execucao != "INTERROMPIDO":
+            print("Rodando Fase 2 (Refinamento Local)...")
+            if 'fase2' not in checkpoint.estado:
+                checkpoint.salvar(fase2=None)
+            inicios = selecionar_inicios(study, checkpoint.estado['multi_start'], AVALIADOR.espaco)
+            if len(inicios) > 1 or (checkpoint.estado['fase2'] or {}).get('multi_start'):
+                params_finais, resultado_final, motivo_parada, otimos_locais = refinar_multi_start(
+                    inicios, objetivo_cliente, args.workers, args.poll, criterios, checkpoint,
+                    checkpoint.estado['motor'], args.multi_start_margem, opcoes_spsa(args))
+            else:
+                params_finais, resultado_final, motivo_parada = refinar_com_pattern_search(
+                    params_fase1, objetivo_cliente, args.workers, args.poll, criterios, args.monitorar,
+                    checkpoint, checkpoint.estado['motor'], opcoes_spsa(args))
+            if motivo_parada == "INTERROMPIDO": status_execucao = "INTERROMPIDO"
         else:
             params_finais = params_fase1
             resultado_final = melhor_fase1
@@ -315,6 +579,8 @@ if __name__ == "__main__":
 
     finally:
         tempo_gasto = time.time() - inicio_total
+        if AVALIADOR is not None: AVALIADOR.fechar()
+        if checkpoint is not None: checkpoint.salvar(status=status_execucao)
 
         if resultado_final is None:
             resultado_final = melhor_fase1
@@ -324,12 +590,19 @@ if __name__ == "__main__":
             'status': status_execucao,
             'modelo': CONFIG_GLOBAL.get('executavel', 'Desconhecido'),
             'objetivo': objetivo_cliente if objetivo_cliente else "Indefinido",
-            'config_file': args.config,
+            'config_file': args.config or (checkpoint.estado.get('config_file') if checkpoint else None),
             'tempo_total': tempo_gasto,
             'trials': args.trials,
+            'avaliacoes': AVALIADOR.avaliacoes if AVALIADOR is not None else 0,
+            'motivo_parada': motivo_parada,
+            'metricas': AVALIADOR.texto_desempenho() if AVALIADOR is not None else '-',
+            'motor': checkpoint.estado.get('motor', args.motor) if checkpoint else args.motor,
+            'sampler': checkpoint.estado.get('sampler', args.sampler) if checkpoint else args.sampler,
             'resultado_fase1': melhor_fase1,
             'resultado_final': resultado_final,
-            'params_finais': params_finais
+            'params_finais': params_finais,
+            'otimos_locais': otimos_locais,
+            'orcamento': agendador.texto_relatorio(AVALIADOR.avaliacoes) if agendador is not None else None
         }
 
         print("\n" + "="*60)
@@ -339,11 +612,16 @@ if __name__ == "__main__":
             print(f" OBJETIVO       : {str(objetivo_cliente).upper()}")
             print(f" VALOR FINAL    : {resultado_final}")
             print(f" TEMPO TOTAL    : {tempo_gasto:.2f}s")
+            print(f" PARADA         : {motivo_parada}")
             print("-" * 60)
             print(" PARÂMETROS IDEAIS:")
             print(json.dumps(params_finais, indent=4))
         else:
             print("Nenhum resultado foi gerado a tempo.")
+        if CACHE_AVALIACOES is not None:
+            print(f" CACHE          : {CACHE_AVALIACOES.resumo()}")
+        if AVALIADOR is not None and AVALIADOR.triagem is not None:
+            print(f" TRIAGEM        : {AVALIADOR.triagem.resumo()}")
         print("="*60)
 
         if resultado_final is not None:
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+
+# ==============================================================================
+# MÉTRICAS DO CAMINHO QUENTE (cada avaliação do modelo)
+# O Avaliador mede, por avaliação:
+#   - spawn    : tempo para criar o processo do .exe (backend argv)
+#   - modelo   : tempo de relógio do modelo (processo, servidor, função ou .so)
+#   - cpu      : tempo de CPU do processo filho (POSIX, backend argv)
+#   - parse    : leitura do "Valor de saída" no stdout
+#   - fila     : espera na fila do pool quando há vários workers
+#   - overhead : tempo do lado Python entre uma avaliação e a próxima (mesma thread)
+# Saídas: --metricas arquivo.jsonl (um evento por avaliação + resumo periódico com
+# a taxa ao vivo), --prometheus arquivo.prom (formato texto, reescrito a cada
+# resumo) e o bloco de texto do relatório final (com histograma de latência).
+# ==============================================================================
+COMPONENTES = ('spawn', 'modelo', 'cpu', 'parse', 'fila', 'overhead')
+LIMITES_HISTOGRAMA = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def executar_com_espera(metricas, funcao, argumento, enviado_em):
+    """Roda no pool: registra quanto a tarefa esperou na fila e chama a função"""
+    if metricas is not None: metricas.registrar_fila(time.perf_counter() - enviado_em)
+    return funcao(argumento)
+
+class MetricasAvaliacao:
+    def __init__(self, arquivo_jsonl=None, arquivo_prometheus=None, intervalo=5.0):
+        self.arquivo_jsonl = arquivo_jsonl
+        self.arquivo_prometheus = arquivo_prometheus
+        self.intervalo = intervalo
+        self.inicio = time.time()
+        self.execucoes = 0
+        self.falhas = 0
+        self.acertos_cache = 0
+        self.somas = {c: 0.0 for c in COMPONENTES}
+        self.contagens = {c: 0 for c in COMPONENTES}
+        self.histograma = [0] * (len(LIMITES_HISTOGRAMA) + 1)
+        self.soma_latencia = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ultimo_resumo = (time.time(), 0)
+        self._f = open(arquivo_jsonl, 'a', encoding='utf-8') if arquivo_jsonl else None
+
+    # --- REGISTRO ---
+    def _somar(self, componente, segundos):
+        if segundos is None: return
+        self.somas[componente] += segundos
+        self.contagens[componente] += 1
+
+    def registrar_fila(self, segundos):
+        self._local.fila = segundos
+
+    def registrar_cache(self):
+        with self._lock: self.acertos_cache += 1
+
+    def iniciar(self):
+        """Chamado no início de uma avaliação real. Retorna o marcador de tempo"""
+        agora = time.perf_counter()
+        ultimo_fim = getattr(self._local, 'ultimo_fim', None)
+        self._local.overhead = agora - ultimo_fim if ultimo_fim is not None else None
+        return agora
+
+    def finalizar(self, marcador, ok, medicao=None, latencia=None):
+        """Fecha a avaliação: medicao traz spawn/modelo/cpu/parse (o que o backend souber medir)"""
+        agora = time.perf_counter()
+        self._local.ultimo_fim = agora
+        if latencia is None: latencia = agora - marcador
+        partes = dict(medicao or {})
+        partes.setdefault('modelo', latencia)
+        partes['fila'] = getattr(self._local, 'fila', None)
+        partes['overhead'] = getattr(self._local, 'overhead', None)
+        self._local.fila = None
+        self._local.overhead = None
+
+        with self._lock:
+            self.execucoes += 1
+            if not ok: self.falhas += 1
+            for c in COMPONENTES: self._somar(c, partes.get(c))
+            self.soma_latencia += latencia
+            i = 0
+            while i < len(LIMITES_HISTOGRAMA) and latencia > LIMITES_HISTOGRAMA[i]: i += 1
+            self.histograma[i] += 1
+            if self._f is not None:
+                evento = {'t': time.time(), 'tipo': 'avaliacao', 'ok': ok, 'latencia': round(latencia, 6)}
+                evento.update({c: round(partes[c], 6) for c in COMPONENTES if partes.get(c) is not None})
+                self._f.write(json.dumps(evento) + '\n')
+            resumo = time.time() - self._ultimo_resumo[0] >= self.intervalo
+        if resumo: self.publicar()
+
+    def finalizar_lote(self, marcador, oks):
+        """Lote: o tempo da execução única é dividido igualmente entre as linhas"""
+        fatia = (time.perf_counter() - marcador) / max(1, len(oks))
+        for ok in oks: self.finalizar(marcador, ok, latencia=fatia)
+
+    # --- SAÍDAS ---
+    def taxas(self):
+        """(avaliações/s desde o início, avaliações/s no último intervalo)"""
+        agora = time.time()
+        t_anterior, n_anterior = self._ultimo_resumo
+        total = self.execucoes / (agora - self.inicio) if agora > self.inicio else 0.0
+        recente = (self.execucoes - n_anterior) / (agora - t_anterior) if agora > t_anterior else 0.0
+        return total, recente
+
+    def publicar(self):
+        """Grava o resumo periódico no JSONL e reescreve o arquivo Prometheus"""
+        with self._lock:
+            taxa_total, taxa_recente = self.taxas()
+            self._ultimo_resumo = (time.time(), self.execucoes)
+            if self._f is not None:
+                self._f.write(json.dumps({
+                    't': time.time(), 'tipo': 'resumo', 'execucoes': self.execucoes, 'falhas': self.falhas,
+                    'acertos_cache': self.acertos_cache, 'avaliacoes_por_segundo': round(taxa_recente, 3),
+                    'avaliacoes_por_segundo_total': round(taxa_total, 3),
+                    'tempo_total': {c: round(self.somas[c], 6) for c in COMPONENTES},
+                }) + '\n')
+                self._f.flush()
+            if self.arquivo_prometheus:
+                self._gravar_prometheus(taxa_recente)
+
+    def _gravar_prometheus(self, taxa):
+        linhas = [
+            '# HELP otimizador_execucoes_total Avaliações reais do modelo',
+            '# TYPE otimizador_execucoes_total counter',
+            f'otimizador_execucoes_total {self.execucoes}',
+            '# HELP otimizador_falhas_total Avaliações que falharam',
+            '# TYPE otimizador_falhas_total counter',
+            f'otimizador_falhas_total {self.falhas}',
+            '# HELP otimizador_cache_acertos_total Avaliações respondidas pelo cache',
+            '# TYPE otimizador_cache_acertos_total counter',
+            f'otimizador_cache_acertos_total {self.acertos_cache}',
+            '# HELP otimizador_avaliacoes_por_segundo Taxa no último intervalo',
+            '# TYPE otimizador_avaliacoes_por_segundo gauge',
+            f'otimizador_avaliacoes_por_segundo {taxa:.6f}',
+            '# HELP otimizador_tempo_segundos_total Tempo acumulado por componente',
+            '# TYPE otimizador_tempo_segundos_total counter',
+        ]
+        linhas += [f'otimizador_tempo_segundos_total{{componente="{c}"}} {self.somas[c]:.6f}' for c in COMPONENTES]
+        linhas += ['# HELP otimizador_latencia_avaliacao_segundos Latência de cada avaliação real',
+                   '# TYPE otimizador_latencia_avaliacao_segundos histogram']
+        acumulado = 0
+        for limite, n in zip(LIMITES_HISTOGRAMA, self.histograma):
+            acumulado += n
+            linhas.append(f'otimizador_latencia_avaliacao_segundos_bucket{{le="{limite}"}} {acumulado}')
+        linhas.append(f'otimizador_latencia_avaliacao_segundos_bucket{{le="+Inf"}} {self.execucoes}')
+        linhas.append(f'otimizador_latencia_avaliacao_segundos_sum {self.soma_latencia:.6f}')
+        linhas.append(f'otimizador_latencia_avaliacao_segundos_count {self.execucoes}')
+        temporario = self.arquivo_prometheus + '.tmp'
+        try:
+            with open(temporario, 'w', encoding='utf-8') as f: f.write('\n'.join(linhas) + '\n')
+            os.replace(temporario, self.arquivo_prometheus)
+        except OSError: pass
+
+    def gargalo(self):
+        """Onde o tempo foi: no modelo, em abrir processos ou no lado Python"""
+        # A fila não entra: esperar worker livre significa que o modelo é que está ocupado
+        python = self.somas['parse'] + self.somas['overhead']
+        candidatos = {'MODELO': self.somas['modelo'], 'SPAWN DE PROCESSOS': self.somas['spawn'], 'LADO PYTHON': python}
+        if not any(candidatos.values()): return '-'
+        return max(candidatos, key=candidatos.get)
+
+    def texto_relatorio(self):
+        """Bloco para o relatório final: quebra do tempo por componente + histograma"""
+        taxa_total, _ = self.taxas()
+        linhas = [
+            f"Execuções do Modelo     : {self.execucoes} ({self.falhas} falhas, {self.acertos_cache} acertos de cache)",
+            f"Avaliações por Segundo  : {taxa_total:.2f}",
+            f"Gargalo Provável        : {self.gargalo()}",
+            "",
+            f"{'Componente':<12}{'Total (s)':>12}{'Média (ms)':>12}{'Amostras':>10}",
+        ]
+        for c in COMPONENTES:
+            media = 1000 * self.somas[c] / self.contagens[c] if self.contagens[c] else 0.0
+            linhas.append(f"{c:<12}{self.somas[c]:>12.3f}{media:>12.2f}{self.contagens[c]:>10}")
+        linhas += ["", "Latência por avaliação:"]
+        anterior = 0.0
+        for limite, n in zip(LIMITES_HISTOGRAMA + (None,), self.histograma):
+            faixa = f"{anterior:g}s - {limite:g}s" if limite is not None else f"> {anterior:g}s"
+            barra = '#' * (round(40 * n / self.execucoes) if self.execucoes else 0)
+            if n: linhas.append(f"  {faixa:<16}{n:>7}  {barra}")
+            if limite is not None: anterior = limite
+        return '\n'.join(linhas)
+
+    def fechar(self):
+        self.publicar()
+        with self._lock:
+            if self._f is not None: self._f.close()
+            self._f = None
+
+def abrir_metricas(args):
+    return MetricasAvaliacao(getattr(args, 'metricas', None), getattr(args, 'prometheus', None))
+
+def adicionar_argumentos_metricas(parser):
+    parser.add_argument('--metricas', type=str, default=None, help="Fluxo JSONL de métricas por avaliação")
+    parser.add_argument('--prometheus', type=str, default=None, help="Arquivo de métricas no formato texto do Prometheus")
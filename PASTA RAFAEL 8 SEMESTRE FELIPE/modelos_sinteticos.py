@@ -0,0 +1,108 @@
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+# ==============================================================================
+# MODELOS SINTÉTICOS (para o benchmark, sem os .exe reais)
+# Imitam as configs do projeto: mesmos parâmetros, limites, tipos e passos.
+# Cada modelo tem ótimo conhecido e um "alvo" (valor considerado bom o bastante).
+# Variáveis de ambiente:
+#   BENCH_LATENCIA : segundos de espera por avaliação (imita o custo do .exe)
+#   BENCH_TRACE    : arquivo onde cada avaliação vira uma linha JSON (t0, t1, valor)
+# Uso como executável: python modelos_sinteticos.py <modelo> v1 v2 ...
+# ==============================================================================
+CATEGORIAS_MODELO10 = ['baixo', 'medio', 'médio', 'alto']
+BONUS_MODELO10 = {'baixo': 0.0, 'medio': 5.0, 'médio': 3.0, 'alto': 8.0}
+
+def _inteiros(n, mini, maxi, inicial, passo, prefixo='x', inicio=1):
+    return [{'nome': f'{prefixo}{i}', 'tipo': 'inteiro', 'limites': [mini, maxi], 'valor_inicial': inicial, 'passo': passo}
+            for i in range(inicio, inicio + n)]
+
+def _centros(n, mini, maxi):
+    """Ótimo espalhado (e fora do ponto inicial) para não favorecer nenhuma estratégia"""
+    return [mini + (maxi - mini) * (0.62 + 0.25 * math.sin(1.7 * i)) for i in range(n)]
+
+# --- FUNÇÕES (recebem a lista de valores na ordem dos parâmetros) ---
+CENTROS_PROVAB2 = _centros(10, 1, 1000)
+CENTROS_MODELO10 = _centros(9, 0, 100)
+CENTROS_SIMULADO = _centros(5, 1, 100)
+
+def f_provab2(v):
+    return 1000.0 - sum(((x - c) / 100.0) ** 2 for x, c in zip(v, CENTROS_PROVAB2))
+
+def f_provab2_ruido(v):
+    return f_provab2(v) + random.gauss(0.0, 0.5)
+
+def f_modelo10(v):
+    return BONUS_MODELO10[v[0]] - sum(((x - c) / 10.0) ** 2 for x, c in zip(v[1:], CENTROS_MODELO10))
+
+def f_simulado(v):
+    return sum((x - c) ** 2 for x, c in zip(v, CENTROS_SIMULADO))
+
+def f_rastrigin(v):
+    z = [(x - c) / 10.0 for x, c in zip(v, CENTROS_SIMULADO)]
+    return sum(10.0 + zi * zi - 10.0 * math.cos(2 * math.pi * zi) for zi in z)
+
+MODELOS = {
+    'provab2': {'funcao': f_provab2, 'objetivo': 'maximizar', 'otimo': 1000.0, 'alvo': 999.0,
+                'parametros': _inteiros(10, 1, 1000, 500, 5)},
+    'provab2_ruido': {'funcao': f_provab2_ruido, 'objetivo': 'maximizar', 'otimo': 1000.0, 'alvo': 998.5,
+                      'parametros': _inteiros(10, 1, 1000, 500, 5)},
+    'modelo10': {'funcao': f_modelo10, 'objetivo': 'maximizar', 'otimo': 8.0, 'alvo': 7.5,
+                 'parametros': [{'nome': 'x1', 'tipo': 'categorico', 'limites': CATEGORIAS_MODELO10, 'valor_inicial': 'medio'}]
+                               + _inteiros(9, 0, 100, 50, 5, inicio=2)},
+    'simulado': {'funcao': f_simulado, 'objetivo': 'minimizar', 'otimo': 0.0, 'alvo': 1.0,
+                 'parametros': _inteiros(5, 1, 100, 50, 1)},
+    'rastrigin': {'funcao': f_rastrigin, 'objetivo': 'minimizar', 'otimo': 0.0, 'alvo': 1.0,
+                  'parametros': _inteiros(5, 1, 100, 50, 5)},
+}
+
+# --- AVALIAÇÃO COM LATÊNCIA E TRACE ---
+_LOCK_TRACE = threading.Lock()
+
+def _avaliar(nome, valores):
+    t0 = time.time()
+    latencia = float(os.environ.get('BENCH_LATENCIA', '0') or 0)
+    if latencia > 0: time.sleep(latencia)
+    valor = MODELOS[nome]['funcao'](valores)
+    trace = os.environ.get('BENCH_TRACE')
+    if trace:
+        linha = json.dumps({'t0': t0, 't1': time.time(), 'valor': valor})
+        with _LOCK_TRACE, open(trace, 'a', encoding='utf-8') as f: f.write(linha + '\n')
+    return valor
+
+def _funcao_backend(nome):
+    """Função no formato do backend "python" (recebe o dict de parâmetros)"""
+    nomes = [p['nome'] for p in MODELOS[nome]['parametros']]
+    return lambda params: _avaliar(nome, [params[n] for n in nomes])
+
+# Uma função por modelo para o JSON: "python": {"modulo": "modelos_sinteticos.py", "funcao": "provab2"}
+for _nome in MODELOS: globals()[_nome] = _funcao_backend(_nome)
+
+def gerar_config(nome, executavel=None):
+    """Config JSON do modelo: backend python (no processo) ou argv (com um lançador externo)"""
+    modelo = MODELOS[nome]
+    config = {'executavel': executavel or f'{nome}.exe', 'parametros': modelo['parametros']}
+    if executavel is None:
+        config['backend'] = 'python'
+        config['python'] = {'modulo': os.path.abspath(__file__), 'funcao': nome}
+    return config
+
+def _converter(p, texto):
+    if p['tipo'] == 'inteiro': return int(float(texto))
+    if p['tipo'] == 'float': return float(texto)
+    return texto
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in MODELOS:
+        print(f"Uso: python modelos_sinteticos.py <{'|'.join(MODELOS)}> v1 v2 ..."); sys.exit(1)
+    nome = sys.argv[1]
+    try:
+        valores = [_converter(p, t) for p, t in zip(MODELOS[nome]['parametros'], sys.argv[2:])]
+    except ValueError:
+        print("ERRO: parâmetro inválido"); sys.exit(1)
+    print(f"Valor de saída: {_avaliar(nome, valores)}")
@@ -0,0 +1,287 @@
+import sqlite3
+import threading
+import traceback
+from collections import deque
+from optuna.trial import TrialState
+from hooke_jeeves import HookeJeeves
+from spsa import SPSA, MOTOR_SPSA
+from poll_paralelo import PollParalelo, eh_melhor
+from criterios_parada import OTIMO_PASSO_FIXO, orcamento_do_poll
+
+# ==============================================================================
+# MULTI-START DA FASE 2 (refinamento a partir dos K melhores trials)
+# Uma busca local só sai de um ponto e fica presa no ótimo local mais próximo.
+# Com --multi-start K, os K melhores trials distintos da Fase 1 viram K buscas
+# (distintos = afastados pelo menos DISTANCIA_MINIMA, em fração dos limites, de
+# todos os já escolhidos; se faltar, completa com os próximos da fila)
+# (Pattern Search, Hooke-Jeeves ou SPSA) rodando ao mesmo tempo, cada uma numa thread
+# com o seu poll (workers // K vizinhos simultâneos, no mínimo 1). O cache, a
+# triagem e o executor do Avaliador são compartilhados. Uma busca termina quando:
+#   - CONVERGIU : nenhum vizinho melhora (malha mínima; no Pattern de passo
+#                 fixo, ótimo local com o passo do JSON)
+#   - ABSORVIDA : o incumbente caiu num ponto já visitado por outra busca
+#                 (mesma bacia: o resto do caminho seria repetido)
+#   - DOMINADA  : está pior que a melhor busca por mais que --multi-start-margem
+#                 (fração de |melhor|) e, no ritmo das últimas CARENCIA_ITERACOES,
+#                 levaria mais de HORIZONTE_ITERACOES para tirar a diferença
+# Os critérios de parada valem para o conjunto; todos os ótimos locais vão
+# para o relatório.
+# ==============================================================================
+CARENCIA_ITERACOES = 10   # Janela do ritmo de melhoria (e iterações antes de poder ser dominada)
+HORIZONTE_ITERACOES = 50  # Uma busca que ainda sobe depressa não é encerrada
+DISTANCIA_MINIMA = 0.1   # Maior diferença entre coordenadas (normalizada pelos limites) entre dois inícios
+
+def adicionar_argumentos_multi_start(parser):
+    parser.add_argument('--multi-start', type=int, default=1,
+                        help="Fase 2 a partir dos K melhores trials distintos da Fase 1, em paralelo")
+    parser.add_argument('--multi-start-margem', type=float, default=0.05,
+                        help="Busca pior que a melhor por mais que esta fração de |melhor| é encerrada (0 desliga)")
+
+def validar_argumentos_multi_start(parser, args):
+    if args.multi_start < 1: parser.error("--multi-start precisa ser pelo menos 1")
+    if args.multi_start_margem < 0: parser.error("--multi-start-margem não pode ser negativa")
+    if args.multi_start > 1 and args.monitorar: parser.error("--monitorar não combina com --multi-start")
+
+def selecionar_inicios(study, k, espaco, desde=0):
+    """Os k melhores trials completos (número >= desde) e afastados entre si: lista de (params, valor, numero_do_trial)"""
+    trials = [t for t in study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+              if t.value is not None and t.number >= desde]
+    trials.sort(key=lambda t: t.value, reverse=study.direction.name == 'MAXIMIZE')
+    unicos, vistos = [], set()
+    for t in trials:
+        chave = espaco.chave(t.params)
+        if chave in vistos: continue
+        vistos.add(chave)
+        unicos.append(t)
+    escolhidos = []
+    for t in unicos:
+        if len(escolhidos) == k: break
+        if all(espaco.distancia(t.params, e.params) >= DISTANCIA_MINIMA for e in escolhidos): escolhidos.append(t)
+    for t in unicos:  # Poucos trials afastados: completa com os melhores que sobraram
+        if len(escolhidos) == k: break
+        if t not in escolhidos: escolhidos.append(t)
+    return [(dict(t.params), t.value, t.number) for t in escolhidos]
+
+class _AvaliadorDoInicio:
+    """Repassa ao Avaliador compartilhado, conta as avaliações da busca e responde None depois da parada"""
+    def __init__(self, avaliador, parar):
+        self.avaliador = avaliador
+        self.espaco = avaliador.espaco
+        self.triagem = avaliador.triagem
+        self.suporta_lote = avaliador.suporta_lote
+        self.suporta_concorrente = avaliador.suporta_concorrente
+        self.viaveis = avaliador.viaveis
+        self.projetar = avaliador.projetar
+        self.ajustar = avaliador.ajustar
+        self.parar = parar
+        self.avaliacoes = 0
+        self._lock = threading.Lock()
+
+    def _contar(self, n):
+        with self._lock: self.avaliacoes += n
+
+    def avaliar(self, params):
+        if self.parar.is_set(): return None
+        self._contar(1)
+        return self.avaliador.avaliar(params)
+
+    def avaliar_lote(self, lista_params):
+        if self.parar.is_set(): return [None] * len(lista_params)
+        self._contar(len(lista_params))
+        return self.avaliador.avaliar_lote(lista_params)
+
+    def avaliar_concorrente(self, lista_params, limite=None, parar_quando=None):
+        if self.parar.is_set(): return [None] * len(lista_params)
+        def ao_terminar(i, valor):
+            self._contar(1)
+            if self.parar.is_set(): return True
+            return parar_quando(i, valor) if parar_quando is not None else False
+        return self.avaliador.avaliar_concorrente(lista_params, limite, ao_terminar)
+
+class _BuscaPattern:
+    """Pattern Search de passo fixo (o mesmo da Fase 2), uma iteração por chamada"""
+    def __init__(self, avaliador, objetivo_escolhido, poll, gerar_vizinhos, base, valor_base, iteracao=0, rotulo=''):
+        self.avaliador = avaliador
+        self.objetivo = objetivo_escolhido
+        self.poll = poll
+        self.gerar_vizinhos = gerar_vizinhos
+        self.base, self.valor_base = dict(base), valor_base
+        self.iteracao = iteracao
+        self.rotulo = rotulo
+
+    def estado(self):
+        return {'melhores_params': self.base, 'melhor_resultado': self.valor_base, 'iteracao': self.iteracao}
+
+    def iterar(self):
+        self.iteracao += 1
+        vizinhos = self.gerar_vizinhos(self.base)
+        indice, res = self.poll.avaliar(self.avaliador.avaliar, [v[2] for v in vizinhos], self.valor_base, self.objetivo)
+        if indice is None: return 'esgotou' if self.poll.esgotado else 'convergiu'
+        nome, val_teste, self.base = vizinhos[indice]
+        self.valor_base = res
+        print(f"  {self.rotulo}[Iteração {self.iteracao}] ✨ MELHORIA! {nome}: {val_teste} -> {res}")
+        return 'melhorou'
+
+class MultiStart:
+    def __init__(self, avaliador, objetivo_escolhido, inicios, workers=1, modo_poll='oportunista',
+                 motor='pattern', margem=0.05, gerar_vizinhos=None, estado=None, opcoes_spsa=None):
+        """
+        inicios: lista de (params, valor, numero_do_trial) de selecionar_inicios.
+        estado: lista salva por estado() (retomada); buscas já encerradas não voltam a rodar.
+        opcoes_spsa: kwargs do SPSA (gradiente, medias, semente) quando motor='spsa'.
+        """
+        self.avaliador = avaliador
+        self.objetivo = objetivo_escolhido
+        self.motor = motor
+        self.margem = margem
+        self.parar = threading.Event()
+        self.motivo = None
+        self.falha = None  # Exceção inesperada de uma busca, repassada pelo rodar()
+        self._lock = threading.Lock()
+        self._visitados = {}  # Chave do incumbente -> índice da primeira busca que passou por ele
+        workers_por_busca = max(1, workers // max(1, len(inicios)))
+        self.buscas = []
+        for i, (params, valor, trial) in enumerate(inicios):
+            salvo = estado[i] if estado else {}
+            proxy = _AvaliadorDoInicio(avaliador, self.parar)
+            proxy.avaliacoes = salvo.get('avaliacoes', 0)
+            poll = PollParalelo(workers_por_busca, modo_poll,
+                                proxy.avaliar_lote if avaliador.suporta_lote else None, avaliador.metricas,
+                                proxy.avaliar_concorrente if avaliador.suporta_concorrente else None, avaliador.triagem,
+                                avaliador.viaveis)
+            base = salvo.get('melhores_params', params)
+            valor_base = salvo.get('melhor_resultado', valor)
+            rotulo = f"[Início {i + 1}] "
+            if motor == 'hooke-jeeves':
+                motor_local = HookeJeeves(proxy, objetivo_escolhido, poll, base, valor_base,
+                                          estado=salvo if 'passos_atuais' in salvo else None, rotulo=rotulo)
+            elif motor == MOTOR_SPSA:
+                opcoes = dict(opcoes_spsa or {})
+                if opcoes.get('semente') is not None: opcoes['semente'] += i  # Cada busca com as suas perturbações
+                motor_local = SPSA(proxy, objetivo_escolhido, workers_por_busca, base, valor_base,
+                                   estado=salvo if 'escala' in salvo else None, rotulo=rotulo, **opcoes)
+            else:
+                motor_local = _BuscaPattern(proxy, objetivo_escolhido, poll, gerar_vizinhos, base,
+                                            valor_base, salvo.get('iteracao', 0), rotulo)
+            self.buscas.append({'motor': motor_local, 'proxy': proxy, 'poll': poll, 'trial': trial, 'inicial': valor,
+                                'situacao': salvo.get('situacao', 'RODANDO'),
+                                'historico': deque([valor_base], maxlen=CARENCIA_ITERACOES + 1)})
+            self._visitar(i, base)
+
+    # --- ESTADO COMPARTILHADO ---
+    def _visitar(self, i, params):
+        """Marca o incumbente da busca i. Retorna o índice da outra busca que já passou por ele (ou None)"""
+        dono = self._visitados.setdefault(self.avaliador.espaco.chave(params), i)
+        return dono if dono != i else None
+
+    def melhor(self):
+        """(params, valor) do melhor incumbente entre todas as buscas"""
+        validas = [b['motor'] for b in self.buscas if b['motor'].valor_base is not None]
+        if not validas: return None, None
+        escolhido = validas[0]
+        for m in validas[1:]:
+            if eh_melhor(m.valor_base, escolhido.valor_base, self.objetivo): escolhido = m
+        return escolhido.base, escolhido.valor_base
+
+    def _dominada(self, busca):
+        historico = busca['historico']
+        if self.margem <= 0 or len(historico) < historico.maxlen: return False
+        _, melhor = self.melhor()
+        valor = busca['motor'].valor_base
+        if melhor is None or valor is None or historico[0] is None: return False
+        diferenca = abs(melhor - valor)
+        if eh_melhor(valor, melhor, self.objetivo) or diferenca <= self.margem * abs(melhor): return False
+        ritmo = abs(valor - historico[0]) / CARENCIA_ITERACOES
+        return diferenca > ritmo * HORIZONTE_ITERACOES
+
+    def estado(self):
+        estados = []
+        for b in self.buscas:
+            e = dict(b['motor'].estado())
+            e.update(situacao=b['situacao'], avaliacoes=b['proxy'].avaliacoes)
+            estados.append(e)
+        return estados
+
+    # --- EXECUÇÃO ---
+    def _rodar_busca(self, i, criterios, ao_melhorar):
+        busca = self.buscas[i]
+        motor_local = busca['motor']
+        try:
+            while not self.parar.is_set():
+                resultado = motor_local.iterar()
+                if self.parar.is_set(): break
+                with self._lock:
+                    busca['historico'].append(motor_local.valor_base)
+                    if resultado == 'convergiu':
+                        busca['situacao'] = 'CONVERGIU'
+                        print(f"  [Início {i + 1}] Convergiu em {motor_local.valor_base}.")
+                    elif resultado == 'melhorou':
+                        dono = self._visitar(i, motor_local.base)
+                        if dono is not None:
+                            busca['situacao'] = f'ABSORVIDA (início {dono + 1})'
+                            print(f"  [Início {i + 1}] Caiu no caminho do início {dono + 1}: encerrada.")
+                        if ao_melhorar is not None: ao_melhorar(self)
+                    if busca['situacao'] == 'RODANDO' and self._dominada(busca):
+                        busca['situacao'] = 'DOMINADA'
+                        print(f"  [Início {i + 1}] Dominada ({motor_local.valor_base} contra {self.melhor()[1]}): encerrada.")
+                    if criterios is not None and self.motivo is None:
+                        criterios.registrar_rodada(resultado == 'melhorou')
+                        motivo = criterios.verificar(self.melhor()[1], self.avaliador.avaliacoes)
+                        if motivo:
+                            print(f"\n  [Início {i + 1}, iteração {motor_local.iteracao}] Critério de parada: {motivo}")
+                            self.motivo = motivo
+                            self.parar.set()
+                    if busca['situacao'] != 'RODANDO': break
+                if resultado == 'esgotou': self.parar.wait(0.05)  # A sobra do teto está com os polls das outras buscas
+        except (OSError, ValueError, sqlite3.Error) as e:
+            # Falha de E/S do modelo, do cache ou do trace: só esta busca para
+            print(f"  [Início {i + 1}] Erro na busca:\n{traceback.format_exc()}", end='')
+            with self._lock: busca['situacao'] = f'ERRO: {e}'
+        except Exception as e:
+            # Qualquer outra coisa é bug: todas param e o erro sobe no rodar()
+            with self._lock: busca['situacao'] = f'ERRO: {e}'
+            self.falha = e
+            self.parar.set()
+        finally:
+            busca['poll'].fechar()
+            if isinstance(motor_local, SPSA): motor_local.fechar()
+
+    def rodar(self, criterios=None, ao_melhorar=None):
+        """
+        Roda as buscas ainda ativas até todas terminarem ou um critério disparar. Retorna o motivo.
+        Ctrl+C é repassado (as buscas param na próxima avaliação); o melhor fica em melhor().
+        Erro de E/S encerra só a busca (ERRO na tabela); qualquer outra exceção para todas e é repassada.
+        """
+        threads = []
+        for i, busca in enumerate(self.buscas):
+            if busca['situacao'] != 'RODANDO': continue
+            busca['poll'].orcamento = orcamento_do_poll(criterios, self.avaliador)
+            t = threading.Thread(target=self._rodar_busca, args=(i, criterios, ao_melhorar), daemon=True,
+                                 name=f'multi-start-{i + 1}')
+            t.start()
+            threads.append(t)
+        try:
+            for t in threads:
+                while t.is_alive(): t.join(0.2)  # join com timeout: o Ctrl+C chega na thread principal
+        except KeyboardInterrupt:
+            self.parar.set()
+            raise
+        if self.falha is not None: raise self.falha
+        if self.motivo: return self.motivo
+        return OTIMO_PASSO_FIXO if self.motor == 'pattern' else "CONVERGIU (MALHA MÍNIMA)"
+
+    def texto_relatorio(self):
+        """Tabela dos ótimos locais (um por início), do melhor para o pior"""
+        sinal = -1 if self.objetivo == 'maximizar' else 1
+        valores = [b['motor'].valor_base for b in self.buscas]
+        ordem = sorted(range(len(self.buscas)), key=lambda i: (valores[i] is None, sinal * (valores[i] or 0)))
+        linhas = [f"{'Início':<8}{'Trial':>7}{'Fase 1':>14}{'Final':>14}{'Avaliações':>12}  Situação"]
+        for i in ordem:
+            b = self.buscas[i]
+            final = f"{valores[i]:.6g}" if valores[i] is not None else '-'
+            situacao = 'PARADA' if b['situacao'] == 'RODANDO' else b['situacao']  # Critério de parada ou Ctrl+C
+            linhas.append(f"{i + 1:<8}{b['trial']:>7}{b['inicial']:>14.6g}{final:>14}{b['proxy'].avaliacoes:>12}  {situacao}")
+        linhas.append("")
+        for i in ordem:
+            linhas.append(f"Início {i + 1}: {self.buscas[i]['motor'].base}")
+        return '\n'.join(linhas)
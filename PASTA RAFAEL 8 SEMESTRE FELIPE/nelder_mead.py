@@ -0,0 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from poll_paralelo import eh_melhor
+
+# ==============================================================================
+# MOTOR NELDER-MEAD NATIVO (limitado, inteiro e paralelo)
+# O SciPy trabalha num espaço contínuo sem limites e o vector_to_params só
+# arredonda/prende depois: o simplex desaba em pontos inteiros repetidos.
+# Aqui cada vértice é projetado nos limites e na malha antes de ser avaliado:
+#   inteiro: arredonda | categórico: índice em "limites" | float: contínuo
+#   - reflexão (1), expansão (2), contração (0.5) e encolhimento (0.5)
+#   - simplex degenerado (vértices repetidos ou achatados após a projeção):
+#     reinicia em volta do melhor vértice — com os passos originais se houve
+#     melhoria desde o último reinício, senão com a metade; com os passos já no
+#     mínimo e sem melhoria, convergiu
+#   - simplex inicial e encolhimento avaliados de uma vez (lote, event loop
+#     do executor assíncrono ou threads, conforme o backend)
+#   - o melhor ponto avaliado fica sempre em self.melhor / self.valor_melhor
+# ==============================================================================
+REFLEXAO, EXPANSAO, CONTRACAO, ENCOLHIMENTO = 1.0, 2.0, 0.5, 0.5
+MOTORES_SIMPLEX = ('nativo', 'scipy')
+
+def adicionar_argumentos_simplex(parser):
+    parser.add_argument('--motor', choices=MOTORES_SIMPLEX, default='scipy',
+                        help="scipy: scipy.optimize (contínuo) | nativo: limites e malha inteira respeitados, --workers e --triagem")
+    parser.add_argument('--workers', type=int, default=1, help="Avaliações simultâneas no simplex inicial e no encolhimento")
+
+class NelderMead:
+    def __init__(self, avaliador, objetivo_escolhido, workers=1, params_iniciais=None, estado=None):
+        self.avaliador = avaliador
+        self.objetivo = objetivo_escolhido
+        self.workers = max(1, int(workers))
+        self.espaco = avaliador.espaco
+        self.n = self.espaco.n
+        # Categórico anda de índice em índice em "limites"
+        self.minimos = np.where(self.espaco.categorico, 1.0, self.espaco.passos_minimos)
+        self.passos_iniciais = np.where(self.espaco.categorico, 1.0, self.espaco.passos_iniciais)
+        self.reinicios = 0
+        self._memo = {}  # Chave dos argumentos -> valor (vértices repetidos não rodam de novo)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        if estado:
+            self.vertices = np.array(estado['vertices'], dtype=float)
+            self.custos = np.array([np.inf if c is None else c for c in estado['custos']])
+            self.melhor = estado['melhores_params']
+            self.valor_melhor = estado['melhor_resultado']
+            self.escala = estado['escala']
+            self.iteracao = estado['iteracao']
+            self._melhorou_desde_reinicio = estado.get('melhorou_desde_reinicio', True)
+        else:
+            self.melhor, self.valor_melhor = None, None
+            self.escala = 1.0
+            self.iteracao = 0
+            self._melhorou_desde_reinicio = True
+            self.vertices = self._simplex_em_volta(self._para_vetor(params_iniciais))
+            self.custos = self._avaliar_varios(self.vertices)
+
+    def estado(self):
+        return {'vertices': self.vertices.tolist(),
+                'custos': [None if not np.isfinite(c) else float(c) for c in self.custos],
+                'melhores_params': self.melhor, 'melhor_resultado': self.valor_melhor, 'escala': self.escala,
+                'iteracao': self.iteracao, 'melhorou_desde_reinicio': self._melhorou_desde_reinicio}
+
+    # --- ESPAÇO DE BUSCA ---
+    def _para_vetor(self, params):
+        return self.espaco.codificar(params)
+
+    def _projetar(self, vetor):
+        """Prende nos limites, arredonda na malha (inteiros e índices de categóricos) e entra nas restrições lineares"""
+        return self.avaliador.projetar(vetor)
+
+    def _para_params(self, vetor):
+        return self.espaco.decodificar(np.asarray(vetor))
+
+    def _simplex_em_volta(self, x0):
+        """x0 + passo em cada eixo (para dentro do limite quando x0 está na borda)"""
+        x0 = self._projetar(x0)
+        passos = np.maximum(self.minimos, self.passos_iniciais * self.escala)
+        vertices = [x0]
+        for i in range(self.n):
+            y = x0.copy()
+            y[i] += passos[i]
+            if np.array_equal(self._projetar(y), x0): y[i] = x0[i] - passos[i]
+            vertices.append(self._projetar(y))
+        return np.array(vertices)
+
+    def _degenerado(self):
+        """Vértices repetidos ou simplex achatado (sem volume) depois da projeção na malha"""
+        if len({tuple(v) for v in self.vertices}) < len(self.vertices): return True
+        if np.all(np.ptp(self.vertices, axis=0) < self.minimos): return True  # Floats abaixo da precisão
+        diferencas = (self.vertices[1:] - self.vertices[0]) / self.espaco.faixas
+        return np.linalg.matrix_rank(diferencas, tol=1e-12) < self.n
+
+    # --- AVALIAÇÃO ---
+    def _custo(self, valor):
+        if valor is None: return np.inf
+        return -valor if self.objetivo == 'maximizar' else valor
+
+    def _registrar(self, params, valor):
+        if valor is None or not eh_melhor(valor, self.valor_melhor, self.objetivo): return
+        self.melhor, self.valor_melhor = params, valor
+        self._melhorou_desde_reinicio = True
+        print(f"  [Simplex] Novo Recorde: {valor:.4f}")
+
+    def _avaliar(self, vetor, pior=None):
+        """Um ponto. Com triagem, um ponto previsto bem pior que `pior` recebe a previsão sem rodar"""
+        params = self._para_params(vetor)
+        chave = tuple(vetor)
+        if chave in self._memo: return self._custo(self._memo[chave])
+        triagem = self.avaliador.triagem
+        if triagem is not None and pior is not None and np.isfinite(pior):
+            valor_pior = -pior if self.objetivo == 'maximizar' else pior
+            previsto = triagem.pular(params, valor_pior, self.objetivo)
+            if previsto is not None: return self._custo(previsto)
+        valor = self.avaliador.avaliar(params)
+        self._memo[chave] = valor
+        self._registrar(params, valor)
+        return self._custo(valor)
+
+    def _avaliar_varios(self, vetores):
+        """Simplex inicial / encolhimento: todos os pontos novos de uma vez"""
+        novos = [v for v in dict.fromkeys(tuple(v) for v in vetores) if v not in self._memo]
+        lista = [self._para_params(np.array(v)) for v in novos]
+        if self.avaliador.suporta_lote:
+            valores = self.avaliador.avaliar_lote(lista)
+        elif self.avaliador.suporta_concorrente and self.workers > 1:
+            valores = self.avaliador.avaliar_concorrente(lista, self.workers)
+        elif self._pool is not None:
+            valores = list(self._pool.map(self.avaliador.avaliar, lista))
+        else:
+            valores = [self.avaliador.avaliar(params) for params in lista]
+        for chave, params, valor in zip(novos, lista, valores):
+            self._memo[chave] = valor
+            self._registrar(params, valor)
+        return np.array([self._custo(self._memo[tuple(v)]) for v in vetores])
+
+    # --- LOOP PRINCIPAL ---
+    def _reiniciar(self):
+        """Novo simplex em volta do melhor vértice. False = convergiu"""
+        if self._melhorou_desde_reinicio:
+            self.escala = 1.0  # Ainda avançando: simplex do tamanho original
+        elif np.all(self.passos_iniciais * self.escala <= self.minimos):
+            return False
+        else:
+            self.escala /= 2
+        self.reinicios += 1
+        self._melhorou_desde_reinicio = False
+        melhor = self.vertices[int(np.argmin(self.custos))]
+        self.vertices = self._simplex_em_volta(melhor)
+        self.custos = self._avaliar_varios(self.vertices)
+        return True
+
+    def iterar(self):
+        """Um passo do Nelder-Mead. Retorna 'melhorou', 'sem melhoria', 'reiniciou' ou 'convergiu'"""
+        self.iteracao += 1
+        valor_antes = self.valor_melhor
+        ordem = np.argsort(self.custos, kind='stable')
+        self.vertices, self.custos = self.vertices[ordem], self.custos[ordem]
+        pior, segundo_pior, melhor = self.custos[-1], self.custos[-2], self.custos[0]
+        centroide = self.vertices[:-1].mean(axis=0)
+
+        xr = self._projetar(centroide + REFLEXAO * (centroide - self.vertices[-1]))
+        fr = self._avaliar(xr, pior)
+        if melhor <= fr < segundo_pior:
+            self.vertices[-1], self.custos[-1] = xr, fr
+        elif fr < melhor:
+            xe = self._projetar(centroide + EXPANSAO * (xr - centroide))
+            fe = self._avaliar(xe, pior) if not np.array_equal(xe, xr) else fr
+            self.vertices[-1], self.custos[-1] = (xe, fe) if fe < fr else (xr, fr)
+        else:
+            if fr < pior: xc = self._projetar(centroide + CONTRACAO * (xr - centroide))
+            else: xc = self._projetar(centroide + CONTRACAO * (self.vertices[-1] - centroide))
+            fc = self._avaliar(xc, pior)
+            if fc < min(fr, pior):
+                self.vertices[-1], self.custos[-1] = xc, fc
+            else:
+                encolhidos = self._projetar(self.vertices[0] + ENCOLHIMENTO * (self.vertices[1:] - self.vertices[0]))
+                self.vertices[1:], self.custos[1:] = encolhidos, self._avaliar_varios(encolhidos)
+
+        if self._degenerado():
+            if not self._reiniciar(): return 'convergiu'
+            return 'reiniciou'
+        return 'melhorou' if self.valor_melhor != valor_antes else 'sem melhoria'
+
+    def rodar(self, maxiter=None, criterios=None, ao_iterar=None):
+        """
+        Itera até convergir, esgotar maxiter ou um critério disparar. Retorna o motivo.
+        Ctrl+C é repassado; o melhor ponto continua em self.melhor/self.valor_melhor.
+        """
+        try:
+            while True:
+                if maxiter is not None and self.iteracao >= maxiter: return f"LIMITE DE ITERAÇÕES ({maxiter})"
+                resultado = self.iterar()
+                if resultado == 'reiniciou':
+                    print(f"  [Iteração {self.iteracao}] Simplex degenerado na malha: reiniciando "
+                          f"em volta de {self.valor_melhor} (escala {self.escala:g})")
+                if ao_iterar is not None: ao_iterar(self)
+                if resultado == 'convergiu':
+                    print(f"  [Iteração {self.iteracao}] Simplex na malha mínima sem melhoria ({self.valor_melhor}).")
+                    return "CONVERGIU (MALHA MÍNIMA)"
+                if criterios is not None:
+                    criterios.registrar_rodada(resultado == 'melhorou')
+                    motivo = criterios.verificar(self.valor_melhor, self.avaliador.avaliacoes)
+                    if motivo:
+                        print(f"  [Iteração {self.iteracao}] Critério de parada: {motivo}")
+                        return motivo
+        finally:
+            if self._pool is not None: self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,37 +1,25 @@
-import subprocess
-import copy
 import json
 import argparse
 import sys
 import time
-import os
 from datetime import datetime
+from cache_avaliacoes import abrir_cache, adicionar_argumentos_cache
+from trace_avaliacoes import abrir_trace, adicionar_argumentos_trace
+from metricas import abrir_metricas, adicionar_argumentos_metricas
+from triagem import abrir_triagem, adicionar_argumentos_triagem
+from avaliador import Avaliador
+from poll_paralelo import PollParalelo, adicionar_argumentos_poll
+from criterios_parada import adicionar_argumentos_parada, criterios_de_args, orcamento_do_poll
+from checkpoint import abrir_checkpoint, adicionar_argumentos_checkpoint
+from hooke_jeeves import HookeJeeves, adicionar_argumentos_motor
+
+CACHE_AVALIACOES = None  # Preenchido na execução principal (--cache / --sem-cache)
+TRACE_AVALIACOES = None  # Preenchido na execução principal (--trace)
 
 # ==============================================================================
-# 1. FUNÇÃO BLACK BOX (Executa o .exe)
+# 1. FUNÇÃO BLACK BOX (motor único em avaliador.py)
 # ==============================================================================
-def rodar_modelo_e_ler_saida(executavel, params_dict, lista_de_parametros):
-    command = [executavel]
-    try:
-        for param_info in lista_de_parametros:
-            valor = params_dict[param_info['nome']]
-            command.append(str(valor))
-    except KeyError: return None
-        
-    try:
-        if not os.path.exists(executavel): return None
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        output = result.stdout.strip()
-        
-        # Tenta ler formato "Valor de saída:"
-        for line in output.splitlines():
-            if 'Valor de saída:' in line:
-                return float(line.split(':')[-1].strip())
-        
-        # Tenta ler número puro
-        if output: return float(output)
-        return None
-    except: return None
+AVALIADOR = None  # Criado na execução principal a partir do JSON
 
 # ==============================================================================
 # 2. GERADOR DE RELATÓRIO
@@ -51,9 +39,13 @@ Modelo         : {dados['modelo']}
 Objetivo       : {dados['objetivo'].upper()}
 Status         : {dados['status']}
 Iterações      : {dados['iteracoes']}
+Avaliações     : {dados['avaliacoes']}
 --------------------------------------------------------------------------------
 MELHOR RESULTADO: {dados['resultado']}
-Tempo Total     : {dados['tempo']:.2f}s
+Tempo Total     : {dados['tempo_total']:.2f}s
+--------------------------------------------------------------------------------
+DESEMPENHO DAS AVALIAÇÕES:
+{dados['metricas']}
 --------------------------------------------------------------------------------
 PARÂMETROS IDEAIS:
 {json.dumps(dados['params'], indent=4)}
@@ -67,8 +59,13 @@ PARÂMETROS IDEAIS:
 # ==============================================================================
 # 3. LÓGICA PATTERN SEARCH (ADAPTATIVA + INFINITA)
 # ==============================================================================
-def pattern_search_infinito(config, objetivo_escolhido):
-    executavel = config['executavel']
+def gerar_vizinhos(base, passos_atuais):
+    """Lista os vizinhos coordenados do ponto atual como (nome, valor, params)"""
+    # Passos abaixo do mínimo (inteiro 1, float 0.001) são protegidos
+    return AVALIADOR.vizinhos(base, passos_atuais)
+
+def pattern_search_infinito(config, objetivo_escolhido, workers=1, modo_poll='oportunista', criterios=None, monitorar=False,
+                            checkpoint=None, motor='pattern'):
     params_lista = config['parametros']
     
     # Inicializa passos (smart step)
@@ -79,66 +76,70 @@ def pattern_search_infinito(config, objetivo_escolhido):
     # Ponto de partida
     params_iniciais = {p['nome']: p['valor_inicial'] for p in params_lista}
     
-    print(f"\n>>> INICIANDO PATTERN SEARCH (SMART & INFINITO) <<<")
-    print(f"Objetivo: {objetivo_escolhido.upper()}")
+    print("\n>>> INICIANDO PATTERN SEARCH (SMART & INFINITO) <<<")
+    print(f"Objetivo: {objetivo_escolhido.upper()} | Motor: {motor} | Poll: {modo_poll} ({workers} worker(s))")
+    if monitorar: print("(Modo monitorar: roda até Ctrl+C, mesmo depois de convergir)")
     print("(Pressione Ctrl+C a qualquer momento para PARAR e GERAR O RELATÓRIO)")
     
-    valor_inicial = rodar_modelo_e_ler_saida(executavel, params_iniciais, params_lista)
-    
-    if valor_inicial is None:
-        print("ERRO: Falha ao rodar o modelo inicial.")
-        return params_iniciais, 0, 0, "ERRO"
+    salvo = checkpoint.estado.get('pattern') if checkpoint is not None else None
+    if salvo:
+        # Retomada: continua do incumbente e dos passos do último checkpoint
+        melhores_params = salvo['melhores_params']
+        melhor_resultado = salvo['melhor_resultado']
+        passos_atuais = salvo['passos_atuais']
+        iteracao = salvo['iteracao']
+        print(f"-> Retomando da iteração {iteracao}: {melhor_resultado}")
+    else:
+        valor_inicial = AVALIADOR.avaliar(params_iniciais)
+        
+        if valor_inicial is None:
+            print("ERRO: Falha ao rodar o modelo inicial.")
+            return params_iniciais, 0, "ERRO", 0
 
-    print(f"-> Valor Inicial: {valor_inicial}")
+        print(f"-> Valor Inicial: {valor_inicial}")
+
+        melhores_params = dict(params_iniciais)
+        melhor_resultado = valor_inicial
+        iteracao = 0
 
-    melhores_params = copy.deepcopy(params_iniciais)
-    melhor_resultado = valor_inicial
-    
-    iteracao = 0
     status = "CONCLUÍDO"
 
+    avaliar_lote = AVALIADOR.avaliar_lote if AVALIADOR.suporta_lote else None
+    avaliar_concorrente = AVALIADOR.avaliar_concorrente if AVALIADOR.suporta_concorrente else None
+    poll = PollParalelo(workers, modo_poll, avaliar_lote, AVALIADOR.metricas, avaliar_concorrente, AVALIADOR.triagem,
+                        AVALIADOR.viaveis, orcamento_do_poll(criterios, AVALIADOR))
+
+    if motor == 'hooke-jeeves':
+        hj = HookeJeeves(AVALIADOR, objetivo_escolhido, poll, estado={
+            'melhores_params': melhores_params, 'melhor_resultado': melhor_resultado,
+            'passos_atuais': passos_atuais, 'iteracao': iteracao})
+        salvar = (lambda m: checkpoint.salvar_periodico(pattern=m.estado())) if checkpoint is not None else None
+        try:
+            motivo = hj.rodar(criterios, monitorar, salvar)
+            status = motivo if motivo.startswith("CONVERGIU") else f"PARADA: {motivo}"
+        except KeyboardInterrupt:
+            print("\n\n🛑 PARADA MANUAL (Ctrl+C) DETECTADA!")
+            status = "INTERROMPIDO PELO USUÁRIO"
+        finally:
+            poll.fechar()
+        return hj.base, hj.valor_base, status, hj.iteracao
+
     try:
-        while True: # Loop Infinito
+        while True: # Até um critério de parada (ou Ctrl+C)
             iteracao += 1
             houve_melhoria = False
             
-            for p in params_lista:
-                nome = p['nome']
-                tipo = p['tipo']
-                base = copy.deepcopy(melhores_params)
-                
-                candidatos = []
-                if tipo == 'categorico':
-                    candidatos = [v for v in p['limites'] if v != base[nome]]
-                else:
-                    passo = passos_atuais[nome]
-                    # Proteção passo mínimo
-                    if tipo == 'inteiro' and passo < 1: passo = 1
-                    if tipo == 'float' and passo < 0.001: passo = 0.001
-
-                    vals = [base[nome] + passo, base[nome] - passo]
-                    if tipo == 'inteiro': vals = [int(round(v)) for v in vals]
-                    mini, maxi = p['limites']
-                    candidatos = [v for v in vals if mini <= v <= maxi]
-
-                for val_teste in candidatos:
-                    teste = copy.deepcopy(base)
-                    teste[nome] = val_teste
-                    res = rodar_modelo_e_ler_saida(executavel, teste, params_lista)
-                    if res is None: continue
-
-                    melhorou = False
-                    if objetivo_escolhido == 'maximizar' and res > melhor_resultado: melhorou = True
-                    if objetivo_escolhido == 'minimizar' and res < melhor_resultado: melhorou = True
-                    
-                    if melhorou:
-                        print(f"  [Iteração {iteracao}] ✨ MELHORIA! {nome}: {val_teste} (Passo {passos_atuais.get(nome)}) -> {res}")
-                        melhor_resultado = res
-                        melhores_params = copy.deepcopy(teste)
-                        houve_melhoria = True
-                        base = copy.deepcopy(melhores_params) 
-
-            if not houve_melhoria:
+            vizinhos = gerar_vizinhos(melhores_params, passos_atuais)
+            indice, res = poll.avaliar(AVALIADOR.avaliar, [v[2] for v in vizinhos], melhor_resultado, objetivo_escolhido)
+
+            if indice is not None:
+                nome, val_teste, teste = vizinhos[indice]
+                print(f"  [Iteração {iteracao}] ✨ MELHORIA! {nome}: {val_teste} (Passo {passos_atuais.get(nome)}) -> {res}")
+                melhor_resultado = res
+                melhores_params = teste
+                houve_melhoria = True
+
+            if not houve_melhoria and not poll.esgotado: # Poll cortado pelo --max-avaliacoes não reduz passos
                 # Tenta refinar o passo antes de desistir
                 reduziu_algum = False
                 for p in params_lista:
@@ -152,15 +153,33 @@ def pattern_search_infinito(config, objetivo_escolhido):
                 
                 if reduziu_algum:
                     print(f"  [Iteração {iteracao}] Refinando passos para maior precisão...")
-                else:
-                    # Se já refinou tudo, fica monitorando
+                elif monitorar:
+                    # Se já refinou tudo, fica monitorando (útil só para modelos com ruído)
                     sys.stdout.write(f"\r  [Iteração {iteracao}] Topo alcançado ({melhor_resultado}). Monitorando...")
                     sys.stdout.flush()
                     time.sleep(0.5) 
+                else:
+                    print(f"  [Iteração {iteracao}] Topo alcançado ({melhor_resultado}) com a malha mínima.")
+                    status = "CONVERGIU (MALHA MÍNIMA)"
+                    break
+
+            if checkpoint is not None:
+                checkpoint.salvar_periodico(pattern={'melhores_params': melhores_params, 'melhor_resultado': melhor_resultado,
+                                                     'passos_atuais': passos_atuais, 'iteracao': iteracao})
+
+            if criterios is not None:
+                criterios.registrar_rodada(houve_melhoria)
+                motivo = criterios.verificar(melhor_resultado, AVALIADOR.avaliacoes)
+                if motivo:
+                    print(f"  [Iteração {iteracao}] Critério de parada: {motivo}")
+                    status = f"PARADA: {motivo}"
+                    break
                 
     except KeyboardInterrupt:
         print("\n\n🛑 PARADA MANUAL (Ctrl+C) DETECTADA!")
         status = "INTERROMPIDO PELO USUÁRIO"
+    finally:
+        poll.fechar()
     
     return melhores_params, melhor_resultado, status, iteracao
 
@@ -169,19 +188,44 @@ def pattern_search_infinito(config, objetivo_escolhido):
 # ==============================================================================
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument('-c', '--config', required=True, help="Arquivo JSON")
+    parser.add_argument('-c', '--config', help="Arquivo JSON")
     parser.add_argument('--max', action='store_true', help="Maximizar")
     parser.add_argument('--min', action='store_true', help="Minimizar")
+    adicionar_argumentos_cache(parser)
+    adicionar_argumentos_trace(parser)
+    adicionar_argumentos_metricas(parser)
+    adicionar_argumentos_poll(parser)
+    adicionar_argumentos_parada(parser)
+    parser.add_argument('--monitorar', action='store_true', help="Não para ao convergir (modelos com ruído)")
+    adicionar_argumentos_checkpoint(parser)
+    adicionar_argumentos_motor(parser)
+    adicionar_argumentos_triagem(parser)
     args = parser.parse_args()
+    if not args.config and not args.resume: parser.error("informe --config (ou --resume RUN_ID)")
+    CACHE_AVALIACOES = abrir_cache(args)
+    TRACE_AVALIACOES = abrir_trace(args)
 
+    checkpoint = None
+    if args.resume:
+        try: checkpoint = abrir_checkpoint(args, 'pattern')
+        except ValueError as e:
+            print(e); sys.exit(1)
+        CONFIG = checkpoint.estado['config']
+    else:
+        try:
+            with open(args.config, 'r', encoding='utf-8') as f: CONFIG = json.load(f)
+        except: 
+            print("Erro ao abrir arquivo de configuração."); sys.exit(1)
     try:
-        with open(args.config, 'r', encoding='utf-8') as f: CONFIG = json.load(f)
-    except: 
-        print("Erro ao abrir arquivo de configuração."); sys.exit(1)
+        AVALIADOR = Avaliador(CONFIG, CACHE_AVALIACOES, TRACE_AVALIACOES, abrir_metricas(args))
+        abrir_triagem(args, AVALIADOR)
+    except Exception as e:
+        print(f"Erro ao preparar o avaliador: {e}"); sys.exit(1)
     
     # Lógica de Escolha
     obj = None
-    if args.max: obj = 'maximizar'
+    if checkpoint is not None: obj = checkpoint.estado['objetivo']
+    elif args.max: obj = 'maximizar'
     elif args.min: obj = 'minimizar'
     else:
         print("\n" + "="*50)
@@ -198,22 +242,35 @@ if __name__ == "__main__":
                 else: print("Opção inválida.\n")
             except KeyboardInterrupt: sys.exit(0)
 
+    if checkpoint is None:
+        try: checkpoint = abrir_checkpoint(args, 'pattern', CONFIG, obj)
+        except ValueError as e:
+            print(e); sys.exit(1)
+    print(f"Execução: {checkpoint.run_id} (para retomar: --resume {checkpoint.run_id})")
+
     # Inicia Cronômetro
     inicio = time.time()
     
     # Roda o motor
-    params, res, status, iters = pattern_search_infinito(CONFIG, obj)
+    criterios = criterios_de_args(args, obj)
+    motor = checkpoint.estado.get('motor', args.motor)  # Na retomada, o motor é o da execução original
+    checkpoint.salvar(motor=motor)
+    params, res, status, iters = pattern_search_infinito(CONFIG, obj, args.workers, args.poll, criterios, args.monitorar,
+                                                         checkpoint, motor)
+    checkpoint.salvar(status=status)
     
     tempo = time.time() - inicio
 
     # Prepara dados para o relatório
     dados_relatorio = {
         'modelo': CONFIG['executavel'],
-        'config_file': args.config,
+        'config_file': args.config or checkpoint.estado.get('config_file'),
         'objetivo': obj,
         'status': status,
         'tempo_total': tempo,
         'iteracoes': iters,
+        'avaliacoes': AVALIADOR.avaliacoes,
+        'metricas': AVALIADOR.texto_desempenho(),
         'resultado': res,
         'params': params
     }
@@ -223,8 +280,12 @@ if __name__ == "__main__":
     print(f"RESULTADO FINAL ({obj.upper()})")
     print(f"Valor: {res}")
     print(f"Tempo: {tempo:.2f}s")
+    print(f"Status: {status} | Avaliações: {AVALIADOR.avaliacoes} ({AVALIADOR.execucoes} execuções do modelo)")
+    if CACHE_AVALIACOES is not None: print(f"Cache: {CACHE_AVALIACOES.resumo()}")
+    if AVALIADOR.triagem is not None: print(f"Triagem: {AVALIADOR.triagem.resumo()}")
     print(json.dumps(params, indent=4))
     print("="*50)
 
     # Gera o arquivo
+    AVALIADOR.fechar()
     gerar_relatorio_arquivo(dados_relatorio)
\ No newline at end of file
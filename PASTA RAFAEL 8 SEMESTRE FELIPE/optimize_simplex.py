@@ -1,75 +1,38 @@
-import subprocess
 import json
 import argparse
 import sys
 import time
-import logging
 from datetime import datetime
 import numpy as np
 from scipy.optimize import minimize
+from cache_avaliacoes import abrir_cache, adicionar_argumentos_cache
+from trace_avaliacoes import abrir_trace, adicionar_argumentos_trace
+from metricas import abrir_metricas, adicionar_argumentos_metricas
+from triagem import abrir_triagem, adicionar_argumentos_triagem
+from avaliador import Avaliador
+from checkpoint import abrir_checkpoint, adicionar_argumentos_checkpoint
+from criterios_parada import adicionar_argumentos_parada, criterios_de_args
+from nelder_mead import NelderMead, adicionar_argumentos_simplex
+
+CACHE_AVALIACOES = None  # Preenchido na execução principal (--cache / --sem-cache)
+TRACE_AVALIACOES = None  # Preenchido na execução principal (--trace)
 
 # ==============================================================================
-# 1. FUNÇÃO BLACK BOX (Executa o .exe)
+# 1. FUNÇÃO BLACK BOX (motor único em avaliador.py)
 # ==============================================================================
-def rodar_modelo_e_ler_saida(executavel, params_dict, lista_de_parametros):
-    command = [executavel]
-    try:
-        for param_info in lista_de_parametros:
-            nome_param = param_info['nome']
-            valor = params_dict[nome_param]
-            command.append(str(valor))
-    except KeyError: return None
-        
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        output_completo = result.stdout.strip()
-        for line in output_completo.splitlines():
-            if 'Valor de saída:' in line:
-                try: return float(line.split(':')[-1].strip())
-                except: pass
-        return float(output_completo)
-    except Exception: return None
+AVALIADOR = None  # Criado na execução principal a partir do JSON
 
 # ==============================================================================
 # 2. TRADUTOR (SCIPY <-> JSON)
 # O Simplex só entende vetor de números. Precisamos converter tudo.
 # ==============================================================================
-def params_to_vector(params_dict, config_params):
-    """Converte o dicionário legível para um vetor numérico [1.0, 2.5, 0.0]"""
-    vector = []
-    for p in config_params:
-        val = params_dict[p['nome']]
-        if p['tipo'] == 'categorico':
-            # Converte texto para o índice (ex: 'medio' -> 1.0)
-            try: vector.append(float(p['limites'].index(val)))
-            except: vector.append(0.0)
-        else:
-            vector.append(float(val))
-    return np.array(vector)
-
-def vector_to_params(vector, config_params):
-    """Converte o vetor numérico de volta para o dicionário do .exe"""
-    params_dict = {}
-    for i, p in enumerate(config_params):
-        val_num = vector[i]
-        
-        if p['tipo'] == 'categorico':
-            # Arredonda e pega o texto correspondente
-            idx = int(round(val_num))
-            idx = max(0, min(idx, len(p['limites']) - 1)) # Garante limites
-            params_dict[p['nome']] = p['limites'][idx]
-            
-        elif p['tipo'] == 'inteiro':
-            # Arredonda e aplica limites
-            mini, maxi = p['limites']
-            val_int = int(round(val_num))
-            params_dict[p['nome']] = max(mini, min(val_int, maxi))
-            
-        elif p['tipo'] == 'float':
-            mini, maxi = p['limites']
-            params_dict[p['nome']] = max(mini, min(val_num, maxi))
-            
-    return params_dict
+def params_to_vector(params_dict):
+    """Converte o dicionário legível para um vetor numérico [1.0, 2.5, 0.0] (categórico -> índice, ex: 'medio' -> 1.0)"""
+    return AVALIADOR.espaco.codificar(params_dict)
+
+def vector_to_params(vector):
+    """Converte o vetor numérico de volta para o dicionário do .exe (arredonda, aplica os limites e as restrições lineares)"""
+    return AVALIADOR.espaco.decodificar(AVALIADOR.projetar(vector))
 
 # ==============================================================================
 # 3. ALGORITMO SIMPLEX (NELDER-MEAD)
@@ -77,16 +40,41 @@ def vector_to_params(vector, config_params):
 CONFIG_GLOBAL = {}
 OBJETIVO_GLOBAL = 'maximizar'
 MELHOR_RESULTADO_CACHE = -float('inf')
+MELHORES_PARAMS = None  # Parâmetros do recorde atual (reportados mesmo no Ctrl+C)
+CHECKPOINT = None
+ITERACOES_FEITAS = 0    # Iterações de execuções anteriores (retomada) + desta
+MAXITER_SCIPY = 100     # Limite do motor scipy sem --maxiter (o nativo para sozinho ao convergir)
+PRE_AVALIADOS = {}  # Vértices iniciais avaliados em lote: tupla de argumentos -> resultado
+
+def simplex_inicial(x0):
+    """Mesmo simplex inicial que o SciPy monta por padrão (x0 + 5% em cada eixo)"""
+    sim = [np.array(x0, dtype=float)]
+    for k in range(len(x0)):
+        y = np.array(x0, dtype=float)
+        y[k] = (1 + 0.05) * y[k] if y[k] != 0 else 0.00025
+        sim.append(y)
+    return np.array(sim)
+
+def pre_avaliar_em_lote(vetores):
+    """Roda todos os vértices numa única execução do .exe (modo lote do JSON)"""
+    lista = [vector_to_params(v) for v in vetores]
+    resultados = AVALIADOR.avaliar_lote(lista)
+    for params, res in zip(lista, resultados):
+        if res is not None:
+            PRE_AVALIADOS[AVALIADOR.espaco.chave(params)] = res
 
 def funcao_objetivo_scipy(vector):
     """Esta é a função que o SciPy vai tentar MINIMIZAR"""
-    global MELHOR_RESULTADO_CACHE
+    global MELHOR_RESULTADO_CACHE, MELHORES_PARAMS
     
     # 1. Traduz vetor para parametros
-    params = vector_to_params(vector, CONFIG_GLOBAL['parametros'])
+    params = vector_to_params(vector)
     
-    # 2. Roda o modelo
-    resultado = rodar_modelo_e_ler_saida(CONFIG_GLOBAL['executavel'], params, CONFIG_GLOBAL['parametros'])
+    # 2. Roda o modelo (ou usa o valor já calculado no lote inicial)
+    chave = AVALIADOR.espaco.chave(params)
+    resultado = PRE_AVALIADOS.get(chave)
+    if resultado is None:
+        resultado = AVALIADOR.avaliar(params)
     
     # Se der erro no .exe, retornamos um valor "ruim" (infinito)
     if resultado is None:
@@ -96,14 +84,28 @@ def funcao_objetivo_scipy(vector):
     if OBJETIVO_GLOBAL == 'maximizar':
         if resultado > MELHOR_RESULTADO_CACHE:
             MELHOR_RESULTADO_CACHE = resultado
+            MELHORES_PARAMS = params
             print(f"  [Simplex] Novo Recorde: {resultado:.4f}")
         return -resultado # SciPy só minimiza, então invertemos o sinal para maximizar
     else:
         if resultado < MELHOR_RESULTADO_CACHE or MELHOR_RESULTADO_CACHE == -float('inf'):
             MELHOR_RESULTADO_CACHE = resultado
+            MELHORES_PARAMS = params
             print(f"  [Simplex] Novo Recorde: {resultado:.4f}")
         return resultado
 
+def salvar_checkpoint_iteracao(xk):
+    """Callback do SciPy (uma vez por iteração): grava o melhor vértice e o recorde"""
+    global ITERACOES_FEITAS
+    ITERACOES_FEITAS += 1
+    if CHECKPOINT is None: return
+    CHECKPOINT.salvar_periodico(simplex={
+        'x': [float(v) for v in xk],
+        'iteracoes': ITERACOES_FEITAS,
+        'melhor_resultado': MELHOR_RESULTADO_CACHE,
+        'melhores_params': MELHORES_PARAMS,
+    })
+
 # ==============================================================================
 # 4. GERADOR DE RELATÓRIO
 # ==============================================================================
@@ -119,6 +121,7 @@ Data e Hora           : {datetime.now().strftime("%d/%m/%Y às %H:%M:%S")}
 Modelo Otimizado      : {dados['modelo']}
 Objetivo              : {dados['objetivo'].upper()}
 Status                : {dados['status']}
+Motor                 : {dados['motor']}
 
 --------------------------------------------------------------------------------
                             ESTATÍSTICAS
@@ -127,6 +130,11 @@ Tempo Total           : {dados['tempo']:.2f} segundos
 Número de Iterações   : {dados['iteracoes']}
 VALOR FINAL ALCANÇADO : {dados['resultado_final']}
 
+--------------------------------------------------------------------------------
+                          DESEMPENHO DAS AVALIAÇÕES
+--------------------------------------------------------------------------------
+{dados['metricas']}
+
 --------------------------------------------------------------------------------
                        MELHOR COMBINAÇÃO DE PARÂMETROS
 --------------------------------------------------------------------------------
@@ -141,20 +149,39 @@ VALOR FINAL ALCANÇADO : {dados['resultado_final']}
 # ==============================================================================
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument('-c', '--config', type=str, required=True)
+    parser.add_argument('-c', '--config', type=str)
     # Simplex não tem "trials" fixos, ele roda até convergir, mas podemos por limite
-    parser.add_argument('--maxiter', type=int, default=100, help="Máximo de iterações do Simplex")
+    parser.add_argument('--maxiter', type=int, default=None,
+                        help=f"Máximo de iterações do Simplex (padrão: nativo sem limite, scipy {MAXITER_SCIPY})")
     group = parser.add_mutually_exclusive_group(required=False)
     group.add_argument('--max', action='store_true')
     group.add_argument('--min', action='store_true')
+    adicionar_argumentos_cache(parser)
+    adicionar_argumentos_trace(parser)
+    adicionar_argumentos_metricas(parser)
+    adicionar_argumentos_checkpoint(parser)
+    adicionar_argumentos_triagem(parser)
+    adicionar_argumentos_simplex(parser)
+    adicionar_argumentos_parada(parser)
     args = parser.parse_args()
+    if not args.config and not args.resume: parser.error("informe --config (ou --resume RUN_ID)")
+    CACHE_AVALIACOES = abrir_cache(args)
+    TRACE_AVALIACOES = abrir_trace(args)
 
-    try:
-        with open(args.config, 'r', encoding='utf-8') as f: CONFIG_GLOBAL = json.load(f)
-    except: sys.exit("Erro no config json")
+    if args.resume:
+        try: CHECKPOINT = abrir_checkpoint(args, 'simplex')
+        except ValueError as e: sys.exit(str(e))
+        CONFIG_GLOBAL = CHECKPOINT.estado['config']
+    else:
+        try:
+            with open(args.config, 'r', encoding='utf-8') as f: CONFIG_GLOBAL = json.load(f)
+        except: sys.exit("Erro no config json")
+    try: AVALIADOR = Avaliador(CONFIG_GLOBAL, CACHE_AVALIACOES, TRACE_AVALIACOES, abrir_metricas(args))
+    except Exception as e: sys.exit(f"Erro ao preparar o avaliador: {e}")
 
     # Definição do Objetivo
-    if args.max: OBJETIVO_GLOBAL = 'maximizar'
+    if CHECKPOINT is not None: OBJETIVO_GLOBAL = CHECKPOINT.estado['objetivo']
+    elif args.max: OBJETIVO_GLOBAL = 'maximizar'
     elif args.min: OBJETIVO_GLOBAL = 'minimizar'
     else:
         while True:
@@ -169,58 +196,109 @@ if __name__ == "__main__":
     # Configura valor inicial cache (para printar corretamente)
     if OBJETIVO_GLOBAL == 'minimizar': MELHOR_RESULTADO_CACHE = float('inf')
     else: MELHOR_RESULTADO_CACHE = -float('inf')
+    if CHECKPOINT is None:
+        try: CHECKPOINT = abrir_checkpoint(args, 'simplex', CONFIG_GLOBAL, OBJETIVO_GLOBAL)
+        except ValueError as e: sys.exit(str(e))
 
-    print(f"\n--- INICIANDO SIMPLEX (NELDER-MEAD) ---")
+    print("\n--- INICIANDO SIMPLEX (NELDER-MEAD) ---")
     print(f"Alvo: {CONFIG_GLOBAL['executavel']} | Modo: {OBJETIVO_GLOBAL.upper()}")
+    print(f"Execução: {CHECKPOINT.run_id} (para retomar: --resume {CHECKPOINT.run_id})")
     
-    # Ponto Inicial (x0) - Pega do JSON
+    motor = CHECKPOINT.estado.get('motor', args.motor)  # Na retomada, o motor é o da execução original
+    CHECKPOINT.salvar(motor=motor)
+    print(f"Motor: {motor}")
+    # Triagem só no nativo: o SciPy trataria a previsão como um valor medido do .exe
+    if motor == 'nativo': abrir_triagem(args, AVALIADOR)
+    elif args.triagem: print("[TRIAGEM] Ignorada com --motor scipy (use --motor nativo)")
+
+    # Ponto Inicial (x0) - Pega do JSON (ou do último checkpoint, na retomada)
     params_iniciais_dict = {p['nome']: p['valor_inicial'] for p in CONFIG_GLOBAL['parametros']}
-    x0 = params_to_vector(params_iniciais_dict, CONFIG_GLOBAL['parametros'])
+    x0 = params_to_vector(params_iniciais_dict)
+    maxiter_scipy = args.maxiter if args.maxiter is not None else MAXITER_SCIPY
+    maxiter_restante = maxiter_scipy
+    salvo = CHECKPOINT.estado.get('simplex')
+    if motor == 'scipy' and salvo:
+        x0 = np.array(salvo['x'])
+        ITERACOES_FEITAS = salvo['iteracoes']
+        maxiter_restante = max(1, maxiter_scipy - ITERACOES_FEITAS)
+        if salvo['melhores_params'] is not None:
+            MELHOR_RESULTADO_CACHE = salvo['melhor_resultado']
+            MELHORES_PARAMS = salvo['melhores_params']
+        print(f"-> Retomando da iteração {ITERACOES_FEITAS} (recorde {MELHOR_RESULTADO_CACHE}), {maxiter_restante} iterações restantes")
+    sim0 = simplex_inicial(x0)
     
     inicio = time.time()
     status_msg = "SUCESSO"
+    nm = None
     
     try:
-        # CHAMA O SCIPY MINIMIZE (COM MÉTODO NELDER-MEAD)
-        res = minimize(
-            funcao_objetivo_scipy, 
-            x0, 
-            method='Nelder-Mead',
-            options={'maxiter': args.maxiter, 'disp': True} # disp=True mostra log do scipy
-        )
-        
-        # Recupera resultados
-        vetor_final = res.x
-        params_finais = vector_to_params(vetor_final, CONFIG_GLOBAL['parametros'])
-        
-        # Recalcula valor final exato
-        resultado_final = rodar_modelo_e_ler_saida(CONFIG_GLOBAL['executavel'], params_finais, CONFIG_GLOBAL['parametros'])
+        if motor == 'nativo':
+            salvo = CHECKPOINT.estado.get('nativo')
+            if salvo: print(f"-> Retomando da iteração {salvo['iteracao']} (recorde {salvo['melhor_resultado']})")
+            nm = NelderMead(AVALIADOR, OBJETIVO_GLOBAL, args.workers, params_iniciais_dict, salvo)
+            status_msg = nm.rodar(args.maxiter, criterios_de_args(args, OBJETIVO_GLOBAL),
+                                  ao_iterar=lambda m: CHECKPOINT.salvar_periodico(nativo=m.estado()))
+            params_finais, resultado_final = nm.melhor, nm.valor_melhor
+            ITERACOES_FEITAS = nm.iteracao
+        else:
+            if AVALIADOR.suporta_lote:
+                print(f"Avaliando os {len(sim0)} vértices iniciais em lote...")
+                pre_avaliar_em_lote(sim0)
+
+            # CHAMA O SCIPY MINIMIZE (COM MÉTODO NELDER-MEAD)
+            res = minimize(
+                funcao_objetivo_scipy, 
+                x0, 
+                method='Nelder-Mead',
+                callback=salvar_checkpoint_iteracao,
+                options={'maxiter': maxiter_restante, 'disp': True, 'initial_simplex': sim0} # disp=True mostra log do scipy
+            )
+            
+            # Recupera resultados
+            vetor_final = res.x
+            params_finais = vector_to_params(vetor_final)
+            
+            # Recalcula valor final exato
+            resultado_final = AVALIADOR.avaliar(params_finais)
 
     except KeyboardInterrupt:
         print("\n⚠️ Interrompido pelo usuário! Salvando melhor estado...")
         status_msg = "INTERROMPIDO"
-        resultado_final = MELHOR_RESULTADO_CACHE
-        # Como não temos o vetor exato do crash, usamos o x0 ou o último printado visualmente
-        # (Limitação do scipy: ele não devolve o x corrente no crash facilmente)
-        params_finais = "Verificar último log de recorde" 
+        if nm is not None and nm.melhor is not None:
+            # O motor nativo guarda o melhor ponto avaliado e o simplex atual
+            resultado_final, params_finais = nm.valor_melhor, nm.melhor
+            ITERACOES_FEITAS = nm.iteracao
+            CHECKPOINT.salvar(nativo=nm.estado())
+        elif MELHORES_PARAMS is not None:
+            resultado_final = MELHOR_RESULTADO_CACHE
+            # O SciPy não devolve o x corrente na interrupção, mas o recorde é guardado a cada avaliação
+            params_finais = MELHORES_PARAMS
+        else:
+            # Ctrl+C ainda no simplex inicial: o melhor que o Avaliador já recebeu
+            params_finais, resultado_final = AVALIADOR.melhor(OBJETIVO_GLOBAL)
+            if params_finais is None: params_finais, resultado_final = params_iniciais_dict, None
 
     tempo_gasto = time.time() - inicio
+    AVALIADOR.fechar()
+    CHECKPOINT.salvar(status=status_msg)
 
     print("\n" + "="*60)
     print(f" RESULTADO SIMPLEX ({status_msg})")
     print(f" VALOR FINAL: {resultado_final}")
     print(f" TEMPO: {tempo_gasto:.2f}s")
-    if status_msg != "INTERROMPIDO":
-        print(json.dumps(params_finais, indent=4))
+    if CACHE_AVALIACOES is not None: print(f" CACHE: {CACHE_AVALIACOES.resumo()}")
+    if AVALIADOR.triagem is not None: print(f" TRIAGEM: {AVALIADOR.triagem.resumo()}")
+    print(json.dumps(params_finais, indent=4))
     print("="*60)
 
-    if status_msg != "INTERROMPIDO":
-        gerar_relatorio({
-            'modelo': CONFIG_GLOBAL['executavel'],
-            'objetivo': OBJETIVO_GLOBAL,
-            'status': status_msg,
-            'tempo': tempo_gasto,
-            'iteracoes': res.nit if 'nit' in res else args.maxiter,
-            'resultado_final': resultado_final,
-            'params_finais': params_finais
-        })
\ No newline at end of file
+    gerar_relatorio({
+        'modelo': CONFIG_GLOBAL['executavel'],
+        'objetivo': OBJETIVO_GLOBAL,
+        'status': status_msg,
+        'motor': motor,
+        'tempo': tempo_gasto,
+        'iteracoes': ITERACOES_FEITAS,
+        'resultado_final': resultado_final,
+        'params_finais': params_finais,
+        'metricas': AVALIADOR.texto_desempenho()
+    })
\ No newline at end of file
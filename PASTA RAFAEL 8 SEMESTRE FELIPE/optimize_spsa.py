@@ -0,0 +1,188 @@
+import json
+import argparse
+import sys
+import time
+from datetime import datetime
+from cache_avaliacoes import abrir_cache, adicionar_argumentos_cache
+from trace_avaliacoes import abrir_trace, adicionar_argumentos_trace
+from metricas import abrir_metricas, adicionar_argumentos_metricas
+from avaliador import Avaliador
+from criterios_parada import adicionar_argumentos_parada, criterios_de_args
+from checkpoint import abrir_checkpoint, adicionar_argumentos_checkpoint
+from spsa import SPSA, adicionar_argumentos_spsa, validar_argumentos_spsa
+
+CACHE_AVALIACOES = None  # Preenchido na execução principal (--cache / --sem-cache)
+TRACE_AVALIACOES = None  # Preenchido na execução principal (--trace)
+
+# ==============================================================================
+# 1. FUNÇÃO BLACK BOX (motor único em avaliador.py)
+# ==============================================================================
+AVALIADOR = None  # Criado na execução principal a partir do JSON
+
+# ==============================================================================
+# 2. GERADOR DE RELATÓRIO
+# ==============================================================================
+def gerar_relatorio_arquivo(dados):
+    """Gera um arquivo .txt com os dados da otimização"""
+    data_hora = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    nome_modelo = dados['modelo'].replace('.exe', '')
+    nome_arquivo = f"relatorio_SPSA_{nome_modelo}_{data_hora}.txt"
+
+    conteudo = f"""
+================================================================================
+               RELATÓRIO: SPSA (GRADIENTE POR PERTURBAÇÃO SIMULTÂNEA)
+================================================================================
+Data           : {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}
+Modelo         : {dados['modelo']}
+Objetivo       : {dados['objetivo'].upper()}
+Status         : {dados['status']}
+Gradiente      : {dados['gradiente']}
+Iterações      : {dados['iteracoes']}
+Avaliações     : {dados['avaliacoes']}
+--------------------------------------------------------------------------------
+MELHOR RESULTADO: {dados['resultado']}
+Tempo Total     : {dados['tempo_total']:.2f}s
+--------------------------------------------------------------------------------
+DESEMPENHO DAS AVALIAÇÕES:
+{dados['metricas']}
+--------------------------------------------------------------------------------
+PARÂMETROS IDEAIS:
+{json.dumps(dados['params'], indent=4)}
+================================================================================
+"""
+    try:
+        with open(nome_arquivo, 'w', encoding='utf-8') as f: f.write(conteudo)
+        print(f"\n📄 Relatório salvo: {nome_arquivo}")
+    except: pass
+
+# ==============================================================================
+# 3. EXECUÇÃO DO SPSA
+# ==============================================================================
+def otimizar_spsa(config, objetivo_escolhido, args, criterios=None, checkpoint=None):
+    """Retorna (melhores_params, melhor_resultado, status, iteracoes)"""
+    params_lista = config['parametros']
+    params_iniciais = {p['nome']: p['valor_inicial'] for p in params_lista}
+    gradiente = checkpoint.estado['gradiente']
+
+    print("\n>>> INICIANDO SPSA <<<")
+    print(f"Objetivo: {objetivo_escolhido.upper()} | Gradiente: {gradiente} | {args.workers} worker(s)")
+    if args.monitorar: print("(Modo monitorar: roda até Ctrl+C, mesmo depois de convergir)")
+    print("(Pressione Ctrl+C a qualquer momento para PARAR e GERAR O RELATÓRIO)")
+
+    salvo = checkpoint.estado.get('spsa')
+    if salvo:
+        print(f"-> Retomando da iteração {salvo['iteracao']}: {salvo['melhor_resultado']}")
+        valor_inicial = None
+    else:
+        valor_inicial = AVALIADOR.avaliar(params_iniciais)
+        if valor_inicial is None:
+            print("ERRO: Falha ao rodar o modelo inicial.")
+            return params_iniciais, 0, "ERRO", 0
+        print(f"-> Valor Inicial: {valor_inicial}")
+
+    motor = SPSA(AVALIADOR, objetivo_escolhido, args.workers, params_iniciais, valor_inicial, salvo,
+                 gradiente=gradiente, medias=args.spsa_medias, semente=args.semente)
+    try:
+        motivo = motor.rodar(criterios, args.monitorar, lambda m: checkpoint.salvar_periodico(spsa=m.estado()), args.maxiter)
+        status = motivo if motivo.startswith("CONVERGIU") else f"PARADA: {motivo}"
+    except KeyboardInterrupt:
+        print("\n\n🛑 PARADA MANUAL (Ctrl+C) DETECTADA!")
+        status = "INTERROMPIDO PELO USUÁRIO"
+    checkpoint.salvar(spsa=motor.estado())
+    return motor.base, motor.valor_base, status, motor.iteracao
+
+# ==============================================================================
+# 4. EXECUÇÃO PRINCIPAL
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-c', '--config', help="Arquivo JSON")
+    parser.add_argument('--max', action='store_true', help="Maximizar")
+    parser.add_argument('--min', action='store_true', help="Minimizar")
+    parser.add_argument('--maxiter', type=int, default=None, help="Máximo de iterações (padrão: até convergir)")
+    parser.add_argument('--workers', type=int, default=1, help="Avaliações simultâneas (pontos da estimativa do gradiente)")
+    adicionar_argumentos_cache(parser)
+    adicionar_argumentos_trace(parser)
+    adicionar_argumentos_metricas(parser)
+    adicionar_argumentos_parada(parser)
+    parser.add_argument('--monitorar', action='store_true', help="Não para ao convergir (modelos com ruído)")
+    adicionar_argumentos_checkpoint(parser)
+    adicionar_argumentos_spsa(parser)
+    args = parser.parse_args()
+    validar_argumentos_spsa(parser, args)
+    if not args.config and not args.resume: parser.error("informe --config (ou --resume RUN_ID)")
+    CACHE_AVALIACOES = abrir_cache(args)
+    TRACE_AVALIACOES = abrir_trace(args)
+
+    checkpoint = None
+    if args.resume:
+        try: checkpoint = abrir_checkpoint(args, 'spsa')
+        except ValueError as e:
+            print(e); sys.exit(1)
+        CONFIG = checkpoint.estado['config']
+    else:
+        try:
+            with open(args.config, 'r', encoding='utf-8') as f: CONFIG = json.load(f)
+        except:
+            print("Erro ao abrir arquivo de configuração."); sys.exit(1)
+    try:
+        AVALIADOR = Avaliador(CONFIG, CACHE_AVALIACOES, TRACE_AVALIACOES, abrir_metricas(args))
+    except Exception as e:
+        print(f"Erro ao preparar o avaliador: {e}"); sys.exit(1)
+
+    # Lógica de Escolha
+    obj = None
+    if checkpoint is not None: obj = checkpoint.estado['objetivo']
+    elif args.max: obj = 'maximizar'
+    elif args.min: obj = 'minimizar'
+    else:
+        print("\n" + "="*50)
+        print(f"MODELO: {CONFIG['executavel']}")
+        print("="*50)
+        while True:
+            try:
+                print("Qual o seu objetivo?")
+                print(" [1] MAXIMIZAR (Maior Valor)")
+                print(" [2] MINIMIZAR (Menor Valor)")
+                escolha = input(">> Digite 1 ou 2: ").strip()
+                if escolha == '1': obj = 'maximizar'; break
+                elif escolha == '2': obj = 'minimizar'; break
+                else: print("Opção inválida.\n")
+            except KeyboardInterrupt: sys.exit(0)
+
+    if checkpoint is None:
+        try: checkpoint = abrir_checkpoint(args, 'spsa', CONFIG, obj)
+        except ValueError as e:
+            print(e); sys.exit(1)
+    if 'gradiente' not in checkpoint.estado: checkpoint.salvar(gradiente=args.gradiente)  # Na retomada, vale o original
+    print(f"Execução: {checkpoint.run_id} (para retomar: --resume {checkpoint.run_id})")
+
+    inicio = time.time()
+    params, res, status, iters = otimizar_spsa(CONFIG, obj, args, criterios_de_args(args, obj), checkpoint)
+    checkpoint.salvar(status=status)
+    tempo = time.time() - inicio
+
+    dados_relatorio = {
+        'modelo': CONFIG['executavel'],
+        'objetivo': obj,
+        'status': status,
+        'gradiente': checkpoint.estado['gradiente'],
+        'tempo_total': tempo,
+        'iteracoes': iters,
+        'avaliacoes': AVALIADOR.avaliacoes,
+        'metricas': AVALIADOR.texto_desempenho(),
+        'resultado': res,
+        'params': params
+    }
+
+    print("\n" + "="*50)
+    print(f"RESULTADO FINAL ({obj.upper()})")
+    print(f"Valor: {res}")
+    print(f"Tempo: {tempo:.2f}s")
+    print(f"Status: {status} | Avaliações: {AVALIADOR.avaliacoes} ({AVALIADOR.execucoes} execuções do modelo)")
+    if CACHE_AVALIACOES is not None: print(f"Cache: {CACHE_AVALIACOES.resumo()}")
+    print(json.dumps(params, indent=4))
+    print("="*50)
+
+    AVALIADOR.fechar()
+    gerar_relatorio_arquivo(dados_relatorio)
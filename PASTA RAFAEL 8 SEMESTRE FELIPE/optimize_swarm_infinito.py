@@ -1,31 +1,27 @@
-import subprocess
 import json
 import argparse
 import sys
 import time
-import os
 from datetime import datetime
 import optuna
+from optuna_paralelo import (ParadaOptuna, criar_sampler, otimizar_em_paralelo, otimizar_em_lotes,
+                             tamanho_lote_sampler, adicionar_argumentos_sampler, validar_argumentos_sampler)
+from criterios_parada import adicionar_argumentos_parada, criterios_de_args
+from checkpoint import abrir_checkpoint, adicionar_argumentos_checkpoint
+from estudo_distribuido import (adicionar_argumentos_distribuido, validar_argumentos_distribuido,
+                                criar_estudo_compartilhado, entrar_no_estudo, sinal_distribuido, sinalizar_parada)
+from cache_avaliacoes import abrir_cache, adicionar_argumentos_cache
+from trace_avaliacoes import abrir_trace, adicionar_argumentos_trace
+from metricas import abrir_metricas, adicionar_argumentos_metricas
+from historico_limitado import abrir_historico, adicionar_argumentos_memoria, validar_argumentos_memoria
+from avaliador import Avaliador
+from restricoes import marcar_trial
 
-# --- FUNÇÃO BLACK BOX ---
-def rodar_modelo_e_ler_saida(executavel, params_dict, lista_de_parametros):
-    command = [executavel]
-    try:
-        for param_info in lista_de_parametros:
-            valor = params_dict[param_info['nome']]
-            command.append(str(valor))
-    except KeyError: return None
-        
-    try:
-        if not os.path.exists(executavel): return None
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        output = result.stdout.strip()
-        for line in output.splitlines():
-            if 'Valor de saída:' in line:
-                return float(line.split(':')[-1].strip())
-        if output: return float(output)
-        return None
-    except: return None
+CACHE_AVALIACOES = None  # Preenchido na execução principal (--cache / --sem-cache)
+TRACE_AVALIACOES = None  # Preenchido na execução principal (--trace)
+
+# --- FUNÇÃO BLACK BOX (motor único em avaliador.py) ---
+AVALIADOR = None  # Criado na execução principal a partir do JSON
 
 # --- MENU INTELIGENTE ---
 def menu_inteligente(config_nome):
@@ -48,7 +44,7 @@ def menu_inteligente(config_nome):
 # --- LÓGICA SWARM ---
 CONFIG_GLOBAL = {}
 
-def objective(trial):
+def sugerir_parametros(trial):
     config = CONFIG_GLOBAL
     params = {}
     for p in config['parametros']:
@@ -58,8 +54,12 @@ def objective(trial):
             params[p['nome']] = trial.suggest_int(p['nome'], p['limites'][0], p['limites'][1], step=p.get('passo_sugestao', 1))
         elif p['tipo'] == 'float':
             params[p['nome']] = trial.suggest_float(p['nome'], p['limites'][0], p['limites'][1], step=p.get('passo_sugestao', 0.1))
-            
-    res = rodar_modelo_e_ler_saida(config['executavel'], params, config['parametros'])
+    marcar_trial(trial, AVALIADOR.restricoes, params)  # Violações no trial; o inviável não roda o .exe
+    return params
+
+def objective(trial):
+    params = sugerir_parametros(trial)
+    res = AVALIADOR.avaliar(params)
     if res is None: raise optuna.exceptions.TrialPruned()
     return res
 
@@ -77,10 +77,14 @@ Modelo         : {dados['modelo']}
 Objetivo       : {dados['objetivo'].upper()}
 Status         : {dados['status']}
 Tentativas     : {dados['trials']}
+Sampler        : {dados['sampler']}{dados['memoria']}
 --------------------------------------------------------------------------------
 MELHOR RESULTADO: {dados['resultado']}
 Tempo Total     : {dados['tempo']:.2f}s
 --------------------------------------------------------------------------------
+DESEMPENHO DAS AVALIAÇÕES:
+{dados['metricas']}
+--------------------------------------------------------------------------------
 PARÂMETROS IDEAIS:
 {json.dumps(dados['params'], indent=4)}
 ================================================================================
@@ -93,44 +97,145 @@ PARÂMETROS IDEAIS:
 # --- EXECUÇÃO ---
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument('-c', '--config', required=True)
+    parser.add_argument('-c', '--config')
     parser.add_argument('--max', action='store_true')
     parser.add_argument('--min', action='store_true')
+    parser.add_argument('--workers', type=int, default=1, help="Trials simultâneos")
+    adicionar_argumentos_cache(parser)
+    adicionar_argumentos_trace(parser)
+    adicionar_argumentos_metricas(parser)
+    adicionar_argumentos_parada(parser)
+    adicionar_argumentos_checkpoint(parser)
+    adicionar_argumentos_distribuido(parser)
+    adicionar_argumentos_sampler(parser)
+    adicionar_argumentos_memoria(parser)
     args = parser.parse_args()
+    validar_argumentos_distribuido(parser, args)
+    validar_argumentos_sampler(parser, args)
+    validar_argumentos_memoria(parser, args)
+    if not args.config and not args.resume and not args.worker: parser.error("informe --config (ou --resume RUN_ID)")
+    CACHE_AVALIACOES = abrir_cache(args)
+    TRACE_AVALIACOES = abrir_trace(args)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
 
-    try:
-        with open(args.config, 'r', encoding='utf-8') as f: CONFIG_GLOBAL = json.load(f)
-    except: sys.exit(1)
+    if args.worker:
+        # Worker de um estudo distribuído: roda trials até o coordenador mandar parar
+        try: study, CONFIG_GLOBAL, obj, sampler = entrar_no_estudo(args.storage, args.study_name, args.workers)
+        except ValueError as e: sys.exit(str(e))
+        try: AVALIADOR = Avaliador(CONFIG_GLOBAL, CACHE_AVALIACOES, TRACE_AVALIACOES, abrir_metricas(args))
+        except Exception as e: sys.exit(f"Erro ao preparar o avaliador: {e}")
+        print(f">>> WORKER no estudo '{args.study_name}' | Objetivo: {obj.upper()} | Sampler: {sampler} | Workers: {args.workers}")
+        parada = ParadaOptuna(criterios_de_args(args, obj), AVALIADOR, sinal=sinal_distribuido(study))
+        lote = tamanho_lote_sampler(sampler, CONFIG_GLOBAL, AVALIADOR.tamanho_lote)
+        try:
+            if lote:
+                otimizar_em_lotes(study, sugerir_parametros, AVALIADOR.avaliar_lote, n_trials=None, tamanho_lote=lote, parada=parada)
+            else:
+                otimizar_em_paralelo(study, objective, n_trials=None, workers=tamanho_lote_sampler(sampler, CONFIG_GLOBAL, args.workers),
+                                     parada=parada, metricas=AVALIADOR.metricas, interromper=AVALIADOR.interromper)
+            print(f"Worker encerrado: {parada.motivo}")
+        except KeyboardInterrupt:
+            print("\nWorker interrompido.")
+        finally:
+            AVALIADOR.fechar()
+        sys.exit(0)
+
+    checkpoint = None
+    if args.resume:
+        try: checkpoint = abrir_checkpoint(args, 'swarm')
+        except ValueError as e: sys.exit(str(e))
+        CONFIG_GLOBAL = checkpoint.estado['config']
+    else:
+        try:
+            with open(args.config, 'r', encoding='utf-8') as f: CONFIG_GLOBAL = json.load(f)
+        except: sys.exit(1)
+    try: AVALIADOR = Avaliador(CONFIG_GLOBAL, CACHE_AVALIACOES, TRACE_AVALIACOES, abrir_metricas(args))
+    except Exception as e: sys.exit(f"Erro ao preparar o avaliador: {e}")
     
     obj = None
-    if args.max: obj = 'maximizar'
+    if checkpoint is not None: obj = checkpoint.estado['objetivo']
+    elif args.max: obj = 'maximizar'
     elif args.min: obj = 'minimizar'
     else: obj = menu_inteligente(CONFIG_GLOBAL['executavel'])
 
-    optuna.logging.set_verbosity(optuna.logging.WARNING)
     direction = 'maximize' if obj == 'maximizar' else 'minimize'
     
-    print(f"\n>>> INICIANDO SWARM INFINITO <<<")
-    print(f"Objetivo: {obj.upper()}")
+    print("\n>>> INICIANDO SWARM INFINITO <<<")
+    if checkpoint is None:
+        try: checkpoint = abrir_checkpoint(args, 'swarm', CONFIG_GLOBAL, obj)
+        except ValueError as e: sys.exit(str(e))
+    if 'sampler' not in checkpoint.estado: checkpoint.salvar(sampler=args.sampler)  # Na retomada, vale o sampler original
+    sampler = checkpoint.estado['sampler']
+    workers = tamanho_lote_sampler(sampler, CONFIG_GLOBAL, args.workers)
+    print(f"Objetivo: {obj.upper()} | Sampler: {sampler} | Workers: {workers}")
     print("(Pressione Ctrl+C para parar e gerar relatório)")
+    print(f"Execução: {checkpoint.run_id} (para retomar: --resume {checkpoint.run_id})")
     
     inicio = time.time()
-    study = optuna.create_study(direction=direction)
+    lote = tamanho_lote_sampler(sampler, CONFIG_GLOBAL, AVALIADOR.tamanho_lote)
+    storage = args.storage or checkpoint.estado.get('storage')
+    historico = None if storage else abrir_historico(args, checkpoint, direction,
+                                                     lambda: criar_sampler(max(workers, lote), False, sampler))
+    if storage:
+        # Coordenador de um estudo distribuído: os workers entram com --worker
+        study_name = args.study_name or checkpoint.estado['study_name']
+        study = criar_estudo_compartilhado(storage, study_name, direction,
+                                           criar_sampler(max(workers, lote), True, sampler),
+                                           CONFIG_GLOBAL, obj, sampler)
+        checkpoint.salvar(storage=storage, study_name=study_name)
+        print(f"Coordenando o estudo '{study_name}' em {storage}")
+        print(f"  Workers: python optimize_swarm_infinito.py --storage {storage} --study-name {study_name} --worker")
+    elif historico is not None:
+        # Memória limitada: estudo em memória recompactado, log completo em historico.jsonl
+        study = historico.estudo
+        print(f"Memória limitada: até {historico.capacidade + historico.intervalo} trials em memória, "
+              f"log em {historico.caminho_log}")
+    else:
+        # Estudo em disco (journal): um kill -9 não perde os trials já concluídos
+        study = checkpoint.criar_ou_carregar_estudo(direction, criar_sampler(max(workers, lote), False, sampler))
+    parada = ParadaOptuna(criterios_de_args(args, obj), AVALIADOR,
+                          ao_registrar=historico.registrar if historico is not None else None)
+    if checkpoint.retomado:
+        print(f"-> Retomando com {historico.total if historico is not None else len(study.trials)} trials já registrados")
     status = "CONCLUÍDO"
+
+    def rodar_trials(study, n_trials):
+        if lote:
+            otimizar_em_lotes(study, sugerir_parametros, AVALIADOR.avaliar_lote, n_trials=n_trials, tamanho_lote=lote, parada=parada)
+        elif workers > 1:
+            otimizar_em_paralelo(study, objective, n_trials=n_trials, workers=workers, parada=parada, metricas=AVALIADOR.metricas,
+                                 interromper=AVALIADOR.interromper)
+        else:
+            study.optimize(objective, n_trials=n_trials, show_progress_bar=False, callbacks=[parada.callback])
     
     try:
-        # n_trials=None significa INFINITO
-        study.optimize(objective, n_trials=None, show_progress_bar=False) 
+        # n_trials=None significa INFINITO (até Ctrl+C ou um critério de parada)
+        if historico is None:
+            rodar_trials(study, None)
+        else:
+            # Blocos de `intervalo` trials; entre um bloco e outro (sem trials em voo) o estudo é recompactado
+            while not parada.deve_parar():
+                rodar_trials(study, historico.intervalo)
+                study = historico.compactar()
+        if parada.motivo:
+            print(f"\n🏁 Critério de parada: {parada.motivo}")
+            status = f"PARADA: {parada.motivo}"
     except KeyboardInterrupt:
         print("\n\n🛑 PARADA MANUAL DETECTADA.")
         status = "INTERROMPIDO PELO USUÁRIO"
 
+    if storage: sinalizar_parada(study)
     tempo = time.time() - inicio
+    AVALIADOR.fechar()
+    checkpoint.salvar(status=status)
     
     best_val = 0
     best_params = {}
     
-    if len(study.trials) > 0:
+    if historico is not None:
+        historico.fechar()
+        if historico.melhores: best_val, best_params = historico.melhor()
+    elif len(study.trials) > 0:
         try:
             best_val = study.best_value
             best_params = study.best_params
@@ -140,6 +245,7 @@ if __name__ == "__main__":
     print(f"RESULTADO FINAL ({obj.upper()})")
     print(f"Valor: {best_val}")
     print(f"Tempo: {tempo:.2f}s")
+    if CACHE_AVALIACOES is not None: print(f"Cache: {CACHE_AVALIACOES.resumo()}")
     print(json.dumps(best_params, indent=4))
     print("="*50)
     
@@ -150,5 +256,8 @@ if __name__ == "__main__":
         'params': best_params,
         'tempo': tempo,
         'status': status,
-        'trials': len(study.trials)
+        'trials': historico.total if historico is not None else len(study.trials),
+        'sampler': sampler,
+        'metricas': AVALIADOR.texto_desempenho(),
+        'memoria': f"\nMemória        : {historico.texto_relatorio()}" if historico is not None else ''
     })
\ No newline at end of file
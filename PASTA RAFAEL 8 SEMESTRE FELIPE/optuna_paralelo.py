@@ -0,0 +1,179 @@
+import math
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import optuna
+from optuna.trial import TrialState
+from metricas import executar_com_espera
+
+# ==============================================================================
+# OPTUNA EM PARALELO (ask/tell com vários trials em voo)
+# Cada trial roda o .exe num subprocesso, então um pool de threads ocupa os
+# núcleos livres. O TPE usa "constant liar": trials ainda em andamento contam
+# como resultados ruins, evitando que os workers sugiram o mesmo ponto.
+# Samplers (--sampler):
+#   tpe              : padrão do Optuna, um parâmetro por vez
+#   tpe-multivariado : TPE multivariado com grupos (capta interação entre parâmetros)
+#   cmaes            : CMA-ES com margem para inteiros, partindo do centro dos limites
+#                      (precisa do pacote 'cmaes'; categóricos ficam com o TPE)
+#   qmc              : sequência de Sobol (cobertura uniforme, sem aprendizado)
+#   random           : amostragem aleatória pura (linha de base)
+# O CMA-ES evolui por gerações: trials em voo/por lote ficam limitados ao
+# tamanho da população (4 + 3 ln N) para cada geração ver os resultados da anterior.
+# ==============================================================================
+SAMPLERS = ('tpe', 'tpe-multivariado', 'cmaes', 'qmc', 'random')
+warnings.filterwarnings('ignore', message='Constraints have been set, but CmaEsSampler')
+
+def _cmaes_instalado():
+    try: import cmaes  # noqa: F401 (dependência opcional do CmaEsSampler)
+    except ImportError: return False
+    return True
+
+def criar_sampler(workers=1, compartilhado=False, nome='tpe'):
+    # workers > 1 também vale para o modo lote (vários trials pedidos antes do tell);
+    # num estudo compartilhado, os trials em voo dos outros processos também contam
+    liar = workers > 1 or compartilhado
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', optuna.exceptions.ExperimentalWarning)  # QMC e TPE multivariado
+        if nome == 'tpe-multivariado':
+            return optuna.samplers.TPESampler(multivariate=True, group=True, constant_liar=liar)
+        if nome == 'cmaes':
+            if not _cmaes_instalado(): raise ValueError("O sampler cmaes precisa do pacote 'cmaes' (pip install cmaes)")
+            return optuna.samplers.CmaEsSampler(with_margin=True, warn_independent_sampling=False,
+                                                independent_sampler=optuna.samplers.TPESampler(constant_liar=liar))
+        if nome == 'qmc':
+            # Sem embaralhar: a sequência é a mesma em todos os processos de um estudo compartilhado
+            return optuna.samplers.QMCSampler(qmc_type='sobol', scramble=False, warn_independent_sampling=False)
+        if nome == 'random':
+            return optuna.samplers.RandomSampler()
+        return optuna.samplers.TPESampler(constant_liar=liar)
+
+def tamanho_lote_sampler(nome, config, pedido):
+    """Trials simultâneos (workers ou lote) que fazem sentido para o sampler"""
+    if nome != 'cmaes' or pedido <= 1: return pedido
+    numericos = sum(1 for p in config['parametros'] if p['tipo'] != 'categorico')
+    populacao = 4 + int(3 * math.log(max(1, numericos)))
+    return min(pedido, populacao)
+
+def adicionar_argumentos_sampler(parser):
+    parser.add_argument('--sampler', choices=SAMPLERS, default='tpe',
+                        help="Amostrador do Optuna: tpe, tpe-multivariado, cmaes (opcional: pip install cmaes), "
+                             "qmc (Sobol) ou random")
+
+def otimizar_em_paralelo(study, objective, n_trials=None, workers=1, parada=None, metricas=None, interromper=None):
+    """
+    Equivalente a study.optimize(objective, n_trials) com `workers` trials simultâneos.
+    n_trials=None roda até a ParadaOptuna disparar (ou para sempre). No Ctrl+C, `interromper()`
+    (Avaliador.interromper) mata as execuções em andamento sem esperar por elas, os trials em voo
+    são fechados como FAIL (o estudo fica consistente para o relatório) e a interrupção é repassada.
+    """
+    em_voo = {}
+    iniciados = 0
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            parar = parada is not None and parada.deve_parar()
+            restantes = parada.restantes() if parada is not None else None  # Teto do --max-avaliacoes
+            while (not parar and len(em_voo) < workers and (n_trials is None or iniciados < n_trials)
+                   and (restantes is None or len(em_voo) < restantes)):
+                trial = study.ask()
+                em_voo[pool.submit(executar_com_espera, metricas, objective, trial, time.perf_counter())] = trial
+                iniciados += 1
+            if not em_voo: break
+
+            prontos, _ = wait(list(em_voo), return_when=FIRST_COMPLETED)
+            for fut in prontos:
+                trial = em_voo.pop(fut)
+                try:
+                    concluido = study.tell(trial, fut.result())
+                except optuna.exceptions.TrialPruned:
+                    concluido = study.tell(trial, state=TrialState.PRUNED)
+                except Exception:
+                    concluido = study.tell(trial, state=TrialState.FAIL)
+                if parada is not None: parada.registrar(study, concluido)
+    except KeyboardInterrupt:
+        for fut in em_voo: fut.cancel()
+        if interromper is not None: interromper()
+        for trial in em_voo.values():
+            try: study.tell(trial, state=TrialState.FAIL)
+            except Exception: pass
+        raise
+    finally:
+        # Sem o `with`: o shutdown(wait=True) do __exit__ prenderia o Ctrl+C até o último .exe terminar
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def otimizar_em_lotes(study, sugerir_params, avaliar_lote, n_trials=None, tamanho_lote=8, parada=None):
+    """
+    Modo lote: pede `tamanho_lote` trials de uma vez (ask), avalia todos numa única
+    execução do .exe e devolve os resultados (tell). Falhas viram PRUNED.
+    """
+    feitos = 0
+    while n_trials is None or feitos < n_trials:
+        if parada is not None and parada.deve_parar(): break
+        k = tamanho_lote if n_trials is None else min(tamanho_lote, n_trials - feitos)
+        restantes = parada.restantes() if parada is not None else None
+        if restantes is not None: k = min(k, restantes)
+        if k < 1: break
+        trials = [study.ask() for _ in range(k)]
+        try:
+            resultados = avaliar_lote([sugerir_params(t) for t in trials])
+        except KeyboardInterrupt:
+            for trial in trials:
+                try: study.tell(trial, state=TrialState.FAIL)
+                except Exception: pass
+            raise
+        for trial, res in zip(trials, resultados):
+            if res is None: concluido = study.tell(trial, state=TrialState.PRUNED)
+            else: concluido = study.tell(trial, res)
+            if parada is not None: parada.registrar(study, concluido)
+        feitos += k
+
+class ParadaOptuna:
+    """
+    Liga os CriteriosParada ao Optuna. `registrar(study, trial)` é chamado a cada trial
+    terminado; `deve_parar()` serve para os loops ask/tell e `callback` para
+    study.optimize (chama study.stop). A paciência conta trials seguidos sem melhoria
+    (usar_paciencia=False quando a paciência é da fase seguinte, como no main.py).
+    `sinal` é uma função opcional que devolve um motivo de parada vindo de fora
+    (ex.: o coordenador de um estudo distribuído). `ao_registrar(trial)` é chamada
+    com cada trial terminado (ex.: o log do --memoria-limitada).
+    """
+    def __init__(self, criterios, avaliador, usar_paciencia=True, sinal=None, ao_registrar=None):
+        self.criterios = criterios
+        self.avaliador = avaliador
+        self.usar_paciencia = usar_paciencia
+        self.sinal = sinal
+        self.ao_registrar = ao_registrar
+        self.por_sinal = False
+        self.melhor = None
+        self.motivo = None
+
+    def registrar(self, study, trial):
+        if self.ao_registrar is not None: self.ao_registrar(trial)
+        melhorou = False
+        if trial.state == TrialState.COMPLETE:
+            if self.melhor is None: melhorou = True
+            elif self.criterios.objetivo == 'maximizar': melhorou = trial.value > self.melhor
+            else: melhorou = trial.value < self.melhor
+            if melhorou: self.melhor = trial.value
+        if self.usar_paciencia: self.criterios.registrar_rodada(melhorou)
+
+    def deve_parar(self):
+        if self.motivo is None:
+            self.motivo = self.criterios.verificar(self.melhor, self.avaliador.avaliacoes)
+        if self.motivo is None and self.sinal is not None:
+            self.motivo = self.sinal()
+            self.por_sinal = self.motivo is not None
+        return self.motivo is not None
+
+    def restantes(self):
+        """Avaliações que ainda cabem no teto (None = sem teto): trials em voo/lote não passam disso"""
+        return self.criterios.restantes(self.avaliador.avaliacoes)
+
+    def callback(self, study, trial):
+        self.registrar(study, trial)
+        if self.deve_parar(): study.stop()
+
+def validar_argumentos_sampler(parser, args):
+    if args.sampler == 'cmaes' and not _cmaes_instalado():
+        parser.error("--sampler cmaes precisa do pacote 'cmaes' (pip install cmaes)")
@@ -0,0 +1,163 @@
+import time
+from criterios_parada import CriteriosParada
+
+# ==============================================================================
+# ORÇAMENTO ADAPTATIVO (troca automática entre Fase 1 e Fase 2)
+# Em vez de -t trials fixos e depois só refinamento, --budget-evals N e/ou
+# --budget-time S dão um orçamento total, e o agendador alterna as fases:
+#   - cada fase anota (avaliações, melhor valor) a cada verificação
+#   - ritmo = quanto o melhor valor andou nas últimas `janela` avaliações
+#     (padrão: max(20, 5 × nº de parâmetros))
+#   - a fase atual estagna quando o ritmo dela fica abaixo do ritmo com que a
+#     outra fase terminou o último turno (sem referência: nenhuma melhoria na janela)
+#   - Fase 1 estagnada com um melhor trial ainda não refinado -> Fase 2 a partir dele
+#     (sem trial novo para refinar, a exploração continua com a janela zerada)
+#   - Fase 2 convergida ou estagnada -> volta a explorar (o TPE continua de onde parou)
+# Tudo até o orçamento acabar (ou --alvo, --max-avaliacoes, --tempo-max, Ctrl+C).
+# ==============================================================================
+TROCA_DE_FASE = "TROCA DE FASE"
+FASES = ('exploracao', 'refinamento')
+NOMES_FASES = {'exploracao': 'Exploração (Fase 1)', 'refinamento': 'Refinamento (Fase 2)'}
+
+def adicionar_argumentos_orcamento(parser):
+    parser.add_argument('--budget-evals', type=int, default=None,
+                        help="Orçamento total de avaliações, dividido entre as fases pelo ritmo de melhoria")
+    parser.add_argument('--budget-time', type=float, default=None,
+                        help="Orçamento total em segundos, dividido entre as fases pelo ritmo de melhoria")
+    parser.add_argument('--janela-troca', type=int, default=None,
+                        help="Avaliações usadas para medir o ritmo de cada fase (padrão: max(20, 5N))")
+
+def validar_argumentos_orcamento(parser, args):
+    if args.budget_evals is None and args.budget_time is None: return
+    if args.budget_evals is not None and args.budget_evals < 1: parser.error("--budget-evals precisa ser positivo")
+    if args.budget_time is not None and args.budget_time <= 0: parser.error("--budget-time precisa ser positivo")
+    if args.storage or args.worker: parser.error("--budget-evals/--budget-time não combinam com o estudo distribuído")
+    if args.monitorar: parser.error("--monitorar não combina com --budget-evals/--budget-time")
+
+class CriteriosDaFase(CriteriosParada):
+    """Critérios do usuário + orçamento restante + estagnação da fase (motivo TROCA_DE_FASE)"""
+    def __init__(self, agendador, criterios_usuario):
+        c = criterios_usuario
+        super().__init__(c.objetivo, c.max_avaliacoes, c.tempo_max, c.alvo, c.paciencia)
+        self.inicio = c.inicio
+        self.sem_melhoria = c.sem_melhoria
+        self.usuario = c
+        self.agendador = agendador
+
+    def registrar_rodada(self, houve_melhoria):
+        super().registrar_rodada(houve_melhoria)
+        self.usuario.sem_melhoria = self.sem_melhoria
+
+    def limite_avaliacoes(self):
+        limite = super().limite_avaliacoes()
+        if self.agendador.budget_evals is None: return limite
+        do_orcamento = self.agendador.budget_evals - self.agendador.gasto_anterior
+        return do_orcamento if limite is None else min(limite, do_orcamento)
+
+    def verificar(self, melhor_resultado, avaliacoes):
+        motivo = super().verificar(melhor_resultado, avaliacoes) or self.agendador.esgotado(avaliacoes)
+        if motivo: return motivo
+        if self.agendador.estagnou(melhor_resultado, avaliacoes): return TROCA_DE_FASE
+        return None
+
+class AgendadorFases:
+    def __init__(self, objetivo_escolhido, budget_evals=None, budget_time=None, janela=None, n_parametros=1,
+                 estado=None):
+        estado = estado or {}
+        self.objetivo = objetivo_escolhido
+        self.budget_evals = budget_evals
+        self.budget_time = budget_time
+        self.janela = janela or max(20, 5 * n_parametros)
+        # Retomada: o que já foi gasto nas execuções anteriores sai do orçamento
+        self.gasto_anterior = estado.get('gasto_avaliacoes', 0)
+        self.inicio = time.time() - estado.get('gasto_tempo', 0.0)
+        self.ritmos = dict(estado.get('ritmos', {f: None for f in FASES}))
+        self.avaliacoes_por_fase = dict(estado.get('avaliacoes_por_fase', {f: 0 for f in FASES}))
+        self.trocas = estado.get('trocas', 0)
+        self.fase = None
+        self._pontos = []
+        self._avaliacoes_inicio_fase = 0
+        self._inicio_janela = 0
+
+    # --- ORÇAMENTO ---
+    def esgotado(self, avaliacoes):
+        if self.budget_evals is not None and self.gasto_anterior + avaliacoes >= self.budget_evals:
+            return f"ORÇAMENTO DE AVALIAÇÕES ({self.budget_evals})"
+        if self.budget_time is not None and time.time() - self.inicio >= self.budget_time:
+            return f"ORÇAMENTO DE TEMPO ({self.budget_time:.0f}s)"
+        return None
+
+    # --- RITMO DE MELHORIA ---
+    def _ganho(self, de, para):
+        if de is None: return float('inf') if para is not None else 0.0
+        if para is None: return 0.0
+        return para - de if self.objetivo == 'maximizar' else de - para
+
+    def _ritmo_recente(self):
+        """Melhoria por avaliação nas últimas `janela` avaliações da fase (None antes de completar a janela)"""
+        avaliacoes, melhor = self._pontos[-1]
+        if avaliacoes - self._inicio_janela < self.janela: return None
+        referencia = self._pontos[0][1]
+        for n, valor in self._pontos:
+            if n > avaliacoes - self.janela: break
+            referencia = valor
+        return self._ganho(referencia, melhor) / self.janela
+
+    def iniciar_fase(self, fase, melhor_resultado, avaliacoes):
+        if self.fase is not None: self.trocas += 1
+        self.encerrar_fase(avaliacoes)
+        self.fase = fase
+        self._avaliacoes_inicio_fase = avaliacoes
+        self.reiniciar_janela(melhor_resultado, avaliacoes)
+        print(f"\n[ORÇAMENTO] {NOMES_FASES[fase]} ({self.resumo(avaliacoes)})")
+
+    def reiniciar_janela(self, melhor_resultado, avaliacoes):
+        """A fase continua (nada melhor para fazer na outra): o ritmo volta a ser medido daqui"""
+        self._pontos = [(avaliacoes, melhor_resultado)]
+        self._inicio_janela = avaliacoes
+
+    def encerrar_fase(self, avaliacoes):
+        if self.fase is None: return
+        self.avaliacoes_por_fase[self.fase] += avaliacoes - self._avaliacoes_inicio_fase
+        ritmo = self._ritmo_recente()
+        if ritmo is not None: self.ritmos[self.fase] = ritmo
+        self.fase = None
+
+    def estagnou(self, melhor_resultado, avaliacoes):
+        if self.fase is None: return False
+        self._pontos.append((avaliacoes, melhor_resultado))
+        ritmo = self._ritmo_recente()
+        if ritmo is None: return False
+        outra = FASES[1 - FASES.index(self.fase)]
+        referencia = self.ritmos[outra] or 0.0
+        if ritmo > referencia: return False
+        self.ritmos[self.fase] = ritmo
+        print(f"\n[ORÇAMENTO] {NOMES_FASES[self.fase]} estagnou (ritmo {ritmo:.4g}/avaliação, "
+              f"referência {referencia:.4g}): trocando de fase")
+        return True
+
+    # --- ESTADO E RELATÓRIO ---
+    def estado(self, avaliacoes):
+        por_fase = dict(self.avaliacoes_por_fase)
+        if self.fase is not None: por_fase[self.fase] += avaliacoes - self._avaliacoes_inicio_fase
+        return {'budget_evals': self.budget_evals, 'budget_time': self.budget_time, 'janela': self.janela,
+                'gasto_avaliacoes': self.gasto_anterior + avaliacoes, 'gasto_tempo': time.time() - self.inicio,
+                'ritmos': self.ritmos, 'avaliacoes_por_fase': por_fase, 'trocas': self.trocas}
+
+    def resumo(self, avaliacoes):
+        partes = []
+        if self.budget_evals is not None: partes.append(f"{self.gasto_anterior + avaliacoes}/{self.budget_evals} avaliações")
+        if self.budget_time is not None: partes.append(f"{time.time() - self.inicio:.0f}/{self.budget_time:.0f}s")
+        return ', '.join(partes)
+
+    def texto_relatorio(self, avaliacoes):
+        e = self.estado(avaliacoes)
+        return (f"{self.resumo(avaliacoes)} | {e['trocas']} troca(s) de fase | exploração "
+                f"{e['avaliacoes_por_fase']['exploracao']} e refinamento {e['avaliacoes_por_fase']['refinamento']} avaliações")
+
+def abrir_orcamento(args, objetivo_escolhido, config, estado=None):
+    if args.budget_evals is None and args.budget_time is None and not estado: return None
+    estado = estado or {}
+    return AgendadorFases(objetivo_escolhido, estado.get('budget_evals', args.budget_evals),
+                          estado.get('budget_time', args.budget_time), estado.get('janela', args.janela_troca),
+                          len(config['parametros']), estado)
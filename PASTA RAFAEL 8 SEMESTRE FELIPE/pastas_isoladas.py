@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import threading
+
+# ==============================================================================
+# PASTA DE TRABALHO ISOLADA POR WORKER (backend argv, lote e servidor)
+# Sem isso, todo .exe roda na pasta de onde o script foi chamado (a mesma dos
+# relatórios). Um modelo que grava arquivos temporários ou de saída pisa no
+# outro assim que há avaliações em paralelo. Declarado no JSON:
+#     "execucao": {"pasta_isolada": true, "raiz_pastas": "/dev/shm",
+#                  "arquivos_entrada": ["dados.txt", "tabelas/coef.csv"]}
+#   - cada execução simultânea recebe uma pasta só dela (criada na primeira
+#     vez que aquele worker roda e reaproveitada nas seguintes)
+#   - "arquivos_entrada" (arquivos ou pastas, relativos à pasta atual) são
+#     copiados uma vez para cada pasta, mantendo o caminho relativo
+#   - depois de cada execução, o que o .exe deixou na pasta é apagado e uma
+#     entrada que ele alterou ou apagou (tamanho ou data diferentes) é copiada
+#     de novo: a próxima encontra só as entradas originais, como uma pasta nova
+#   - raiz padrão: /dev/shm quando existe (memória, sem I/O de disco no laço),
+#     senão a pasta temporária do sistema; tudo é apagado ao fechar
+# ==============================================================================
+RAIZ_MEMORIA = '/dev/shm'
+
+def _assinatura(caminho):
+    """(tamanho, data) de um arquivo, ou de todos os arquivos de uma pasta; None se não existe"""
+    if not os.path.lexists(caminho): return None
+    if not os.path.isdir(caminho) or os.path.islink(caminho):
+        info = os.lstat(caminho)
+        return (info.st_size, info.st_mtime_ns)
+    itens = []
+    for atual, pastas, arquivos in os.walk(caminho):
+        pastas.sort()
+        for nome in sorted(arquivos):
+            info = os.lstat(os.path.join(atual, nome))
+            itens.append((os.path.relpath(os.path.join(atual, nome), caminho), info.st_size, info.st_mtime_ns))
+    return tuple(itens)
+
+def opcoes_pastas(config):
+    """PastasIsoladas do JSON, ou None quando "pasta_isolada" não está ligado"""
+    execucao = config.get('execucao') or {}
+    if not execucao.get('pasta_isolada'): return None
+    raiz = execucao.get('raiz_pastas') or (RAIZ_MEMORIA if os.path.isdir(RAIZ_MEMORIA) else tempfile.gettempdir())
+    entradas = execucao.get('arquivos_entrada') or []
+    faltando = [e for e in entradas if not os.path.exists(e)]
+    if faltando: raise ValueError(f"Arquivos de entrada não encontrados: {', '.join(faltando)}")
+    return PastasIsoladas(raiz, entradas)
+
+class PastasIsoladas:
+    def __init__(self, raiz, arquivos_entrada=()):
+        self.raiz = raiz
+        # (origem, caminho dentro da pasta): absolutos e "../" entram só pelo nome
+        self.entradas = [(os.path.abspath(e), os.path.normpath(e) if not os.path.isabs(e) and not os.path.normpath(e).startswith('..')
+                          else os.path.basename(os.path.normpath(e))) for e in arquivos_entrada]
+        self._destinos = {destino for _, destino in self.entradas}
+        # Pastas no caminho de uma entrada aninhada ("tabelas" de "tabelas/coef.csv")
+        self._intermediarias = {os.sep.join(d.split(os.sep)[:i]) for d in self._destinos for i in range(1, d.count(os.sep) + 1)}
+        self.base = None
+        self.criadas = 0
+        self._livres = []
+        self._assinaturas = {}  # pasta -> assinatura de cada entrada logo depois de copiada
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _copiar(origem, alvo):
+        if os.path.isdir(origem): shutil.copytree(origem, alvo)
+        else: shutil.copy2(origem, alvo)
+        return _assinatura(alvo)
+
+    def _nova(self, pasta):
+        os.makedirs(pasta)
+        assinaturas = []
+        for origem, destino in self.entradas:
+            alvo = os.path.join(pasta, destino)
+            os.makedirs(os.path.dirname(alvo) or pasta, exist_ok=True)
+            assinaturas.append(self._copiar(origem, alvo))
+        with self._lock: self._assinaturas[pasta] = assinaturas
+        return pasta
+
+    def _restaurar_entradas(self, pasta):
+        """Entrada que o .exe sobrescreveu ou apagou volta a ser a original"""
+        assinaturas = self._assinaturas[pasta]
+        for i, (origem, destino) in enumerate(self.entradas):
+            alvo = os.path.join(pasta, destino)
+            if _assinatura(alvo) == assinaturas[i]: continue
+            if os.path.isdir(alvo) and not os.path.islink(alvo): shutil.rmtree(alvo)
+            elif os.path.lexists(alvo): os.remove(alvo)
+            os.makedirs(os.path.dirname(alvo) or pasta, exist_ok=True)
+            assinaturas[i] = self._copiar(origem, alvo)
+
+    def pegar(self):
+        """Pasta livre para uma execução (cria uma nova quando todas estão em uso)"""
+        with self._lock:
+            if self._livres: return self._livres.pop()
+            if self.base is None: self.base = tempfile.mkdtemp(prefix='otimizador_', dir=self.raiz)
+            self.criadas += 1
+            pasta = os.path.join(self.base, f"worker_{self.criadas:03d}")
+        return self._nova(pasta)  # A cópia das entradas fica fora do lock
+
+    def _limpar(self, pasta, relativo=''):
+        """Apaga tudo que não é entrada; nas pastas que só levam a uma entrada (ex.: tabelas/) desce e limpa dentro"""
+        for item in os.scandir(os.path.join(pasta, relativo)):
+            caminho = os.path.join(relativo, item.name)
+            if caminho in self._destinos: continue
+            if caminho in self._intermediarias and item.is_dir(follow_symlinks=False): self._limpar(pasta, caminho)
+            elif item.is_dir(follow_symlinks=False): shutil.rmtree(item.path, ignore_errors=True)
+            else: os.remove(item.path)
+
+    def devolver(self, pasta):
+        """Apaga o que a execução deixou, restaura as entradas alteradas e libera a pasta"""
+        try:
+            self._limpar(pasta)
+            self._restaurar_entradas(pasta)
+        except OSError:
+            return  # Pasta com algo preso (ex.: arquivo aberto no Windows): sai de circulação
+        with self._lock: self._livres.append(pasta)
+
+    @staticmethod
+    def executavel(caminho):
+        """O .exe roda em outra pasta: caminhos relativos que existem aqui viram absolutos"""
+        return os.path.abspath(caminho) if os.path.exists(caminho) else caminho
+
+    def fechar(self):
+        with self._lock:
+            if self.base is not None: shutil.rmtree(self.base, ignore_errors=True)
+            self.base = None
+            self._livres = []
+            self._assinaturas = {}
@@ -0,0 +1,161 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from metricas import executar_com_espera
+
+# ==============================================================================
+# POLL PARALELO DE VIZINHOS (Pattern Search)
+# Avalia todos os 2N vizinhos do ponto atual de uma vez num pool de workers.
+# Threads bastam aqui: o trabalho pesado roda no .exe (subprocesso), fora do GIL.
+# Backend argv: os vizinhos vão direto para o event loop do executor assíncrono
+# (sem uma thread por avaliação), e o oportunista mata os .exe que sobraram.
+# Com triagem (triagem.py), os vizinhos vão na ordem prevista pelo substituto e
+# os menos promissores só rodam se nenhum dos promissores melhorar.
+# Com --max-avaliacoes, só rodam os vizinhos que ainda cabem no teto (esgotado
+# = True: o poll foi cortado, e não vale como "nenhum vizinho melhora").
+#   - 'completo'   : avalia todos e fica com o melhor vizinho
+#   - 'oportunista': aceita a primeira melhoria e cancela o resto da fila
+# ==============================================================================
+MODOS_POLL = ('oportunista', 'completo')
+
+def eh_melhor(res, referencia, objetivo_escolhido):
+    if referencia is None: return True
+    if objetivo_escolhido == 'maximizar': return res > referencia
+    return res < referencia
+
+class PollParalelo:
+    def __init__(self, workers=1, modo='oportunista', avaliar_lote=None, metricas=None, avaliar_concorrente=None,
+                 triagem=None, viaveis=None, orcamento=None):
+        self.workers = max(1, int(workers))
+        self.modo = modo
+        self.avaliar_lote = avaliar_lote # Se o modelo aceita lote, o poll inteiro vai numa execução
+        self.avaliar_concorrente = avaliar_concorrente if self.workers > 1 else None # Avaliador.avaliar_concorrente
+        self.metricas = metricas # Mede a espera na fila do pool
+        self.triagem = triagem # TriagemSurrogate (--triagem)
+        self.viaveis = viaveis # Avaliador.viaveis (restrições do JSON)
+        self.orcamento = orcamento # OrcamentoPoll (criterios_parada.py)
+        self.avaliacoes = 0
+        self.esgotado = False
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def avaliar(self, funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido):
+        """
+        Avalia a lista de candidatos (dicts de parâmetros) com funcao_avaliar.
+        Retorna (indice, resultado) do candidato escolhido, ou (None, None) se nenhum melhorou.
+        """
+        self.esgotado = False
+        if not candidatos: return None, None
+        if self.viaveis is not None:
+            indices = [i for i, ok in enumerate(self.viaveis(candidatos)) if ok]
+            if len(indices) < len(candidatos):
+                indice, res = self._avaliar_triados(funcao_avaliar, [candidatos[i] for i in indices],
+                                                    melhor_resultado, objetivo_escolhido)
+                return (indices[indice], res) if indice is not None else (None, None)
+        return self._avaliar_triados(funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido)
+
+    def _avaliar_triados(self, funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido):
+        if not candidatos: return None, None
+        ordem, n_promissores = (None, None)
+        if self.triagem is not None and len(candidatos) > 1:
+            ordem, n_promissores = self.triagem.ordenar(candidatos, objetivo_escolhido)
+        if ordem is None:
+            return self._avaliar_grupo(funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido)
+
+        promissores, adiados = ordem[:n_promissores], ordem[n_promissores:]
+        indice, res = self._avaliar_grupo(funcao_avaliar, [candidatos[i] for i in promissores], melhor_resultado, objetivo_escolhido)
+        if indice is not None or not adiados:
+            self.triagem.contar_adiadas(len(adiados), 0)
+            return (promissores[indice], res) if indice is not None else (None, None)
+        # Nenhum promissor melhorou: os adiados rodam (sem isso a convergência não seria confiável)
+        self.triagem.contar_adiadas(len(adiados), len(adiados))
+        indice, res = self._avaliar_grupo(funcao_avaliar, [candidatos[i] for i in adiados], melhor_resultado, objetivo_escolhido)
+        return (adiados[indice], res) if indice is not None else (None, None)
+
+    def _avaliar_grupo(self, funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido):
+        if self.orcamento is None:
+            return self._despachar(funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido)
+        reservadas = self.orcamento.reservar(len(candidatos))
+        if reservadas < len(candidatos):
+            self.esgotado = True
+            candidatos = candidatos[:reservadas]
+        antes = self.avaliacoes
+        try:
+            if not candidatos: return None, None
+            return self._despachar(funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido)
+        finally:
+            self.orcamento.devolver(reservadas - (self.avaliacoes - antes))
+
+    def _despachar(self, funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido):
+        if self.avaliar_lote is not None:
+            return self._avaliar_em_lote(candidatos, melhor_resultado, objetivo_escolhido)
+        if self.avaliar_concorrente is not None:
+            return self._avaliar_concorrente(candidatos, melhor_resultado, objetivo_escolhido)
+        if self._pool is None:
+            return self._avaliar_sequencial(funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido)
+
+        agora = time.perf_counter()
+        futuros = {self._pool.submit(executar_com_espera, self.metricas, funcao_avaliar, c, agora): i
+                   for i, c in enumerate(candidatos)}
+        pendentes = set(futuros)
+        escolhido, valor_escolhido = None, None
+        try:
+            while pendentes:
+                prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                # Processa na ordem original para manter o desempate determinístico
+                for fut in sorted(prontos, key=lambda f: futuros[f]):
+                    self.avaliacoes += 1
+                    res = fut.result()
+                    if res is None: continue
+                    referencia = valor_escolhido if escolhido is not None else melhor_resultado
+                    if eh_melhor(res, referencia, objetivo_escolhido):
+                        escolhido, valor_escolhido = futuros[fut], res
+                if escolhido is not None and self.modo == 'oportunista':
+                    break
+        finally:
+            # Oportunista (ou Ctrl+C): o que ainda não começou não roda mais
+            for fut in pendentes: fut.cancel()
+        return escolhido, valor_escolhido
+
+    def _avaliar_sequencial(self, funcao_avaliar, candidatos, melhor_resultado, objetivo_escolhido):
+        escolhido, valor_escolhido = None, None
+        for i, candidato in enumerate(candidatos):
+            self.avaliacoes += 1
+            res = funcao_avaliar(candidato)
+            if res is None: continue
+            referencia = valor_escolhido if escolhido is not None else melhor_resultado
+            if eh_melhor(res, referencia, objetivo_escolhido):
+                escolhido, valor_escolhido = i, res
+                if self.modo == 'oportunista': break
+        return escolhido, valor_escolhido
+
+    def _avaliar_concorrente(self, candidatos, melhor_resultado, objetivo_escolhido):
+        terminadas = []
+        def ao_terminar(i, res):
+            # Chamado a cada avaliação concluída; True no oportunista mata as que ainda rodam
+            terminadas.append(i)
+            return self.modo == 'oportunista' and res is not None and eh_melhor(res, melhor_resultado, objetivo_escolhido)
+        resultados = self.avaliar_concorrente(candidatos, self.workers, ao_terminar)
+        self.avaliacoes += len(terminadas)
+        return self._escolher(resultados, melhor_resultado, objetivo_escolhido)
+
+    def _avaliar_em_lote(self, candidatos, melhor_resultado, objetivo_escolhido):
+        self.avaliacoes += len(candidatos)
+        return self._escolher(self.avaliar_lote(candidatos), melhor_resultado, objetivo_escolhido)
+
+    def _escolher(self, resultados, melhor_resultado, objetivo_escolhido):
+        escolhido, valor_escolhido = None, None
+        for i, res in enumerate(resultados):
+            if res is None: continue
+            referencia = valor_escolhido if escolhido is not None else melhor_resultado
+            if eh_melhor(res, referencia, objetivo_escolhido):
+                escolhido, valor_escolhido = i, res
+                if self.modo == 'oportunista': break
+        return escolhido, valor_escolhido
+
+    def fechar(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+def adicionar_argumentos_poll(parser):
+    parser.add_argument('--workers', type=int, default=1, help="Avaliações simultâneas no poll de vizinhos")
+    parser.add_argument('--poll', choices=MODOS_POLL, default='oportunista',
+                        help="completo = avalia todos e pega o melhor; oportunista = para na primeira melhoria")
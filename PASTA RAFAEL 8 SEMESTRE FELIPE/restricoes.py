@@ -0,0 +1,259 @@
+import ast
+import operator
+import numpy as np
+
+# ==============================================================================
+# RESTRIÇÕES DECLARADAS NO JSON (regiões inviáveis sem rodar o .exe)
+# Sem isso, um ponto inviável (orçamento estourado, combinação que o modelo
+# não aceita) só era descoberto rodando o .exe e recebendo uma falha. Com a
+# seção "restricoes", cada candidato é checado antes de qualquer execução:
+#     "restricoes": [
+#         {"nome": "orcamento", "coeficientes": {"x1": 1, "x2": 1, "x3": 2}, "max": 1000},
+#         {"nome": "razao", "expressao": "x1 / x2", "min": 0.5, "max": 2},
+#         {"nome": "rapido", "se": "metodo == 'rapido'", "expressao": "iteracoes", "max": 50},
+#         {"nome": "ordem", "expressao": "(x1 <= x2) | (metodo == 'livre')"}
+#     ]
+#   - "coeficientes": soma linear dos parâmetros numéricos (projetável)
+#   - "expressao"   : conta com os nomes dos parâmetros (categórico = o valor
+#                     em "limites"); sem "min"/"max", é uma condição que precisa
+#                     ser verdadeira. Use & | ~ com parênteses (ou and/or/not)
+#                     Só contas, comparações e as funções de FUNCOES_EXPRESSAO:
+#                     o texto é checado (ast) ao abrir a config e nunca vai ao eval
+#   - "se"          : a restrição só vale quando a condição é verdadeira
+# As contas rodam sobre matrizes (um candidato por linha): um poll inteiro, um
+# lote de trials ou o simplex são checados de uma vez. Violação = quanto passou
+# do limite (0 = viável). Como cada parte usa isso:
+#   - Avaliador      : ponto inviável volta None sem passar pelo cache nem pelo
+#                      backend (lotes e polls checados numa conta só)
+#   - Pattern / HJ   : vizinho inviável é projetado para dentro pelas lineares
+#                      (Avaliador.ajustar/vizinhos) ou descartado; o poll nem o
+#                      entrega a um worker
+#   - Simplex / SPSA : vértices e x± projetados nas lineares (Avaliador.projetar);
+#                      o que sobra inviável custa infinito sem rodar
+#   - Optuna         : cada trial recebe as violações (marcar_trial); os TPE
+#                      aprendem a região viável, CMA-ES, QMC e random não
+# ==============================================================================
+FUNCOES_EXPRESSAO = {
+    'abs': np.abs, 'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'log10': np.log10,
+    'minimo': np.minimum, 'maximo': np.maximum, 'onde': np.where, 'pi': np.pi,
+}
+BINARIOS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+    ast.BitAnd: operator.and_, ast.BitOr: operator.or_,
+}
+UNARIOS = {ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Invert: operator.invert, ast.Not: np.logical_not}
+COMPARACOES = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+LOGICOS = {ast.And: np.logical_and, ast.Or: np.logical_or}
+ITERACOES_PROJECAO = 50  # Projeções cíclicas nas restrições lineares antes de desistir
+TOLERANCIA = 1e-9
+
+def abrir_restricoes(config, espaco):
+    """Restricoes do JSON, ou None quando não há a seção "restricoes" """
+    lista = config.get('restricoes')
+    if not lista: return None
+    return Restricoes(lista, espaco)
+
+class _Restricao:
+    def __init__(self, indice, info, espaco):
+        self.nome = str(info.get('nome') or f"restricao_{indice + 1}")
+        self.minimo = float(info['min']) if info.get('min') is not None else None
+        self.maximo = float(info['max']) if info.get('max') is not None else None
+        self.coeficientes = None
+        self.expressao = None
+        self.nomes_validos = set(espaco.nomes)
+        self.condicao = self._compilar(info['se'], 'se') if info.get('se') else None
+        if 'coeficientes' in info:
+            self.coeficientes = np.zeros(espaco.n)
+            for nome, coef in info['coeficientes'].items():
+                if nome not in espaco.nomes: raise ValueError(f"Restrição '{self.nome}': parâmetro desconhecido '{nome}'")
+                j = espaco.nomes.index(nome)
+                if espaco.categorico[j]: raise ValueError(f"Restrição '{self.nome}': '{nome}' é categórico (use \"expressao\")")
+                self.coeficientes[j] = float(coef)
+            if self.minimo is None and self.maximo is None:
+                raise ValueError(f"Restrição '{self.nome}': \"coeficientes\" precisa de \"min\" e/ou \"max\"")
+        elif 'expressao' in info:
+            self.expressao = self._compilar(info['expressao'], 'expressao')
+        else:
+            raise ValueError(f"Restrição '{self.nome}': informe \"coeficientes\" ou \"expressao\"")
+
+    def _compilar(self, texto, campo):
+        """Árvore da expressão, já checada contra os nós permitidos e os nomes do espaço"""
+        try: arvore = ast.parse(str(texto), mode='eval').body
+        except SyntaxError as e: raise ValueError(f"Restrição '{self.nome}': {campo} inválida ({e.msg})") from None
+        for no in ast.walk(arvore):
+            erro = _no_proibido(no, self.nomes_validos)
+            if erro: raise ValueError(f"Restrição '{self.nome}': {campo} inválida ({erro})")
+        return arvore
+
+    @property
+    def linear(self):
+        """Entra na projeção (soma linear que vale sempre)"""
+        return self.coeficientes is not None and self.condicao is None
+
+    def violacoes(self, vetores, colunas):
+        """Quanto cada linha passou do limite (0 = viável)"""
+        k = len(vetores)
+        if self.coeficientes is not None:
+            lado = vetores @ self.coeficientes
+        else:
+            lado = np.broadcast_to(np.asarray(_calcular(self.expressao, colunas)), (k,))
+        if self.minimo is None and self.maximo is None:
+            violacao = (~lado.astype(bool)).astype(float)  # Condição: 1 quando é falsa
+        else:
+            lado = lado.astype(float)
+            violacao = np.zeros(k)
+            if self.maximo is not None: violacao = np.maximum(violacao, lado - self.maximo)
+            if self.minimo is not None: violacao = np.maximum(violacao, self.minimo - lado)
+            violacao = np.where(np.isnan(violacao), np.inf, violacao)  # Conta indefinida (ex.: 0/0) = inviável
+        if self.condicao is not None:
+            vale = np.broadcast_to(np.asarray(_calcular(self.condicao, colunas)), (k,)).astype(bool)
+            violacao = np.where(vale, violacao, 0.0)
+        return violacao
+
+def _no_proibido(no, nomes):
+    """Motivo para recusar o nó (None = permitido)"""
+    if isinstance(no, ast.Name):
+        if no.id in nomes or no.id in FUNCOES_EXPRESSAO: return None
+        return f"nome desconhecido '{no.id}'"
+    if isinstance(no, ast.Constant):
+        return None if isinstance(no.value, (int, float, str)) else f"constante {no.value!r}"
+    if isinstance(no, ast.Call):
+        if not (isinstance(no.func, ast.Name) and callable(FUNCOES_EXPRESSAO.get(no.func.id))) or no.keywords:
+            return f"chamada não permitida '{ast.unparse(no.func)}'"
+        return None
+    if isinstance(no, ast.BinOp): return None if type(no.op) in BINARIOS else f"operador {type(no.op).__name__}"
+    if isinstance(no, ast.UnaryOp): return None if type(no.op) in UNARIOS else f"operador {type(no.op).__name__}"
+    if isinstance(no, ast.Compare):
+        return None if all(type(op) in COMPARACOES for op in no.ops) else "comparação não permitida"
+    if isinstance(no, ast.BoolOp): return None
+    if isinstance(no, (ast.Load, *BINARIOS, *UNARIOS, *COMPARACOES, *LOGICOS)): return None
+    return f"'{type(no).__name__}' não é permitido"
+
+def _calcular(no, colunas):
+    """Avalia uma árvore já checada por _no_proibido, coluna a coluna (um candidato por linha)"""
+    if isinstance(no, ast.Constant): return no.value
+    if isinstance(no, ast.Name): return colunas[no.id]
+    if isinstance(no, ast.BinOp): return BINARIOS[type(no.op)](_calcular(no.left, colunas), _calcular(no.right, colunas))
+    if isinstance(no, ast.UnaryOp): return UNARIOS[type(no.op)](_calcular(no.operand, colunas))
+    if isinstance(no, ast.BoolOp): return LOGICOS[type(no.op)].reduce([_calcular(v, colunas) for v in no.values])
+    if isinstance(no, ast.Call): return FUNCOES_EXPRESSAO[no.func.id](*(_calcular(a, colunas) for a in no.args))
+    # Compare encadeado (a < b < c): todas as comparações ao mesmo tempo
+    resultado, esquerda = True, _calcular(no.left, colunas)
+    for op, proximo in zip(no.ops, no.comparators):
+        direita = _calcular(proximo, colunas)
+        resultado = np.logical_and(resultado, COMPARACOES[type(op)](esquerda, direita))
+        esquerda = direita
+    return resultado
+
+class Restricoes:
+    def __init__(self, lista, espaco):
+        if not isinstance(lista, list): raise ValueError("\"restricoes\" precisa ser uma lista")
+        self.espaco = espaco
+        self.restricoes = [_Restricao(i, info, espaco) for i, info in enumerate(lista)]
+        self.nomes = tuple(r.nome for r in self.restricoes)
+        if len(set(self.nomes)) < len(self.nomes): raise ValueError("Restrições com nomes repetidos")
+        self._categorias = tuple(np.array(c, dtype=object) if c is not None else None for c in espaco.categorias)
+        # Lineares na forma a·x <= b (um "min" vira -a·x <= -min), para a projeção
+        linhas, limites = [], []
+        for r in self.restricoes:
+            if not r.linear: continue
+            if r.maximo is not None: linhas.append(r.coeficientes); limites.append(r.maximo)
+            if r.minimo is not None: linhas.append(-r.coeficientes); limites.append(-r.minimo)
+        self._A = np.array(linhas).reshape(-1, espaco.n)
+        self._b = np.array(limites)
+        self._normas = np.maximum((self._A ** 2).sum(axis=1), TOLERANCIA)
+        # Erro de digitação num nome aparece agora, não no meio da otimização
+        self.violacoes(espaco.projetar((espaco.minimos + espaco.maximos) / 2))
+
+    def _colunas(self, vetores):
+        colunas = dict(FUNCOES_EXPRESSAO)
+        for j, (nome, categorias) in enumerate(zip(self.espaco.nomes, self._categorias)):
+            coluna = vetores[:, j]
+            colunas[nome] = categorias[coluna.astype(int)] if categorias is not None else coluna
+        return colunas
+
+    # --- CHECAGEM (matriz com um candidato por linha) ---
+    def violacoes(self, vetores):
+        """Matriz (candidatos x restrições) com quanto cada uma passou do limite"""
+        vetores = np.atleast_2d(np.asarray(vetores, dtype=float))
+        colunas = self._colunas(vetores)
+        resultado = np.zeros((len(vetores), len(self.restricoes)))
+        with np.errstate(all='ignore'):  # 0/0, log(0)...: vira violação infinita, sem aviso
+            for i, r in enumerate(self.restricoes):
+                try: resultado[:, i] = r.violacoes(vetores, colunas)
+                except Exception as e: raise ValueError(f"Restrição '{r.nome}': {e}") from None
+        return resultado
+
+    def viaveis_vetores(self, vetores):
+        return np.all(self.violacoes(vetores) <= TOLERANCIA, axis=1)
+
+    def viaveis(self, lista_params):
+        """Um bool por dict de parâmetros (checados de uma vez)"""
+        if not lista_params: return np.zeros(0, dtype=bool)
+        return self.viaveis_vetores(self.espaco.codificar_varios(lista_params))
+
+    def violacoes_params(self, params):
+        """dict nome -> violação de um ponto (o que vai para o Optuna)"""
+        return dict(zip(self.nomes, self.violacoes(self.espaco.codificar(params))[0].tolist()))
+
+    # --- PROJEÇÃO (só as lineares; o resto é rejeitado) ---
+    def projetar(self, vetores):
+        """
+        Limites e malha do espaço de busca + restrições lineares: projeções cíclicas
+        em cada semiespaço violado, presas aos limites, e depois o arredondamento.
+        Se o arredondamento empurrou para fora, os inteiros que mais subiram na
+        direção da violação recuam uma unidade cada até caber (_reparar).
+        O que continua inviável (restrições não lineares, conflito) fica como está.
+        """
+        vetores = np.asarray(vetores, dtype=float)
+        x = np.atleast_2d(self.espaco.projetar(vetores))
+        if not len(self._b): return x.reshape(vetores.shape)
+        limitado = np.minimum(np.maximum(np.atleast_2d(vetores), self.espaco.minimos), self.espaco.maximos)
+        continuo = np.where(self.espaco.categorico, x, limitado)
+        for _ in range(ITERACOES_PROJECAO):
+            if np.all(continuo @ self._A.T - self._b <= TOLERANCIA): break
+            for j in range(len(self._b)):
+                folga = continuo @ self._A[j] - self._b[j]
+                fora = folga > TOLERANCIA
+                if not fora.any(): continue
+                continuo[fora] -= np.outer(folga[fora] / self._normas[j], self._A[j])
+                continuo = np.minimum(np.maximum(continuo, self.espaco.minimos), self.espaco.maximos)
+        x = self.espaco.projetar(continuo)
+        for k in np.flatnonzero(np.any(x @ self._A.T - self._b > TOLERANCIA, axis=1)):
+            x[k] = self._reparar(x[k], continuo[k])
+        return x.reshape(vetores.shape)
+
+    def _reparar(self, x, continuo):
+        """Um ponto arredondado para fora de uma restrição linear: recua inteiros de 1 em 1"""
+        x = x.copy()
+        for _ in range(len(self._b)):
+            excesso = self._A @ x - self._b
+            j = int(np.argmax(excesso))
+            if excesso[j] <= TOLERANCIA: break
+            a = self._A[j]
+            sentido = np.sign(a)  # Descer onde a > 0 (subir onde a < 0) reduz a violação
+            podem = self.espaco.inteiro & (sentido != 0) & np.where(sentido > 0, x > self.espaco.minimos, x < self.espaco.maximos)
+            candidatos = np.flatnonzero(podem)
+            # Primeiro os que o arredondamento mais empurrou para fora
+            for i in candidatos[np.argsort(-(x[candidatos] - continuo[candidatos]) * sentido[candidatos], kind='stable')]:
+                x[i] -= sentido[i]
+                excesso[j] -= abs(a[i])
+                if excesso[j] <= TOLERANCIA: break
+        return x
+
+    def texto_relatorio(self, rejeitadas):
+        lineares = sum(r.linear for r in self.restricoes)
+        return (f"Restrições: {len(self.restricoes)} ({lineares} linear(es), projetáveis) | "
+                f"{rejeitadas} candidatos inviáveis rejeitados sem rodar o modelo")
+
+def marcar_trial(trial, restricoes, params):
+    """Grava a violação de cada restrição no trial (o TPE e o best_trial do Optuna usam)"""
+    if restricoes is None: return
+    definir = getattr(trial, 'set_constraint', None)
+    if definir is None: return  # Optuna < 5: o sampler não vê as restrições (o inviável continua sem rodar)
+    for nome, violacao in restricoes.violacoes_params(params).items():
+        definir(nome, min(violacao, 1e300))
@@ -0,0 +1,419 @@
+import json
+import argparse
+import os
+import re
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from vagas_compartilhadas import ServidorVagas, VARIAVEL_ENDERECO, VARIAVEL_TRABALHO
+
+# ==============================================================================
+# SERVIÇO LOCAL DE OTIMIZAÇÃO (fila de trabalhos + pool de vagas compartilhado)
+# Em vez de abrir um main.py/swarm/pattern/simplex por modelo e deixar todos
+# brigando pelos núcleos, um serviço recebe os trabalhos por HTTP local:
+#   python servico.py iniciar --vagas 8                   (o serviço)
+#   python servico.py enviar --config X.json --estrategia hibrido --max ...
+# Cada trabalho (config + estratégia + objetivo + orçamento) roda o script de
+# sempre num subprocesso. Ele fica na fila enquanto houver --max-trabalhos
+# rodando. Todas as execuções do modelo, de todos os trabalhos, passam pelas
+# mesmas N vagas (vagas_compartilhadas.py), divididas de forma justa: um
+# trabalho curto não espera atrás de um de várias horas. A saída de cada
+# trabalho vai para servico/<id>.log e pode ser acompanhada ao vivo.
+# API (só em 127.0.0.1):
+#   POST   /trabalhos              {"config", "estrategia", "objetivo", "max_avaliacoes",
+#                                   "tempo_max", "workers", "argumentos": [...]}
+#   GET    /trabalhos              lista (estado, vagas em uso, execuções, última linha)
+#   GET    /trabalhos/<id>         um trabalho
+#   GET    /trabalhos/<id>/log     saída (?desde=<byte> ; ?seguir=1 transmite até o fim)
+#   GET    /trabalhos/<id>/relatorio   relatório final do script
+#   DELETE /trabalhos/<id>         cancela (Ctrl+C no script: ele ainda grava o relatório)
+#   GET    /vagas                  ocupação do pool
+# ==============================================================================
+PASTA = os.path.dirname(os.path.abspath(__file__))
+PASTA_SERVICO = 'servico'
+PORTA_PADRAO = 8765
+SCRIPTS = {'hibrido': 'main.py', 'swarm': 'optimize_swarm_infinito.py',
+           'pattern': 'optimize_pattern_infinito.py', 'simplex': 'optimize_simplex.py', 'spsa': 'optimize_spsa.py'}
+NA_FILA, RODANDO, CONCLUIDO, FALHOU, CANCELADO = 'NA FILA', 'RODANDO', 'CONCLUÍDO', 'FALHOU', 'CANCELADO'
+ESPERA_CTRL_C = 60  # Segundos para o script gravar o relatório antes de ser morto
+
+def validar_pedido(pedido):
+    """Confere um pedido de trabalho. Retorna a mensagem de erro ou None"""
+    config = pedido.get('config')
+    if not config or not os.path.isfile(config): return f"config não encontrada: {config}"
+    if pedido.get('estrategia', 'hibrido') not in SCRIPTS: return f"estratégia inválida (use {', '.join(SCRIPTS)})"
+    if pedido.get('objetivo') not in ('maximizar', 'minimizar'): return "objetivo precisa ser 'maximizar' ou 'minimizar'"
+    for campo in ('max_avaliacoes', 'tempo_max', 'workers'):
+        valor = pedido.get(campo)
+        if valor is not None and (not isinstance(valor, (int, float)) or valor <= 0): return f"{campo} precisa ser positivo"
+    if not isinstance(pedido.get('argumentos', []), list): return "argumentos precisa ser uma lista"
+    return None
+
+def montar_comando(pedido, run_id, workers_padrao):
+    """Linha de comando do script da estratégia (o orçamento do main.py vira --budget-evals/--budget-time)"""
+    estrategia = pedido.get('estrategia', 'hibrido')
+    comando = [sys.executable, os.path.join(PASTA, SCRIPTS[estrategia]), '--config', os.path.abspath(pedido['config']),
+               '--max' if pedido['objetivo'] == 'maximizar' else '--min', '--run-id', run_id,
+               '--workers', str(int(pedido.get('workers') or workers_padrao))]
+    avaliacoes, tempo = pedido.get('max_avaliacoes'), pedido.get('tempo_max')
+    if estrategia == 'hibrido':
+        if avaliacoes: comando += ['--budget-evals', str(int(avaliacoes))]
+        if tempo: comando += ['--budget-time', str(tempo)]
+    else:
+        if avaliacoes: comando += ['--max-avaliacoes', str(int(avaliacoes))]
+        if tempo: comando += ['--tempo-max', str(tempo)]
+    return comando + [str(a) for a in pedido.get('argumentos', [])]
+
+class Trabalho:
+    def __init__(self, id_trabalho, pedido):
+        self.id = id_trabalho
+        self.pedido = pedido
+        self.estado = NA_FILA
+        self.criado_em = datetime.now().isoformat(timespec='seconds')
+        self.inicio = None
+        self.fim = None
+        self.codigo = None
+        self.cancelar = False
+        self.proc = None
+        self.log = os.path.join(PASTA_SERVICO, f"{id_trabalho}.log")
+
+    @property
+    def terminado(self):
+        return self.estado in (CONCLUIDO, FALHOU, CANCELADO)
+
+    def _ler_log(self):
+        try:
+            with open(self.log, 'r', encoding='utf-8', errors='replace') as f: return f.read()
+        except OSError:
+            return ''
+
+    def relatorio(self):
+        """Caminho do relatório que o script anunciou na saída (None antes de terminar)"""
+        achados = re.findall(r'(relatorio_\S+?\.txt)', self._ler_log())
+        if not achados: return None
+        return os.path.join(os.path.dirname(os.path.abspath(self.pedido['config'])), achados[-1])
+
+    def resumo(self, vagas=None):
+        linhas = [l for l in self._ler_log().splitlines() if l.strip()]
+        vagas = vagas or {}
+        duracao = None
+        if self.inicio is not None: duracao = (self.fim or time.time()) - self.inicio
+        return {'id': self.id, 'estado': self.estado, 'estrategia': self.pedido.get('estrategia', 'hibrido'),
+                'config': self.pedido['config'], 'objetivo': self.pedido['objetivo'], 'criado_em': self.criado_em,
+                'duracao': duracao, 'codigo_saida': self.codigo, 'vagas_em_uso': vagas.get('em_uso', 0),
+                'esperando_vaga': vagas.get('esperando', 0), 'execucoes': vagas.get('execucoes', 0),
+                'ultima_linha': linhas[-1] if linhas else '', 'relatorio': self.relatorio() if self.terminado else None}
+
+class Servico:
+    def __init__(self, vagas, max_trabalhos, workers_padrao=None):
+        self.vagas = ServidorVagas(vagas)
+        self.max_trabalhos = max_trabalhos
+        self.workers_padrao = workers_padrao or vagas  # Sozinho, um trabalho pode ocupar o pool inteiro
+        self.trabalhos = {}
+        self._prefixo = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self._contador = 0
+        self._lock = threading.Lock()
+        self._mudou = threading.Condition(self._lock)
+        self._encerrando = False
+        os.makedirs(PASTA_SERVICO, exist_ok=True)
+        self._supervisor = threading.Thread(target=self._supervisionar, name='supervisor', daemon=True)
+        self._supervisor.start()
+
+    # --- FILA ---
+    def submeter(self, pedido):
+        if not isinstance(pedido, dict): raise ValueError("o corpo precisa ser um objeto JSON")
+        pedido = dict(pedido)
+        pedido['config'] = os.path.abspath(pedido.get('config') or '')
+        pedido.setdefault('estrategia', 'hibrido')
+        erro = validar_pedido(pedido)
+        if erro: raise ValueError(erro)
+        with self._lock:
+            if self._encerrando: raise ValueError("o serviço está encerrando")
+            self._contador += 1
+            modelo = re.sub(r'[^A-Za-z0-9_-]+', '_', os.path.splitext(os.path.basename(pedido['config']))[0])
+            trabalho = Trabalho(f"{self._prefixo}_{self._contador:03d}_{pedido['estrategia']}_{modelo}", pedido)
+            self.trabalhos[trabalho.id] = trabalho
+            self._mudou.notify_all()
+        print(f"[SERVIÇO] Trabalho {trabalho.id} na fila")
+        return trabalho
+
+    def cancelar(self, id_trabalho):
+        with self._lock:
+            trabalho = self.trabalhos[id_trabalho]
+            if trabalho.terminado: return trabalho
+            trabalho.cancelar = True
+            if trabalho.estado == NA_FILA:
+                trabalho.estado = CANCELADO
+            else:
+                self._ctrl_c(trabalho)
+            self._mudou.notify_all()
+        return trabalho
+
+    def situacao(self, id_trabalho=None):
+        vagas = self.vagas.situacao()['trabalhos']
+        with self._lock:
+            if id_trabalho is not None: return self.trabalhos[id_trabalho].resumo(vagas.get(id_trabalho))
+            return [t.resumo(vagas.get(t.id)) for t in self.trabalhos.values()]
+
+    # --- PROCESSOS ---
+    def _ctrl_c(self, trabalho):
+        """Mesmo Ctrl+C do benchmark.py: o script para e grava o relatório"""
+        if trabalho.proc is None or trabalho.proc.poll() is not None: return
+        try: trabalho.proc.send_signal(signal.CTRL_BREAK_EVENT if os.name == 'nt' else signal.SIGINT)
+        except OSError: pass
+
+    def _iniciar(self, trabalho):
+        ambiente = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+        ambiente[VARIAVEL_ENDERECO] = self.vagas.endereco
+        ambiente[VARIAVEL_TRABALHO] = trabalho.id
+        kwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == 'nt' else {'start_new_session': True}
+        comando = montar_comando(trabalho.pedido, trabalho.id, self.workers_padrao)
+        with open(trabalho.log, 'w', encoding='utf-8') as log:
+            log.write(f"$ {' '.join(shlex.quote(c) for c in comando)}\n")
+            log.flush()
+            trabalho.proc = subprocess.Popen(comando, cwd=os.path.dirname(trabalho.pedido['config']), env=ambiente,
+                                             stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, **kwargs)
+        trabalho.estado = RODANDO
+        trabalho.inicio = time.time()
+        print(f"[SERVIÇO] Trabalho {trabalho.id} rodando (pid {trabalho.proc.pid})")
+
+    def _supervisionar(self):
+        while True:
+            with self._lock:
+                for trabalho in self.trabalhos.values():
+                    if trabalho.estado != RODANDO or trabalho.proc.poll() is None: continue
+                    trabalho.codigo = trabalho.proc.returncode
+                    trabalho.fim = time.time()
+                    if trabalho.cancelar: trabalho.estado = CANCELADO
+                    else: trabalho.estado = CONCLUIDO if trabalho.codigo == 0 else FALHOU
+                    print(f"[SERVIÇO] Trabalho {trabalho.id}: {trabalho.estado} ({trabalho.fim - trabalho.inicio:.0f}s)")
+                rodando = sum(1 for t in self.trabalhos.values() if t.estado == RODANDO)
+                for trabalho in self.trabalhos.values():
+                    if self._encerrando or rodando >= self.max_trabalhos: break
+                    if trabalho.estado != NA_FILA: continue
+                    try:
+                        self._iniciar(trabalho)
+                        rodando += 1
+                    except OSError as e:
+                        trabalho.estado, trabalho.fim = FALHOU, time.time()
+                        print(f"[SERVIÇO] Trabalho {trabalho.id} não iniciou: {e}")
+                if self._encerrando and rodando == 0: return
+                self._mudou.wait(timeout=0.5)
+
+    def fechar(self):
+        """Ctrl+C em tudo o que está rodando, espera os relatórios e encerra (a fila é cancelada)"""
+        with self._lock:
+            self._encerrando = True
+            for trabalho in self.trabalhos.values():
+                if trabalho.estado == NA_FILA: trabalho.estado = CANCELADO
+                elif trabalho.estado == RODANDO:
+                    trabalho.cancelar = True
+                    self._ctrl_c(trabalho)
+            self._mudou.notify_all()
+        self._supervisor.join(timeout=ESPERA_CTRL_C)
+        for trabalho in self.trabalhos.values():
+            if trabalho.proc is not None and trabalho.proc.poll() is None: trabalho.proc.kill()
+        self.vagas.fechar()
+
+# --- HTTP ---
+class _Tratador(BaseHTTPRequestHandler):
+    servico = None  # Preenchido em iniciar_servico
+
+    def log_message(self, formato, *args): pass  # O serviço já imprime o que importa
+
+    def _responder(self, codigo, dados):
+        corpo = json.dumps(dados, ensure_ascii=False, indent=2).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _rota(self):
+        url = urllib.parse.urlparse(self.path)
+        return [p for p in url.path.split('/') if p], urllib.parse.parse_qs(url.query)
+
+    def _trabalho(self, id_trabalho):
+        trabalho = self.servico.trabalhos.get(id_trabalho)
+        if trabalho is None: self._responder(404, {'erro': f"trabalho {id_trabalho} não existe"})
+        return trabalho
+
+    def do_GET(self):
+        partes, consulta = self._rota()
+        if partes == ['vagas']: return self._responder(200, self.servico.vagas.situacao())
+        if partes == ['trabalhos']: return self._responder(200, self.servico.situacao())
+        if len(partes) < 2 or partes[0] != 'trabalhos': return self._responder(404, {'erro': 'rota desconhecida'})
+        trabalho = self._trabalho(partes[1])
+        if trabalho is None: return
+        if len(partes) == 2: return self._responder(200, self.servico.situacao(trabalho.id))
+        if partes[2:] == ['log']:
+            return self._transmitir_log(trabalho, int(consulta.get('desde', ['0'])[0]), consulta.get('seguir', ['0'])[0] == '1')
+        if partes[2:] == ['relatorio']:
+            caminho = trabalho.relatorio()
+            if caminho is None or not os.path.exists(caminho):
+                return self._responder(404, {'erro': 'relatório ainda não existe', 'estado': trabalho.estado})
+            with open(caminho, 'r', encoding='utf-8', errors='replace') as f:
+                return self._responder(200, {'relatorio': caminho, 'texto': f.read()})
+        self._responder(404, {'erro': 'rota desconhecida'})
+
+    def _transmitir_log(self, trabalho, desde, seguir):
+        """Texto do log a partir do byte `desde`; com seguir, continua mandando até o trabalho terminar"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        posicao = desde
+        try:
+            while True:
+                terminado = trabalho.terminado  # Lido antes: o que o processo escreveu até aqui sai nesta volta
+                if os.path.exists(trabalho.log):
+                    with open(trabalho.log, 'rb') as f:
+                        f.seek(posicao)
+                        novo = f.read()
+                    if novo:
+                        self.wfile.write(novo)
+                        self.wfile.flush()
+                        posicao += len(novo)
+                if not seguir or terminado: return
+                time.sleep(0.5)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def do_POST(self):
+        partes, _ = self._rota()
+        if partes != ['trabalhos']: return self._responder(404, {'erro': 'rota desconhecida'})
+        try:
+            pedido = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            trabalho = self.servico.submeter(pedido)
+        except ValueError as e:
+            return self._responder(400, {'erro': str(e)})
+        self._responder(201, self.servico.situacao(trabalho.id))
+
+    def do_DELETE(self):
+        partes, _ = self._rota()
+        if len(partes) != 2 or partes[0] != 'trabalhos': return self._responder(404, {'erro': 'rota desconhecida'})
+        trabalho = self._trabalho(partes[1])
+        if trabalho is None: return
+        self.servico.cancelar(trabalho.id)
+        self._responder(200, self.servico.situacao(trabalho.id))
+
+def _encerrar(*_):
+    raise KeyboardInterrupt
+
+def iniciar_servico(args):
+    # Ctrl+C, kill -INT e kill -TERM encerram do mesmo jeito. Em segundo plano o SIGINT chega ignorado;
+    # com o tratador do Python, os scripts lançados voltam a receber o Ctrl+C do cancelamento
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    if os.name != 'nt': signal.signal(signal.SIGTERM, _encerrar)
+    servico = Servico(args.vagas, args.max_trabalhos, args.workers)
+    _Tratador.servico = servico
+    http = ThreadingHTTPServer(('127.0.0.1', args.porta), _Tratador)
+    http.daemon_threads = True
+    print("\n" + "="*60)
+    print("           SERVIÇO DE OTIMIZAÇÃO")
+    print("="*60)
+    print(f"API       : http://127.0.0.1:{http.server_address[1]}/trabalhos")
+    print(f"Vagas     : {args.vagas} execuções simultâneas do modelo, divididas entre os trabalhos")
+    print(f"Trabalhos : até {args.max_trabalhos} rodando ao mesmo tempo (o resto espera na fila)")
+    print(f"Logs      : {os.path.abspath(PASTA_SERVICO)}")
+    print("(Pressione Ctrl+C para encerrar: os trabalhos em andamento gravam seus relatórios)")
+    try:
+        http.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Encerrando o serviço...")
+    finally:
+        http.server_close()
+        servico.fechar()
+
+# --- CLIENTE (linha de comando) ---
+def _pedir(args, caminho, metodo='GET', corpo=None):
+    dados = json.dumps(corpo).encode('utf-8') if corpo is not None else None
+    requisicao = urllib.request.Request(f"http://127.0.0.1:{args.porta}{caminho}", data=dados, method=metodo,
+                                        headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(requisicao) as resposta: return json.loads(resposta.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        sys.exit(f"Erro: {json.loads(e.read().decode('utf-8')).get('erro', e)}")
+    except urllib.error.URLError as e:
+        sys.exit(f"Serviço fora do ar em 127.0.0.1:{args.porta} ({e.reason}). Inicie com: python servico.py iniciar")
+
+def _seguir_log(args, id_trabalho):
+    url = f"http://127.0.0.1:{args.porta}/trabalhos/{urllib.parse.quote(id_trabalho)}/log?seguir=1"
+    try:
+        with urllib.request.urlopen(url) as resposta:
+            for linha in resposta: sys.stdout.write(linha.decode('utf-8', errors='replace')); sys.stdout.flush()
+    except KeyboardInterrupt:
+        print(f"\n(O trabalho continua no serviço. Para cancelar: python servico.py cancelar {id_trabalho})")
+        return
+    except urllib.error.URLError as e:
+        sys.exit(f"Serviço fora do ar em 127.0.0.1:{args.porta} ({e.reason})")
+    final = _pedir(args, f"/trabalhos/{urllib.parse.quote(id_trabalho)}")
+    print(f"\n[SERVIÇO] {final['id']}: {final['estado']} | relatório: {final['relatorio']}")
+
+def enviar(args):
+    pedido = {'config': os.path.abspath(args.config), 'estrategia': args.estrategia,
+              'objetivo': 'maximizar' if args.max else 'minimizar', 'max_avaliacoes': args.max_avaliacoes,
+              'tempo_max': args.tempo_max, 'workers': args.workers, 'argumentos': shlex.split(args.extra or '')}
+    trabalho = _pedir(args, '/trabalhos', 'POST', pedido)
+    print(f"Trabalho enviado: {trabalho['id']} ({trabalho['estado']})")
+    if not args.sem_seguir: _seguir_log(args, trabalho['id'])
+
+def listar(args):
+    trabalhos = _pedir(args, '/trabalhos')
+    vagas = _pedir(args, '/vagas')
+    print(f"Vagas: {vagas['capacidade'] - vagas['livres']}/{vagas['capacidade']} em uso")
+    print(f"{'TRABALHO':<44}{'ESTADO':<12}{'VAGAS':>6}{'FILA':>6}{'EXECUÇÕES':>11}{'TEMPO':>9}")
+    for t in trabalhos:
+        tempo = f"{t['duracao']:.0f}s" if t['duracao'] is not None else '-'
+        print(f"{t['id']:<44}{t['estado']:<12}{t['vagas_em_uso']:>6}{t['esperando_vaga']:>6}{t['execucoes']:>11}{tempo:>9}")
+        if t['ultima_linha']: print(f"    {t['ultima_linha'][:100]}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de otimização (fila de trabalhos + vagas compartilhadas)")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help="Porta HTTP do serviço (só 127.0.0.1)")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    p = comandos.add_parser('iniciar', help="Sobe o serviço")
+    p.add_argument('--vagas', type=int, default=os.cpu_count() or 1, help="Execuções simultâneas do modelo, somando todos os trabalhos")
+    p.add_argument('--max-trabalhos', type=int, default=4, help="Trabalhos rodando ao mesmo tempo (o resto espera na fila)")
+    p.add_argument('--workers', type=int, default=None, help="--workers de cada trabalho quando o pedido não diz (padrão: --vagas)")
+
+    p = comandos.add_parser('enviar', help="Envia um trabalho e acompanha a saída")
+    p.add_argument('-c', '--config', required=True)
+    p.add_argument('--estrategia', choices=tuple(SCRIPTS), default='hibrido')
+    objetivo = p.add_mutually_exclusive_group(required=True)
+    objetivo.add_argument('--max', action='store_true')
+    objetivo.add_argument('--min', action='store_true')
+    p.add_argument('--max-avaliacoes', type=int, default=None, help="Orçamento de avaliações (no hibrido: --budget-evals)")
+    p.add_argument('--tempo-max', type=float, default=None, help="Orçamento em segundos (no hibrido: --budget-time)")
+    p.add_argument('--workers', type=int, default=None)
+    p.add_argument('--extra', type=str, default=None, help='Argumentos a mais para o script (ex.: "--motor hooke-jeeves")')
+    p.add_argument('--sem-seguir', action='store_true', help="Só envia (não acompanha a saída)")
+
+    comandos.add_parser('listar', help="Trabalhos e ocupação das vagas")
+    p = comandos.add_parser('log', help="Acompanha a saída de um trabalho")
+    p.add_argument('id')
+    p = comandos.add_parser('cancelar', help="Cancela um trabalho (Ctrl+C no script, que grava o relatório)")
+    p.add_argument('id')
+
+    args = parser.parse_args()
+    if args.comando == 'iniciar':
+        if args.vagas < 1 or args.max_trabalhos < 1: parser.error("--vagas e --max-trabalhos precisam ser positivos")
+        iniciar_servico(args)
+    elif args.comando == 'enviar': enviar(args)
+    elif args.comando == 'listar': listar(args)
+    elif args.comando == 'log': _seguir_log(args, args.id)
+    elif args.comando == 'cancelar':
+        t = _pedir(args, f"/trabalhos/{urllib.parse.quote(args.id)}", 'DELETE')
+        print(f"{t['id']}: {t['estado']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import queue
+import subprocess
+import threading
+import time
+
+# ==============================================================================
+# MODO SERVIDOR (executável de vida longa)
+# Declarado no JSON com "backend": "servidor". O .exe é iniciado uma vez
+# por worker e fica lendo do stdin uma linha de parâmetros por avaliação:
+#     entrada : "500 500 alto 0.25"
+#     saída   : "Valor de saída: 1234.5"   (ou só o número; "ERRO..." = falha)
+# Se o processo morrer, ele é reiniciado automaticamente. Com "timeout" em
+# "execucao", um servidor que não responde a tempo é morto (a avaliação conta
+# como falha) e reiniciado na próxima. O modo argv (um .exe por avaliação)
+# continua sendo o padrão. Com "pasta_isolada" no JSON, cada servidor roda a
+# vida toda na sua própria pasta de trabalho.
+# ==============================================================================
+class ServidorModelo:
+    def __init__(self, executavel, argumentos_extras=(), pasta=None, timeout=None):
+        self.executavel = executavel
+        self.argumentos_extras = list(argumentos_extras)
+        self.pasta = pasta
+        self.timeout = timeout
+        self.processo = None
+        self._linhas = None
+        self.reinicios = 0
+        self.timeouts = 0
+        self.interrompido = False
+
+    def iniciar(self):
+        self.processo = subprocess.Popen(
+            [self.executavel, *self.argumentos_extras],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1, cwd=self.pasta
+        )
+        self._linhas = queue.SimpleQueue()
+        threading.Thread(target=self._ler_saida, args=(self.processo.stdout, self._linhas), daemon=True).start()
+
+    @staticmethod
+    def _ler_saida(saida, linhas):
+        """Thread leitora: o readline bloqueante fica aqui, e o _pedir espera na fila com timeout"""
+        try:
+            for linha in saida: linhas.put(linha)
+        except (OSError, ValueError): pass
+        linhas.put(None)  # Fim da saída
+
+    def _ativo(self):
+        return self.processo is not None and self.processo.poll() is None
+
+    def _pedir(self, argumentos):
+        self.processo.stdin.write(' '.join(str(a) for a in argumentos) + '\n')
+        self.processo.stdin.flush()
+        limite = time.monotonic() + self.timeout if self.timeout is not None else None
+        while True:
+            espera = max(0.0, limite - time.monotonic()) if limite is not None else None
+            try: linha = self._linhas.get(timeout=espera)
+            except queue.Empty: raise TimeoutError(f"Servidor sem resposta em {self.timeout}s") from None
+            if linha is None: raise EOFError("Servidor encerrou a saída")
+            linha = linha.strip()
+            if not linha: continue
+            if linha.upper().startswith('ERRO'): return None
+            if 'Valor de saída:' in linha:
+                return float(linha.split(':')[-1].strip())
+            try: return float(linha)
+            except ValueError: continue # Mensagens de log do modelo são ignoradas
+
+    def avaliar(self, argumentos):
+        """Envia uma linha de parâmetros; reinicia o servidor e tenta de novo uma vez se ele cair"""
+        for tentativa in range(2):
+            if self.interrompido: return None  # Morto pelo Ctrl+C: não reinicia para repetir a avaliação
+            if not self._ativo():
+                if self.processo is not None: self.fechar()
+                self.iniciar()
+            try:
+                return self._pedir(argumentos)
+            except TimeoutError:
+                self.fechar(matar=True)  # Travado neste ponto: sem segunda tentativa, reinicia na próxima avaliação
+                self.timeouts += 1
+                return None
+            except (BrokenPipeError, EOFError, OSError):
+                self.fechar()
+                self.reinicios += 1
+            except ValueError:
+                return None
+        return None
+
+    def interromper(self):
+        """Mata o servidor no meio da avaliação; quem esperava a resposta recebe None"""
+        self.interrompido = True
+        processo = self.processo
+        if processo is not None: processo.kill()
+
+    def fechar(self, matar=False):
+        if self.processo is None: return
+        try:
+            if matar: self.processo.kill()
+            self.processo.stdin.close()
+            self.processo.wait(timeout=2)
+        except Exception:
+            self.processo.kill()
+        self.processo = None
+
+class PoolServidores:
+    """Um ServidorModelo por worker: cada avaliação simultânea pega um servidor livre"""
+
+    def __init__(self, executavel, argumentos_extras=(), pastas=None, timeout=None):
+        self.executavel = pastas.executavel(executavel) if pastas is not None else executavel
+        self.argumentos_extras = argumentos_extras
+        self.pastas = pastas
+        self.timeout = timeout
+        self._livres = queue.SimpleQueue()
+        self._todos = []
+        self._lock = threading.Lock()
+
+    def avaliar(self, argumentos):
+        try:
+            servidor = self._livres.get_nowait()
+        except queue.Empty:
+            pasta = self.pastas.pegar() if self.pastas is not None else None
+            servidor = ServidorModelo(self.executavel, self.argumentos_extras, pasta, self.timeout)
+            with self._lock: self._todos.append(servidor)
+        try:
+            return servidor.avaliar(argumentos)
+        finally:
+            self._livres.put(servidor)
+
+    def interromper(self):
+        with self._lock:
+            for servidor in self._todos: servidor.interromper()
+
+    def fechar(self):
+        with self._lock:
+            for servidor in self._todos: servidor.fechar()
@@ -0,0 +1,260 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from poll_paralelo import eh_melhor
+
+# ==============================================================================
+# MOTOR SPSA (gradiente por perturbação simultânea)
+# O Pattern Search gasta 2N execuções por varredura (N = nº de parâmetros).
+# O SPSA estima a direção de descida com 2 execuções por iteração, seja qual
+# for N: perturba TODOS os parâmetros numéricos de uma vez em ±h·Δ (Δ sorteado
+# em {-1, +1}) e usa g_i = (f(x+) - f(x-)) / (x+_i - x-_i).
+#   - x+ e x- são projetados nos limites, na malha (inteiro arredonda) e nas
+#     restrições lineares; a diferença usada é a que sobrou depois da projeção
+#   - passo: a direção é normalizada (a maior coordenada anda salto·h; eixo
+#     no limite e empurrado para fora fica parado). O salto começa no último
+#     que deu certo e dobra enquanto melhora; se o primeiro já piora, recua
+#     pela metade até 1. É o ganho adaptativo no lugar do a_k fixo do SPSA
+#     clássico, que na malha inteira some no arredondamento. Um ponto só vira
+#     incumbente se foi avaliado e é melhor (x+ e x- também concorrem)
+#   - h começa no "passo" do JSON (ou 5% da faixa) e cai pela metade depois de
+#     FALHAS_SPSA iterações seguidas sem melhoria. Com h no mínimo (inteiro 1,
+#     float 0.001), uma diagonal sorteada quase nunca melhora: antes de dar como
+#     convergido, roda uma iteração com diferenças centrais (os 2N vizinhos
+#     coordenados, avaliados juntos: mesmo critério de malha mínima do Pattern
+#     Search) e, se ela melhora, o SPSA continua dali
+#   - --spsa-medias K: média de K estimativas por iteração (2K pontos avaliados
+#     juntos, menos ruído) | --gradiente diferencas: diferenças centrais em cada
+#     eixo (2N pontos avaliados juntos; vale a pena com N workers livres)
+#   - categóricos não entram no gradiente: as outras categorias são testadas
+#     na malha mínima, antes de dar como convergido
+# ==============================================================================
+MOTOR_SPSA = 'spsa'  # Nome do motor na Fase 2 do main.py (--motor spsa)
+GRADIENTES = ('spsa', 'diferencas')
+FALHAS_SPSA = 3  # Estimativa ruim é sorte do sorteio: só reduz h depois de algumas seguidas
+
+def adicionar_argumentos_spsa(parser):
+    parser.add_argument('--gradiente', choices=GRADIENTES, default='spsa',
+                        help="spsa: 2 avaliações por iteração | diferencas: diferenças centrais (2N por iteração)")
+    parser.add_argument('--spsa-medias', type=int, default=1, metavar='K',
+                        help="Média de K estimativas SPSA por iteração (2K avaliações simultâneas)")
+    parser.add_argument('--semente', type=int, default=None, help="Semente das perturbações do SPSA")
+
+def validar_argumentos_spsa(parser, args):
+    if args.spsa_medias < 1: parser.error("--spsa-medias precisa ser pelo menos 1")
+
+def opcoes_spsa(args):
+    """kwargs do SPSA a partir da linha de comando"""
+    return {'gradiente': args.gradiente, 'medias': args.spsa_medias, 'semente': args.semente}
+
+class SPSA:
+    """
+    Mesma interface do HookeJeeves (base, valor_base, iteracao, estado, iterar, rodar): serve de
+    motor da Fase 2 do main.py e do multi-start. `estado` retoma de um checkpoint.
+    """
+    def __init__(self, avaliador, objetivo_escolhido, workers=1, params_iniciais=None, valor_inicial=None,
+                 estado=None, rotulo='', gradiente='spsa', medias=1, semente=None):
+        self.avaliador = avaliador
+        self.objetivo = objetivo_escolhido
+        self.workers = max(1, int(workers))
+        self.rotulo = rotulo
+        self.gradiente = gradiente
+        self.medias = max(1, int(medias))
+        self.espaco = avaliador.espaco
+        self.livres = ~self.espaco.categorico
+        self.minimos = np.where(self.livres, self.espaco.passos_minimos, 0.0)
+        self.passos_iniciais = self.espaco.passos_iniciais
+        self.tolerancia = 1 if gradiente == 'diferencas' else FALHAS_SPSA  # Diferenças centrais não têm sorteio
+        self._rng = np.random.default_rng(semente)
+        self._memo = {}  # Chave do vetor -> valor (pontos repetidos na malha não rodam de novo)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        if estado:
+            self.base, self.valor_base = estado['melhores_params'], estado['melhor_resultado']
+            self.escala, self.salto = estado['escala'], estado.get('salto', 1.0)
+            self.falhas = estado.get('falhas', 0)
+            self.iteracao = estado['iteracao']
+        else:
+            self.base, self.valor_base = dict(params_iniciais), valor_inicial
+            self.escala, self.salto = 1.0, 1.0
+            self.falhas = 0
+            self.iteracao = 0
+        self.x = self.espaco.projetar(self.espaco.codificar(self.base))
+        if self.valor_base is not None: self._memo[tuple(self.x)] = self.valor_base  # Diferença de um lado só na borda
+
+    def estado(self):
+        return {'melhores_params': self.base, 'melhor_resultado': self.valor_base, 'escala': self.escala,
+                'salto': self.salto, 'falhas': self.falhas, 'iteracao': self.iteracao}
+
+    # --- ESPAÇO DE BUSCA ---
+    def _h(self):
+        """Perturbação atual em cada eixo (unidades do parâmetro)"""
+        return np.maximum(self.minimos, self.passos_iniciais * self.escala)
+
+    def _projetar(self, vetores):
+        """Limites, malha e restrições lineares (Avaliador.projetar)"""
+        return self.avaliador.projetar(vetores)
+
+    def _no_minimo(self):
+        return bool(np.all(self.passos_iniciais * self.escala <= self.minimos))
+
+    # --- AVALIAÇÃO ---
+    def _custo(self, valor):
+        if valor is None: return np.inf
+        return -valor if self.objetivo == 'maximizar' else valor
+
+    def _avaliar_varios(self, vetores):
+        """Todos os pontos novos de uma vez (lote, event loop do executor ou threads). Retorna os valores"""
+        chaves = [tuple(v) for v in vetores]
+        novos = [c for c in dict.fromkeys(chaves) if c not in self._memo]
+        lista = [self.espaco.decodificar(np.array(c)) for c in novos]
+        if not lista: valores = []
+        elif self.avaliador.suporta_lote:
+            valores = self.avaliador.avaliar_lote(lista)
+        elif self.avaliador.suporta_concorrente and self.workers > 1:
+            valores = self.avaliador.avaliar_concorrente(lista, self.workers)
+        elif self._pool is not None and len(lista) > 1:
+            valores = list(self._pool.map(self.avaliador.avaliar, lista))
+        else:
+            valores = [self.avaliador.avaliar(params) for params in lista]
+        for chave, valor in zip(novos, valores): self._memo[chave] = valor
+        return [self._memo[c] for c in chaves]
+
+    def _pares(self, h, diferencas):
+        """Pontos (x+, x-) de cada estimativa do gradiente"""
+        if diferencas:
+            eixos = np.flatnonzero(self.livres)
+            direcoes = np.zeros((len(eixos), self.espaco.n))
+            direcoes[np.arange(len(eixos)), eixos] = 1.0
+        else:
+            direcoes = self._rng.choice((-1.0, 1.0), size=(self.medias, self.espaco.n)) * self.livres
+        return self._projetar(self.x + direcoes * h), self._projetar(self.x - direcoes * h)
+
+    def _estimar(self, mais, menos, valores):
+        """Gradiente do custo (em unidades de h por eixo), média das estimativas válidas"""
+        n = len(mais)
+        custos = np.array([self._custo(v) for v in valores])
+        f_mais, f_menos = custos[:n], custos[n:]
+        soma, contagem = np.zeros(self.espaco.n), np.zeros(self.espaco.n)
+        for xm, xn, fm, fn in zip(mais, menos, f_mais, f_menos):
+            if not (np.isfinite(fm) and np.isfinite(fn)): continue  # Uma falha do .exe: estimativa descartada
+            diferenca = xm - xn
+            mexeu = diferenca != 0
+            soma[mexeu] += (fm - fn) / diferenca[mexeu]
+            contagem[mexeu] += 1
+        return np.where(contagem > 0, soma / np.maximum(contagem, 1), 0.0)
+
+    def _buscar_na_direcao(self, direcao, valor_referencia):
+        """Começa no último salto que deu certo e dobra enquanto melhorar. Retorna (ponto, valor) ou (None, None)"""
+        saltos, ponto, valor_ponto = 0, None, valor_referencia
+        fator, anterior = self.salto, self.x
+        while True:
+            candidato = self._projetar(self.x + fator * direcao)
+            if np.array_equal(candidato, anterior): break  # Preso no limite ou abaixo da malha
+            valor = self._avaliar_varios([candidato])[0]
+            if valor is None or not eh_melhor(valor, valor_ponto, self.objetivo): break
+            ponto, valor_ponto, self.salto = candidato, valor, fator
+            saltos += 1
+            fator, anterior = fator * 2, candidato
+        while not saltos and fator > 1:  # O salto guardado passou do ponto: recua sem jogar fora o gradiente
+            fator /= 2
+            candidato = self._projetar(self.x + fator * direcao)
+            valor = self._avaliar_varios([candidato])[0]
+            if valor is not None and eh_melhor(valor, valor_ponto, self.objetivo):
+                ponto, valor_ponto, saltos = candidato, valor, 1
+            self.salto = fator
+        return (ponto, valor_ponto) if ponto is not None else (None, None)
+
+    # --- LOOP PRINCIPAL ---
+    def _aceitar(self, vetor, valor):
+        self.x, self.base, self.valor_base = vetor, self.espaco.decodificar(vetor), valor
+
+    def _passo_gradiente(self, diferencas):
+        """Estima o gradiente e anda na direção de descida. True se o incumbente melhorou"""
+        h = self._h()
+        mais, menos = self._pares(h, diferencas)
+        vetores = np.vstack((mais, menos))
+        valores = self._avaliar_varios(vetores)
+        gradiente = self._estimar(mais, menos, valores) * h  # Em passos de h: eixos com escalas diferentes comparáveis
+
+        # Melhor ponto perturbado (já foi avaliado, concorre de graça)
+        escolhido, valor_escolhido, origem = None, self.valor_base, "ponto perturbado"
+        for vetor, valor in zip(vetores, valores):
+            if valor is not None and eh_melhor(valor, valor_escolhido, self.objetivo):
+                escolhido, valor_escolhido = vetor, valor
+
+        # Eixo já no limite e empurrado para fora não entra na direção (senão ele dita a escala e os outros mal andam)
+        descida = -gradiente
+        descida[((self.x >= self.espaco.maximos) & (descida > 0)) | ((self.x <= self.espaco.minimos) & (descida < 0))] = 0.0
+        maior = np.max(np.abs(descida))
+        if maior > 0:
+            ponto, valor = self._buscar_na_direcao(descida / maior * h, self.valor_base)
+            if ponto is not None and (escolhido is None or eh_melhor(valor, valor_escolhido, self.objetivo)):
+                escolhido, valor_escolhido, origem = ponto, valor, f"salto de {self.salto:g}h"
+        if escolhido is None: return False
+        self._aceitar(escolhido, valor_escolhido)
+        tipo = "diferenças" if diferencas else "spsa"
+        print(f"  {self.rotulo}[Iteração {self.iteracao}] ✨ MELHORIA! ({tipo}, {origem}, h x{self.escala:g}) -> {self.valor_base}")
+        return True
+
+    def _trocar_categoria(self):
+        """Outras categorias do incumbente (o gradiente não mexe nelas). True se alguma melhorou"""
+        vizinhos = [v for v in self.espaco.vizinhos(self.base) if self.espaco.categorias[self.espaco.nomes.index(v[0])]]
+        if not vizinhos: return False
+        vetores = self.espaco.codificar_varios([v[2] for v in vizinhos])
+        escolhido, valor_escolhido = None, self.valor_base
+        for (nome, valor_teste, _), vetor, valor in zip(vizinhos, vetores, self._avaliar_varios(vetores)):
+            if valor is not None and eh_melhor(valor, valor_escolhido, self.objetivo):
+                escolhido, valor_escolhido, origem = vetor, valor, f"{nome}: {valor_teste}"
+        if escolhido is None: return False
+        self._aceitar(escolhido, valor_escolhido)
+        print(f"  {self.rotulo}[Iteração {self.iteracao}] ✨ MELHORIA! ({origem}) -> {self.valor_base}")
+        return True
+
+    def iterar(self):
+        """Uma estimativa do gradiente + busca na direção. Retorna 'melhorou', 'sem melhoria', 'reduziu' ou 'convergiu'"""
+        self.iteracao += 1
+        if self._passo_gradiente(self.gradiente == 'diferencas'):
+            self.falhas = 0
+            return 'melhorou'
+        self.falhas += 1
+        if self.falhas < self.tolerancia: return 'sem melhoria'
+        self.falhas = 0
+        if not self._no_minimo():
+            self.escala /= 2
+            return 'reduziu'
+        # Malha mínima: as diferenças centrais avaliam os 2N vizinhos coordenados (mesmo critério do Pattern Search)
+        if self.gradiente == 'spsa' and self._passo_gradiente(True): return 'melhorou'
+        return 'melhorou' if self._trocar_categoria() else 'convergiu'
+
+    def rodar(self, criterios=None, monitorar=False, ao_iterar=None, maxiter=None):
+        """
+        Itera até convergir, esgotar maxiter ou um critério disparar. Retorna o motivo da parada.
+        Ctrl+C é repassado; o incumbente continua em self.base/self.valor_base.
+        """
+        try:
+            while True:
+                if maxiter is not None and self.iteracao >= maxiter: return f"LIMITE DE ITERAÇÕES ({maxiter})"
+                resultado = self.iterar()
+                if resultado == 'reduziu':
+                    print(f"  {self.rotulo}[Iteração {self.iteracao}] Reduzindo perturbação: h x{self.escala:g}")
+                elif resultado == 'convergiu':
+                    if not monitorar:
+                        print(f"  {self.rotulo}[Iteração {self.iteracao}] Topo alcançado ({self.valor_base}) com a malha mínima.")
+                        return "CONVERGIU (MALHA MÍNIMA)"
+                    sys.stdout.write(f"\r  [Iteração {self.iteracao}] Topo alcançado ({self.valor_base}). Monitorando...")
+                    sys.stdout.flush()
+                    time.sleep(0.5)
+
+                if ao_iterar is not None: ao_iterar(self)
+                if criterios is not None:
+                    criterios.registrar_rodada(resultado == 'melhorou')
+                    motivo = criterios.verificar(self.valor_base, self.avaliador.avaliacoes)
+                    if motivo:
+                        print(f"  {self.rotulo}[Iteração {self.iteracao}] Critério de parada: {motivo}")
+                        return motivo
+        finally:
+            self.fechar()
+
+    def fechar(self):
+        if self._pool is not None: self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,42 @@
+import os
+import sys
+import pytest
+
+# ==============================================================================
+# TESTES (pytest) SOBRE OS MODELOS SINTÉTICOS
+# Os scripts ficam soltos na pasta de cima; os modelos de modelos_sinteticos.py
+# rodam no próprio processo (backend python), sem nenhum .exe.
+#     python -m pytest -q tests
+# ==============================================================================
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from avaliador import Avaliador
+from cache_avaliacoes import CacheAvaliacoes
+from modelos_sinteticos import MODELOS, gerar_config
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    """Cada teste roda numa pasta vazia (execucoes/ e o cache são relativos à pasta atual)"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def config_provab2():
+    return gerar_config('provab2')
+
+@pytest.fixture
+def abrir_avaliador(pasta):
+    """Avaliador(config, cache=...) fechado no fim do teste"""
+    abertos = []
+    def abrir(config, arquivo_cache=None):
+        cache = CacheAvaliacoes(str(pasta / arquivo_cache)) if arquivo_cache else None
+        avaliador = Avaliador(config, cache)
+        abertos.append((avaliador, cache))
+        return avaliador
+    yield abrir
+    for avaliador, cache in abertos:
+        avaliador.fechar()
+        if cache is not None: cache.fechar()
+
+def params_iniciais(nome):
+    return {p['nome']: p['valor_inicial'] for p in MODELOS[nome]['parametros']}
@@ -0,0 +1,53 @@
+from cache_avaliacoes import CacheAvaliacoes
+from conftest import params_iniciais
+
+def test_gravar_e_buscar(pasta):
+    modelo = pasta / 'modelo.exe'
+    modelo.write_bytes(b'versao 1')
+    cache = CacheAvaliacoes(str(pasta / 'cache.sqlite'))
+    assert cache.buscar(str(modelo), ['1', '2']) is None
+    cache.gravar(str(modelo), ['1', '2'], 42.5)
+    assert cache.buscar(str(modelo), ['1', '2']) == 42.5
+    assert cache.buscar(str(modelo), ['2', '1']) is None  # A ordem dos argumentos faz parte da chave
+    assert (cache.acertos, cache.faltas) == (1, 2)
+    cache.fechar()
+
+def test_falha_nao_fica_no_cache(pasta):
+    modelo = pasta / 'modelo.exe'
+    modelo.write_bytes(b'x')
+    cache = CacheAvaliacoes(str(pasta / 'cache.sqlite'))
+    cache.gravar(str(modelo), ['1'], None)
+    assert cache.buscar(str(modelo), ['1']) is None
+    cache.fechar()
+
+def test_executavel_alterado_invalida(pasta):
+    modelo = pasta / 'modelo.exe'
+    modelo.write_bytes(b'versao 1')
+    cache = CacheAvaliacoes(str(pasta / 'cache.sqlite'))
+    cache.gravar(str(modelo), ['1'], 1.0)
+    modelo.write_bytes(b'versao 2 (outro tamanho)')
+    assert cache.buscar(str(modelo), ['1']) is None
+    cache.fechar()
+
+def test_avaliador_nao_repete_avaliacao(abrir_avaliador, config_provab2):
+    avaliador = abrir_avaliador(config_provab2, 'cache.sqlite')
+    params = params_iniciais('provab2')
+    valor = avaliador.avaliar(params)
+    assert avaliador.avaliar(params) == valor
+    assert (avaliador.avaliacoes, avaliador.execucoes) == (2, 1)
+
+def test_cache_persiste_entre_execucoes(abrir_avaliador, config_provab2):
+    params = params_iniciais('provab2')
+    valor = abrir_avaliador(config_provab2, 'cache.sqlite').avaliar(params)
+    outro = abrir_avaliador(config_provab2, 'cache.sqlite')
+    assert outro.avaliar(params) == valor
+    assert outro.execucoes == 0
+
+def test_funcoes_do_mesmo_modulo_nao_dividem_o_cache(pasta, abrir_avaliador):
+    (pasta / 'dois_modelos.py').write_text("def dobro(p): return 2 * p['x']\ndef triplo(p): return 3 * p['x']\n")
+    parametros = [{'nome': 'x', 'tipo': 'inteiro', 'limites': [0, 10], 'valor_inicial': 1}]
+    valores = []
+    for funcao in ('dobro', 'triplo'):
+        config = {'backend': 'python', 'python': {'modulo': 'dois_modelos.py', 'funcao': funcao}, 'parametros': parametros}
+        valores.append(abrir_avaliador(config, 'cache.sqlite').avaliar({'x': 5}))
+    assert valores == [10.0, 15.0]
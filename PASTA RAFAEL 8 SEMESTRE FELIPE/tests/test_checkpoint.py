@@ -0,0 +1,86 @@
+import json
+import os
+from argparse import Namespace
+import optuna
+import pytest
+from optuna.trial import TrialState
+import checkpoint as modulo_checkpoint
+from checkpoint import abrir_checkpoint, gerar_run_id
+from hooke_jeeves import HookeJeeves
+from poll_paralelo import PollParalelo
+from conftest import params_iniciais
+
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+def _novo(run_id, config=None):
+    return abrir_checkpoint(Namespace(resume=None, run_id=run_id, config='cfg.json'), 'pattern',
+                            config or {'executavel': 'modelo.exe'}, 'maximizar')
+
+def _ler_estado(checkpoint):
+    with open(checkpoint.caminho('estado.json'), encoding='utf-8') as f: return json.load(f)
+
+def test_execucao_nova_grava_estado(pasta):
+    checkpoint = _novo('r1')
+    estado = _ler_estado(checkpoint)
+    assert estado['estrategia'] == 'pattern' and estado['retomadas'] == 0
+    assert not checkpoint.retomado
+
+def test_run_id_repetido_e_recusado(pasta):
+    _novo('r1')
+    with pytest.raises(ValueError, match='--resume r1'):
+        _novo('r1')
+
+def test_run_id_gerado_tem_o_pid(pasta):
+    run_id = gerar_run_id('swarm', {'executavel': 'pasta/meu modelo.exe'})
+    assert run_id.startswith('swarm_meu_modelo_')
+    assert run_id.endswith(f'_{os.getpid()}')
+
+def test_salvar_periodico_espera_o_intervalo(pasta, monkeypatch):
+    checkpoint = _novo('r1')
+    checkpoint.salvar_periodico(pattern={'iteracao': 1})
+    assert checkpoint.estado['pattern'] == {'iteracao': 1}  # Em memória na hora
+    assert 'pattern' not in _ler_estado(checkpoint)         # No disco só depois do intervalo
+    monkeypatch.setattr(modulo_checkpoint, 'INTERVALO_GRAVACAO', 0.0)
+    checkpoint.salvar_periodico(pattern={'iteracao': 2})
+    assert _ler_estado(checkpoint)['pattern'] == {'iteracao': 2}
+
+def test_retomada(pasta):
+    _novo('r1').salvar(pattern={'iteracao': 7})
+    retomado = abrir_checkpoint(Namespace(resume='r1'), 'pattern')
+    assert retomado.retomado and retomado.estado['retomadas'] == 1
+    assert retomado.estado['pattern'] == {'iteracao': 7}
+    with pytest.raises(ValueError, match='estratégia'):
+        abrir_checkpoint(Namespace(resume='r1'), 'simplex')
+    with pytest.raises(ValueError):
+        abrir_checkpoint(Namespace(resume='nao_existe'), 'pattern')
+
+def test_retomada_do_estudo_optuna(pasta):
+    checkpoint = _novo('r1')
+    study = checkpoint.criar_ou_carregar_estudo('maximize')
+    for x in (1.0, 2.0):
+        trial = study.ask({'x': optuna.distributions.FloatDistribution(0, 10)})
+        study.tell(trial, x)
+    study.ask()  # Morreu no meio (kill -9): fica RUNNING no journal
+
+    retomado = abrir_checkpoint(Namespace(resume='r1'), 'pattern')
+    study = retomado.criar_ou_carregar_estudo('maximize')
+    estados = [t.state for t in study.trials]
+    assert estados.count(TrialState.COMPLETE) == 2 and estados.count(TrialState.FAIL) == 1
+    assert study.best_value == 2.0
+
+def test_hooke_jeeves_continua_do_checkpoint(pasta, abrir_avaliador, config_provab2, monkeypatch):
+    monkeypatch.setattr(modulo_checkpoint, 'INTERVALO_GRAVACAO', 0.0)
+    avaliador = abrir_avaliador(config_provab2)
+    checkpoint = _novo('hj', config_provab2)
+    inicial = params_iniciais('provab2')
+    hj = HookeJeeves(avaliador, 'maximizar', PollParalelo(1), inicial, avaliador.avaliar(inicial))
+    for _ in range(3):
+        hj.iterar()
+        checkpoint.salvar_periodico(pattern=hj.estado())
+
+    salvo = abrir_checkpoint(Namespace(resume='hj'), 'pattern').estado['pattern']
+    retomado = HookeJeeves(avaliador, 'maximizar', PollParalelo(1), estado=salvo)
+    assert (retomado.base, retomado.valor_base, retomado.passos, retomado.iteracao) == \
+           (hj.base, hj.valor_base, hj.passos, 3)
+    retomado.iterar()
+    assert retomado.valor_base >= hj.valor_base and retomado.iteracao == 4
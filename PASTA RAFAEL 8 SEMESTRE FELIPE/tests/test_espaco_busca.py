@@ -0,0 +1,40 @@
+import numpy as np
+from espaco_busca import EspacoBusca
+
+def _espaco():
+    return EspacoBusca([
+        {'nome': 'n', 'tipo': 'inteiro', 'limites': [0, 100], 'passo': 10},
+        {'nome': 'taxa', 'tipo': 'float', 'limites': [0.0, 1.0]},
+        {'nome': 'metodo', 'tipo': 'categorico', 'limites': ['a', 'b', 'c']},
+    ])
+
+def test_codificar_e_decodificar():
+    espaco = _espaco()
+    params = {'n': 40, 'taxa': 0.25, 'metodo': 'c'}
+    vetor = espaco.codificar(params)
+    assert vetor.tolist() == [40.0, 0.25, 2.0]
+    assert espaco.decodificar(vetor) == params and isinstance(espaco.decodificar(vetor)['n'], int)
+    assert espaco.argumentos(params) == ['40', '0.25', 'c']
+    assert espaco.argumentos({'n': 1}) is None
+
+def test_projetar_prende_e_arredonda():
+    espaco = _espaco()
+    projetado = espaco.projetar(np.array([[120.0, 0.333, 1.6], [-3.4, -1.0, -0.2]]))
+    assert projetado.tolist() == [[100.0, 0.333, 2.0], [0.0, 0.0, 0.0]]
+
+def test_vizinhos_respeitam_limites_e_passo_minimo():
+    espaco = _espaco()
+    params = {'n': 95, 'taxa': 0.0, 'metodo': 'b'}
+    vizinhos = [(nome, valor) for nome, valor, _ in espaco.vizinhos(params)]
+    # n + 10 sai dos limites; taxa usa o passo padrão 1 (só o +1 cabe); categórico: as outras categorias
+    assert vizinhos == [('n', 85), ('taxa', 1.0), ('metodo', 'a'), ('metodo', 'c')]
+    adaptativos = [(nome, valor) for nome, valor, _ in espaco.vizinhos(params, {'n': 0.2, 'taxa': 0.0001})]
+    assert adaptativos == [('n', 96), ('n', 94), ('taxa', 0.001), ('metodo', 'a'), ('metodo', 'c')]
+
+def test_distancia_e_passos_iniciais():
+    espaco = _espaco()
+    a = {'n': 0, 'taxa': 0.5, 'metodo': 'a'}
+    assert espaco.distancia(a, dict(a, n=25)) == 0.25
+    assert espaco.distancia(a, dict(a, metodo='b')) == 1.0  # Categórico diferente conta inteiro
+    assert espaco.distancia(a, {'n': 0}) == 1.0
+    assert espaco.passos_iniciais.tolist() == [10.0, 0.05, 0.0]  # "passo" do JSON ou 5% da faixa
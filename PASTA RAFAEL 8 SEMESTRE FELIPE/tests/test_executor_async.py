@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+import time
+import pytest
+from executor_async import ExecutorAssincrono
+
+def _python(codigo):
+    return [sys.executable, '-c', codigo]
+
+def _vivo(pid):
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return False
+    # Zumbi (já morto, ainda não recolhido pelo pai) também conta como morto
+    try:
+        with open(f'/proc/{pid}/stat') as f: return f.read().split(')')[-1].split()[0] != 'Z'
+    except OSError: return True
+
+@pytest.fixture
+def executor():
+    abertos = []
+    def abrir(**kwargs):
+        abertos.append(ExecutorAssincrono(**kwargs))
+        return abertos[-1]
+    yield abrir
+    for e in abertos: e.fechar()
+
+def test_rodar_devolve_codigo_e_saida(executor):
+    ex = executor()
+    assert ex.rodar(_python("import sys; print(sys.stdin.read().upper())"), entrada='ola') == (0, 'OLA\n')
+    assert ex.rodar(_python("raise SystemExit(3)")) == (3, '')
+    assert ex.rodar(['/caminho/que/nao/existe.exe']) == (None, None)
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="grupo de processos e /proc do Linux")
+def test_timeout_mata_o_exe_e_os_filhos(executor, tmp_path):
+    arquivo_pid = tmp_path / 'neto.pid'
+    # O .exe abre um filho que também trava: os dois precisam morrer no timeout
+    codigo = ("import subprocess, sys, time; "
+              "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+              f"open({str(arquivo_pid)!r}, 'w').write(str(p.pid)); time.sleep(60)")
+    ex = executor(timeout=1.0)
+    inicio = time.perf_counter()
+    assert ex.rodar(_python(codigo)) == (None, None)
+    assert time.perf_counter() - inicio < 10 and ex.timeouts == 1
+    neto = int(arquivo_pid.read_text())
+    for _ in range(50):
+        if not _vivo(neto): break
+        time.sleep(0.1)
+    assert not _vivo(neto)
+
+def test_interromper_cancela_sem_fechar_o_executor(executor):
+    ex = executor()
+    resultado = []
+    t = threading.Thread(target=lambda: resultado.append(ex.rodar(_python("import time; time.sleep(60)"))))
+    t.start()
+    time.sleep(0.5)
+    inicio = time.perf_counter()
+    ex.interromper()
+    t.join(10)
+    assert not t.is_alive() and resultado == [(None, None)] and time.perf_counter() - inicio < 5
+    assert ex.rodar(_python("print(1)")) == (0, '1\n')  # O loop continua de pé
+
+def test_rodar_varios_para_quando_pedido(executor):
+    ex = executor(max_simultaneos=4)
+    comandos = [_python("print(1)"), *[_python("import time; time.sleep(60)")] * 3]
+    inicio = time.perf_counter()
+    resultados = ex.rodar_varios(comandos, parar_quando=lambda i, codigo, saida: codigo == 0)
+    assert resultados == [(0, '1\n'), (None, None), (None, None), (None, None)]
+    assert time.perf_counter() - inicio < 10
@@ -0,0 +1,62 @@
+import random
+import optuna
+import pytest
+from optuna.distributions import IntDistribution
+from optuna.trial import TrialState
+from historico_limitado import HistoricoLimitado
+
+DISTRIBUICOES = {'x': IntDistribution(0, 1000)}
+
+def _trial(x, estado=TrialState.COMPLETE, restricoes=None):
+    valor = -abs(x - 500) if estado == TrialState.COMPLETE else None
+    return optuna.trial.create_trial(params={'x': x}, distributions=DISTRIBUICOES, state=estado, value=valor,
+                                     constraints=restricoes)
+
+@pytest.fixture
+def abrir_historico(pasta):
+    abertos = []
+    def abrir(capacidade=40):
+        abertos.append(HistoricoLimitado(capacidade, 'maximize', optuna.samplers.RandomSampler, str(pasta / 'historico.jsonl')))
+        return abertos[-1]
+    yield abrir
+    for historico in abertos: historico.fechar()
+
+def _guardados(historico):
+    return sorted(t.params['x'] for t in historico.estudo.get_trials(deepcopy=False))
+
+def test_memoria_fica_limitada_e_guarda_os_melhores(abrir_historico):
+    historico = abrir_historico()
+    sorteados = random.Random(0).sample(range(1000), 300)
+    for x in sorteados: historico.registrar(_trial(x))
+    historico.compactar()
+    guardados = _guardados(historico)
+    assert historico.total == 300 and len(guardados) <= historico.capacidade
+    perto = min(sorteados, key=lambda x: abs(x - 500))
+    assert historico.melhor() == (-abs(perto - 500), {'x': perto})
+    # A janela são os 20 últimos; os 10 melhores de toda a execução ficam mesmo fora dela
+    assert set(sorteados[-20:]) <= set(guardados)
+    melhores = sorted(-abs(x - 500) for x in sorteados)[-10:]
+    assert sorted(-abs(x - 500) for x in guardados)[-10:] == melhores
+
+def test_falha_fica_so_no_log_e_podado_entra_na_janela(abrir_historico):
+    historico = abrir_historico()
+    historico.registrar(_trial(10, TrialState.FAIL))
+    historico.registrar(_trial(20, TrialState.PRUNED))
+    historico.registrar(_trial(30))
+    historico.compactar()
+    assert historico.total == 3 and historico.concluidos == 1
+    assert _guardados(historico) == [20, 30] and historico.melhor() == (-470, {'x': 30})
+
+def test_retomada_remonta_o_historico_pelo_log(abrir_historico):
+    original = abrir_historico()
+    for x in range(100): original.registrar(_trial((x * 37) % 1000, restricoes={'orcamento': float(x % 2)}))
+    original.registrar(_trial(7, TrialState.FAIL))
+    original.compactar()
+    original.fechar()
+    retomado = abrir_historico()
+    assert (retomado.total, retomado.concluidos) == (101, 100)
+    assert retomado.melhor() == original.melhor()
+    assert [n for n, _ in retomado.recentes] == [n for n, _ in original.recentes]
+    assert sorted(n for _, n, _ in retomado.melhores) == sorted(n for _, n, _ in original.melhores)
+    # As violações de restrição voltam junto (o sampler com constraints_func precisa delas)
+    assert all(t.constraints == {'orcamento': float(n % 2)} for n, t in retomado.recentes)
@@ -0,0 +1,50 @@
+import pytest
+from hooke_jeeves import HookeJeeves
+from poll_paralelo import PollParalelo
+
+MODELOS = """
+def parabola(p): return -(p['x'] - 50) ** 2
+def rampa(p): return p['x'] + BONUS[p['modo']]
+BONUS = {'a': 0.0, 'b': 100.0}
+"""
+
+def _config(funcao, parametros):
+    return {'backend': 'python', 'python': {'modulo': 'modelos_hj.py', 'funcao': funcao}, 'parametros': parametros}
+
+@pytest.fixture
+def abrir_hj(pasta, abrir_avaliador):
+    (pasta / 'modelos_hj.py').write_text(MODELOS)
+    def abrir(funcao, parametros, inicial):
+        avaliador = abrir_avaliador(_config(funcao, parametros))
+        return HookeJeeves(avaliador, 'maximizar', PollParalelo(1), inicial, avaliador.avaliar(inicial))
+    return abrir
+
+def test_movimento_padrao_salta_alem_da_exploracao(abrir_hj):
+    hj = abrir_hj('parabola', [{'nome': 'x', 'tipo': 'inteiro', 'limites': [0, 100], 'passo': 2}], {'x': 0})
+    ponto, valor, melhoraram = hj.explorar(hj.base, hj.valor_base)
+    assert (ponto, melhoraram) == ({'x': 2}, ['x'])  # Exploração sozinha: um passo
+    # 0 -> 2, depois saltos 4, 10, 18, 28, 40, 54 (cada um explorado em volta) até o salto piorar
+    assert hj.iterar() == 'melhorou'
+    assert hj.base == {'x': 52} and hj.valor_base == -4
+
+def test_passos_caem_ate_o_minimo_e_converge(abrir_hj):
+    hj = abrir_hj('parabola', [{'nome': 'x', 'tipo': 'inteiro', 'limites': [0, 100], 'passo': 8}], {'x': 45})
+    assert hj.rodar() == "CONVERGIU (MALHA MÍNIMA)"
+    assert hj.base == {'x': 50} and hj.passos == {'x': 1}
+
+def test_passo_dobra_depois_de_duas_melhorias_seguidas(abrir_hj):
+    hj = abrir_hj('parabola', [{'nome': 'x', 'tipo': 'inteiro', 'limites': [0, 100], 'passo': 2}], {'x': 0})
+    hj._ajustar_passos(['x'])
+    assert hj.passos == {'x': 2}
+    hj._ajustar_passos(['x'])
+    assert hj.passos == {'x': 4}
+    hj._ajustar_passos([])
+    assert hj._reduzir_passos() and hj.passos == {'x': 2}
+
+def test_limites_e_categoricos(abrir_hj):
+    parametros = [{'nome': 'x', 'tipo': 'inteiro', 'limites': [0, 10], 'passo': 3},
+                  {'nome': 'modo', 'tipo': 'categorico', 'limites': ['a', 'b']}]
+    hj = abrir_hj('rampa', parametros, {'x': 0, 'modo': 'a'})
+    assert hj.rodar() == "CONVERGIU (MALHA MÍNIMA)"
+    # O salto para x = 12 é preso no limite 10; o categórico é explorado trocando de categoria
+    assert hj.base == {'x': 10, 'modo': 'b'} and hj.valor_base == 110
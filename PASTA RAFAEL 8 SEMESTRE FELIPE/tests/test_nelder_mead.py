@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from nelder_mead import NelderMead
+
+MODELOS = """
+def quadratica(p): return -(p['x'] - 37) ** 2 - (p['y'] - 64) ** 2
+def fora_dos_limites(p): return -(p['x'] - 120) ** 2 - (p['y'] - 3) ** 2
+def mista(p): return -(p['taxa'] - 0.3) ** 2 * 100 - (p['n'] - 7) ** 2 + {'a': 0, 'b': 5, 'c': 1}[p['modo']]
+"""
+INTEIROS = [{'nome': 'x', 'tipo': 'inteiro', 'limites': [0, 100], 'valor_inicial': 50, 'passo': 10},
+            {'nome': 'y', 'tipo': 'inteiro', 'limites': [0, 100], 'valor_inicial': 50, 'passo': 10}]
+
+@pytest.fixture
+def abrir_nm(pasta, abrir_avaliador):
+    """NelderMead sobre um modelo de modelos_nm.py; devolve também a lista de pontos enviados ao modelo"""
+    (pasta / 'modelos_nm.py').write_text(MODELOS)
+    def abrir(funcao, parametros, workers=1):
+        config = {'backend': 'python', 'python': {'modulo': 'modelos_nm.py', 'funcao': funcao}, 'parametros': parametros}
+        avaliador = abrir_avaliador(config)
+        avaliados, avaliar = [], avaliador.avaliar
+        def registrar(params):
+            avaliados.append(dict(params))
+            return avaliar(params)
+        avaliador.avaliar = registrar
+        inicial = {p['nome']: p['valor_inicial'] for p in parametros}
+        return NelderMead(avaliador, 'maximizar', workers, inicial), avaliados
+    return abrir
+
+def test_converge_no_ponto_inteiro(abrir_nm):
+    nm, avaliados = abrir_nm('quadratica', INTEIROS)
+    assert nm.rodar() == "CONVERGIU (MALHA MÍNIMA)"
+    assert nm.melhor == {'x': 37, 'y': 64} and nm.valor_melhor == 0
+    assert len({tuple(p.values()) for p in avaliados}) == len(avaliados)  # Vértice repetido não roda de novo
+
+def test_inteiros_ficam_na_malha_e_nos_limites(abrir_nm):
+    nm, avaliados = abrir_nm('fora_dos_limites', INTEIROS)
+    assert nm.rodar() == "CONVERGIU (MALHA MÍNIMA)"
+    # O ótimo contínuo (x = 120) está fora: o simplex encosta na borda em vez de sair dela
+    assert nm.melhor['x'] == 100
+    assert all(type(p[k]) is int and 0 <= p[k] <= 100 for p in avaliados for k in ('x', 'y'))
+
+def test_simplex_inicial_entra_pelo_lado_de_dentro(abrir_nm):
+    nm, _ = abrir_nm('quadratica', INTEIROS)
+    vertices = nm._simplex_em_volta(np.array([100.0, 0.0]))
+    assert vertices.tolist() == [[100.0, 0.0], [90.0, 0.0], [100.0, 10.0]]
+
+def test_categorico_e_float(abrir_nm):
+    parametros = [{'nome': 'modo', 'tipo': 'categorico', 'limites': ['a', 'b', 'c'], 'valor_inicial': 'a'},
+                  {'nome': 'n', 'tipo': 'inteiro', 'limites': [0, 20], 'valor_inicial': 15, 'passo': 2},
+                  {'nome': 'taxa', 'tipo': 'float', 'limites': [0.0, 1.0], 'valor_inicial': 0.9}]
+    nm, avaliados = abrir_nm('mista', parametros)
+    assert nm.rodar() == "CONVERGIU (MALHA MÍNIMA)"
+    assert {p['modo'] for p in avaliados} <= {'a', 'b', 'c'}
+    # Categórico e inteiro chegam ao ótimo; o float anda na direção certa (o simplex misto pode parar antes)
+    assert nm.melhor['modo'] == 'b' and nm.melhor['n'] == 7 and 0.3 <= nm.melhor['taxa'] < 0.9
+    assert all(0.0 <= p['taxa'] <= 1.0 and type(p['n']) is int for p in avaliados)
+
+def test_workers_nao_mudam_o_caminho(abrir_nm):
+    sequencial, _ = abrir_nm('quadratica', INTEIROS)
+    paralelo, _ = abrir_nm('quadratica', INTEIROS, workers=4)
+    sequencial.rodar(), paralelo.rodar()
+    assert (paralelo.melhor, paralelo.iteracao) == (sequencial.melhor, sequencial.iteracao)
@@ -0,0 +1,56 @@
+import pytest
+from criterios_parada import CriteriosParada
+from orcamento import TROCA_DE_FASE, AgendadorFases, CriteriosDaFase
+
+def _agendador(objetivo='maximizar', **kwargs):
+    return AgendadorFases(objetivo, janela=10, **kwargs)
+
+def test_nao_estagna_antes_de_completar_a_janela():
+    agendador = _agendador(budget_evals=1000)
+    agendador.iniciar_fase('exploracao', 0.0, 0)
+    assert not any(agendador.estagnou(0.0, n) for n in range(1, 10))
+    assert agendador.estagnou(0.0, 10)  # Janela completa sem melhoria (sem referência: ritmo 0)
+
+def test_melhoria_na_janela_segura_a_fase():
+    agendador = _agendador()
+    agendador.iniciar_fase('exploracao', 0.0, 0)
+    assert not any(agendador.estagnou(float(n), n) for n in range(1, 30))
+
+def test_ritmo_da_outra_fase_vira_referencia():
+    agendador = _agendador()
+    agendador.iniciar_fase('exploracao', 0.0, 0)
+    for n in range(1, 11): agendador.estagnou(n * 0.5, n)  # Exploração: 0.5 por avaliação
+    agendador.iniciar_fase('refinamento', 5.0, 10)
+    assert agendador.ritmos['exploracao'] == pytest.approx(0.5)
+    # Refinamento mais rápido que a exploração terminou: continua
+    assert not any(agendador.estagnou(5.0 + (n - 10) * 1.0, n) for n in range(11, 25))
+    # Cai para 0.25 por avaliação: abaixo da referência, troca de fase
+    valor, trocou = 19.0, False
+    for n in range(25, 40):
+        valor += 0.25
+        if agendador.estagnou(valor, n):
+            trocou = True
+            break
+    assert trocou and agendador.ritmos['refinamento'] <= 0.5
+
+def test_minimizar_conta_a_descida_como_ganho():
+    agendador = _agendador('minimizar')
+    agendador.iniciar_fase('exploracao', 100.0, 0)
+    assert not any(agendador.estagnou(100.0 - n, n) for n in range(1, 30))
+    agendador = _agendador('minimizar')
+    agendador.iniciar_fase('exploracao', 100.0, 0)
+    assert any(agendador.estagnou(100.0 + n, n) for n in range(1, 30))  # Piorar nunca é ritmo
+
+def test_orcamento_esgotado_conta_o_gasto_anterior():
+    agendador = _agendador(budget_evals=100, estado={'gasto_avaliacoes': 60})
+    assert agendador.esgotado(39) is None
+    assert agendador.esgotado(40) == "ORÇAMENTO DE AVALIAÇÕES (100)"
+
+def test_criterios_da_fase_trocam_por_estagnacao():
+    agendador = _agendador(budget_evals=1000)
+    agendador.iniciar_fase('refinamento', 1.0, 0)
+    criterios = CriteriosDaFase(agendador, CriteriosParada('maximizar', alvo=50.0))
+    motivos = [criterios.verificar(1.0, n) for n in range(1, 11)]
+    assert motivos[:-1] == [None] * 9 and motivos[-1] == TROCA_DE_FASE
+    assert criterios.verificar(60.0, 11) == "ALVO ATINGIDO (50.0)"  # Critério do usuário vem antes
+    assert criterios.verificar(1.0, 1000) == "ORÇAMENTO DE AVALIAÇÕES (1000)"
@@ -0,0 +1,60 @@
+import os
+import pytest
+from pastas_isoladas import PastasIsoladas, opcoes_pastas
+
+@pytest.fixture
+def abrir_pastas(pasta):
+    """Entradas de exemplo na pasta atual (dados.txt e tabelas/coef.csv) e PastasIsoladas fechado no fim"""
+    (pasta / 'dados.txt').write_text('original')
+    (pasta / 'tabelas').mkdir()
+    (pasta / 'tabelas' / 'coef.csv').write_text('1,2,3')
+    (pasta / 'raiz').mkdir()
+    abertas = []
+    def abrir(entradas=('dados.txt', os.path.join('tabelas', 'coef.csv'))):
+        abertas.append(PastasIsoladas(str(pasta / 'raiz'), entradas))
+        return abertas[-1]
+    yield abrir
+    for pastas in abertas: pastas.fechar()
+
+def _conteudo(pasta):
+    return sorted(os.path.relpath(os.path.join(atual, nome), pasta) for atual, _, nomes in os.walk(pasta) for nome in nomes)
+
+def test_cada_worker_recebe_sua_copia_das_entradas(abrir_pastas, pasta):
+    pastas = abrir_pastas(('dados.txt', os.path.join('tabelas', 'coef.csv'), str(pasta / 'dados.txt')))
+    a, b = pastas.pegar(), pastas.pegar()
+    assert a != b and pastas.criadas == 2
+    assert _conteudo(a) == ['dados.txt', os.path.join('tabelas', 'coef.csv')]  # O absoluto entra só pelo nome
+    pastas.devolver(a)
+    assert pastas.pegar() == a and pastas.criadas == 2  # Pasta devolvida é reaproveitada
+
+def test_devolver_apaga_saidas_e_restaura_entradas(abrir_pastas):
+    pastas = abrir_pastas()
+    trabalho = pastas.pegar()
+    # O .exe sobrescreve uma entrada, apaga outra e deixa saídas soltas (inclusive ao lado da entrada aninhada)
+    with open(os.path.join(trabalho, 'dados.txt'), 'w') as f: f.write('alterado pelo modelo')
+    os.remove(os.path.join(trabalho, 'tabelas', 'coef.csv'))
+    with open(os.path.join(trabalho, 'saida.txt'), 'w') as f: f.write('x')
+    with open(os.path.join(trabalho, 'tabelas', 'temporario.csv'), 'w') as f: f.write('x')
+    os.makedirs(os.path.join(trabalho, 'log', 'antigos'))
+    pastas.devolver(trabalho)
+    assert pastas.pegar() == trabalho
+    assert _conteudo(trabalho) == ['dados.txt', os.path.join('tabelas', 'coef.csv')]
+    with open(os.path.join(trabalho, 'dados.txt')) as f: assert f.read() == 'original'
+    with open(os.path.join(trabalho, 'tabelas', 'coef.csv')) as f: assert f.read() == '1,2,3'
+
+def test_pasta_de_entrada_alterada_volta_inteira(abrir_pastas):
+    pastas = abrir_pastas(('tabelas',))
+    trabalho = pastas.pegar()
+    with open(os.path.join(trabalho, 'tabelas', 'novo.csv'), 'w') as f: f.write('x')
+    pastas.devolver(trabalho)
+    assert _conteudo(trabalho) == [os.path.join('tabelas', 'coef.csv')]
+
+def test_fechar_apaga_tudo_e_entrada_faltando_e_erro(abrir_pastas, pasta):
+    pastas = abrir_pastas()
+    pastas.pegar()
+    base = pastas.base
+    pastas.fechar()
+    assert not os.path.exists(base) and os.listdir(pasta / 'raiz') == []
+    config = {'execucao': {'pasta_isolada': True, 'raiz_pastas': str(pasta / 'raiz'), 'arquivos_entrada': ['nao_existe.txt']}}
+    with pytest.raises(ValueError, match='nao_existe.txt'): opcoes_pastas(config)
+    assert opcoes_pastas({}) is None
@@ -0,0 +1,78 @@
+import threading
+import time
+import pytest
+from poll_paralelo import PollParalelo
+from criterios_parada import CriteriosParada, OrcamentoPoll
+
+def _candidatos(valores, esperas=None):
+    esperas = esperas or [0.0] * len(valores)
+    return [{'v': v, 't': t} for v, t in zip(valores, esperas)]
+
+class _Modelo:
+    """Devolve c['v'] depois de dormir c['t'] segundos e anota quem rodou"""
+    def __init__(self):
+        self.rodados = []
+        self._trava = threading.Lock()
+
+    def __call__(self, c):
+        with self._trava: self.rodados.append(c['v'])
+        time.sleep(c['t'])
+        return c['v']
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_completo_fica_com_o_melhor(workers):
+    poll, modelo = PollParalelo(workers, 'completo'), _Modelo()
+    assert poll.avaliar(modelo, _candidatos([2, 9, 4, 9, 1]), 3, 'maximizar') == (1, 9)  # Empate: o primeiro
+    assert poll.avaliar(modelo, _candidatos([2, 9, 4]), 3, 'minimizar') == (0, 2)
+    assert poll.avaliacoes == 8 and sorted(modelo.rodados) == [1, 2, 2, 4, 4, 9, 9, 9]
+    poll.fechar()
+
+def test_sem_melhoria_devolve_none():
+    poll = PollParalelo(3, 'completo')
+    assert poll.avaliar(_Modelo(), _candidatos([1, 2, 3]), 3, 'maximizar') == (None, None)
+    assert poll.avaliar(lambda c: None, _candidatos([5]), 3, 'maximizar') == (None, None)  # Falha do modelo
+    poll.fechar()
+
+def test_oportunista_sequencial_para_na_primeira_melhoria():
+    poll, modelo = PollParalelo(1, 'oportunista'), _Modelo()
+    assert poll.avaliar(modelo, _candidatos([1, 5, 9]), 3, 'maximizar') == (1, 5)
+    assert modelo.rodados == [1, 5] and poll.avaliacoes == 2
+
+def test_oportunista_paralelo_cancela_a_fila():
+    poll, modelo = PollParalelo(2, 'oportunista'), _Modelo()
+    # O vizinho 0 melhora na hora; 1 e 2 ainda rodam e o 3 nem chega a começar
+    candidatos = _candidatos([5, 9, 8, 7], [0.0, 0.3, 0.3, 0.3])
+    assert poll.avaliar(modelo, candidatos, 3, 'maximizar') == (0, 5)
+    assert poll.avaliacoes == 1 and 7 not in modelo.rodados
+    poll.fechar()
+
+def test_inviaveis_saem_e_o_indice_volta_ao_original():
+    poll, modelo = PollParalelo(1, 'completo', viaveis=lambda cs: [c['v'] != 9 for c in cs]), _Modelo()
+    assert poll.avaliar(modelo, _candidatos([9, 2, 6]), 3, 'maximizar') == (2, 6)
+    assert 9 not in modelo.rodados
+
+def test_lote_vai_numa_chamada_so():
+    chamadas = []
+    def avaliar_lote(candidatos):
+        chamadas.append(len(candidatos))
+        return [c['v'] for c in candidatos]
+    poll = PollParalelo(4, 'oportunista', avaliar_lote=avaliar_lote)
+    assert poll.avaliar(None, _candidatos([1, 5, 9]), 3, 'maximizar') == (1, 5)
+    assert chamadas == [3] and poll.avaliacoes == 3
+    poll.fechar()
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_orcamento_corta_o_poll(workers):
+    class _Contado(_Modelo):
+        avaliacoes = 0
+        def __call__(self, c):
+            self.avaliacoes += 1
+            return super().__call__(c)
+    modelo = _Contado()
+    criterios = CriteriosParada('maximizar', max_avaliacoes=4)
+    poll = PollParalelo(workers, 'completo', orcamento=OrcamentoPoll(criterios, modelo))
+    assert poll.avaliar(modelo, _candidatos([1, 2, 3]), 0, 'maximizar') == (2, 3) and not poll.esgotado
+    # Só 1 dos 3 cabe no teto: o poll cortado não vale como "nenhum vizinho melhora"
+    assert poll.avaliar(modelo, _candidatos([1, 2, 9]), 3, 'maximizar') == (None, None) and poll.esgotado
+    assert modelo.avaliacoes == 4 and criterios.verificar(3, modelo.avaliacoes) is not None
+    poll.fechar()
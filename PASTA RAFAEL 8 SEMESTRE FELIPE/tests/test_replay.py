@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from avaliador import Avaliador
+from cache_avaliacoes import CacheAvaliacoes
+from trace_avaliacoes import EmuladorTrace, GravadorTrace, ler_trace
+
+MODELO = """
+def f(p):
+    if p['x'] == 13: raise ValueError('falha do modelo')
+    return 2.0 * p['x'] + {'a': 0.0, 'b': 100.0, 'c': 500.0}[p['modo']]
+"""
+PARAMETROS = [{'nome': 'x', 'tipo': 'inteiro', 'limites': [0, 100]},
+              {'nome': 'modo', 'tipo': 'categorico', 'limites': ['a', 'b', 'c']}]
+GRAVADOS = [(10, 'a'), (20, 'a'), (13, 'a'), (10, 'b')]
+
+@pytest.fixture
+def trace(pasta):
+    """Trace gravado pelo backend python: 3 respostas, 1 falha e 1 acerto de cache (que não entra)"""
+    (pasta / 'modelo_replay.py').write_text(MODELO)
+    config = {'backend': 'python', 'python': {'modulo': 'modelo_replay.py', 'funcao': 'f'}, 'parametros': PARAMETROS}
+    cache = CacheAvaliacoes(str(pasta / 'cache.sqlite'))
+    avaliador = Avaliador(config, cache, GravadorTrace(str(pasta / 'trace.jsonl')))
+    for x, modo in GRAVADOS + [(10, 'a')]: avaliador.avaliar({'x': x, 'modo': modo})
+    avaliador.fechar()
+    cache.fechar()
+    return pasta / 'trace.jsonl'
+
+def _replay(trace, **opcoes):
+    return Avaliador({'backend': 'replay', 'replay': {'trace': str(trace), **opcoes}, 'parametros': PARAMETROS})
+
+def test_trace_guarda_so_as_execucoes_reais(trace):
+    config, avaliacoes = ler_trace(trace)
+    assert config['backend'] == 'python'
+    assert [(a['params']['x'], a['params']['modo'], a['resultado'], a['status']) for a in avaliacoes] == \
+        [(10, 'a', 20.0, 'ok'), (20, 'a', 40.0, 'ok'), (13, 'a', None, 'falha'), (10, 'b', 120.0, 'ok')]
+    with open(trace, 'a', encoding='utf-8') as f: f.write('{"t": 1, "params": {"x"')  # Linha cortada por um kill
+    assert len(ler_trace(trace)[1]) == 4
+
+def test_ponto_gravado_volta_exato_inclusive_falha(trace):
+    avaliador = _replay(trace, modo='vizinho')
+    assert [avaliador.avaliar({'x': x, 'modo': modo}) for x, modo in GRAVADOS] == [20.0, 40.0, None, 120.0]
+    avaliador.fechar()
+
+def test_ponto_novo_vem_dos_vizinhos(trace):
+    vizinho, idw = _replay(trace, modo='vizinho'), _replay(trace, modo='idw', vizinhos=2)
+    assert vizinho.avaliar({'x': 12, 'modo': 'a'}) == 20.0
+    assert vizinho.avaliar({'x': 11, 'modo': 'b'}) == 120.0  # Categórico diferente fica longe (distância 1)
+    # IDW com os 2 mais próximos de x = 12 (distâncias normalizadas 0.02 e 0.08)
+    esperado = (20.0 / 0.02 ** 2 + 40.0 / 0.08 ** 2) / (1 / 0.02 ** 2 + 1 / 0.08 ** 2)
+    assert idw.avaliar({'x': 12, 'modo': 'a'}) == pytest.approx(esperado)
+    vizinho.fechar(), idw.fechar()
+
+def test_modo_invalido_e_trace_sem_resultados(pasta, trace):
+    with pytest.raises(ValueError, match='desconhecido'): EmuladorTrace(str(trace), PARAMETROS, modo='linear')
+    outros = [{'nome': 'y', 'tipo': 'inteiro', 'limites': [0, 10]}]  # Trace de outra config
+    with pytest.raises(ValueError, match='não tem avaliações válidas'): EmuladorTrace(str(trace), outros)
+
+def test_script_gera_a_config_de_replay(pasta, trace):
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'trace_avaliacoes.py')
+    subprocess.run([sys.executable, script, '--trace', str(trace), '--saida', 'config_replay.json', '--modo', 'vizinho'],
+                   check=True, capture_output=True)
+    with open('config_replay.json', encoding='utf-8') as f: config = json.load(f)
+    assert config['backend'] == 'replay' and 'python' not in config and config['replay']['modo'] == 'vizinho'
+    avaliador = Avaliador(config)
+    assert avaliador.avaliar({'x': 20, 'modo': 'a'}) == 40.0 and avaliador.avaliar({'x': 12, 'modo': 'a'}) == 20.0
+    avaliador.fechar()
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from espaco_busca import EspacoBusca
+from restricoes import Restricoes, abrir_restricoes
+from conftest import params_iniciais
+
+def _espaco():
+    return EspacoBusca([
+        {'nome': 'x1', 'tipo': 'inteiro', 'limites': [0, 10]},
+        {'nome': 'x2', 'tipo': 'inteiro', 'limites': [0, 10]},
+        {'nome': 'metodo', 'tipo': 'categorico', 'limites': ['rapido', 'lento']},
+    ])
+
+def test_sem_secao_nao_ha_restricoes():
+    assert abrir_restricoes({}, _espaco()) is None
+
+def test_linear_expressao_e_condicao():
+    restricoes = Restricoes([
+        {'nome': 'soma', 'coeficientes': {'x1': 1, 'x2': 1}, 'max': 11},
+        {'nome': 'rapido', 'se': "metodo == 'rapido'", 'expressao': 'x1', 'max': 3},
+        {'nome': 'ordem', 'expressao': '(x1 <= x2) | (metodo == "lento")'},
+    ], _espaco())
+    pontos = [
+        {'x1': 3, 'x2': 8, 'metodo': 'rapido'},  # viável
+        {'x1': 5, 'x2': 7, 'metodo': 'rapido'},  # soma 12 e x1 > 3 no rápido
+        {'x1': 5, 'x2': 6, 'metodo': 'lento'},   # "rapido" e "ordem" não valem no lento
+        {'x1': 4, 'x2': 2, 'metodo': 'rapido'},  # x1 > 3 e fora de ordem
+    ]
+    assert restricoes.viaveis(pontos).tolist() == [True, False, True, False]
+    assert restricoes.violacoes_params(pontos[1]) == {'soma': 1.0, 'rapido': 2.0, 'ordem': 0.0}
+
+def test_funcoes_e_operadores_logicos():
+    restricoes = Restricoes([
+        {'nome': 'raiz', 'expressao': 'sqrt(abs(x1 - x2))', 'max': 2},
+        {'nome': 'faixa', 'expressao': '1 <= x1 <= 8 and not (metodo == "lento" or x2 == 0)'},
+    ], _espaco())
+    pontos = [{'x1': 3, 'x2': 5, 'metodo': 'rapido'}, {'x1': 9, 'x2': 5, 'metodo': 'rapido'},
+              {'x1': 3, 'x2': 8, 'metodo': 'rapido'}, {'x1': 3, 'x2': 5, 'metodo': 'lento'}]
+    assert restricoes.viaveis(pontos).tolist() == [True, False, False, False]
+
+@pytest.mark.parametrize('lista, mensagem', [
+    ([{'coeficientes': {'x9': 1}, 'max': 1}], 'desconhecido'),
+    ([{'coeficientes': {'metodo': 1}, 'max': 1}], 'categórico'),
+    ([{'coeficientes': {'x1': 1}}], 'min'),
+    ([{'nome': 'a', 'expressao': 'x1 +'}], 'inválida'),
+    ([{'nome': 'a', 'expressao': 'x1'}, {'nome': 'a', 'expressao': 'x2'}], 'repetidos'),
+    ([{'nome': 'a', 'expressao': 'x3 > 1'}], "Restrição 'a'"),
+    ([{'expressao': 'x1.real > 1'}], 'Attribute'),
+    ([{'expressao': '__import__("os").system("true")'}], 'chamada'),
+    ([{'expressao': 'x1 + (lambda: 1)()'}], 'chamada'),
+    ([{'se': 'metodo[0] == "r"', 'expressao': 'x1', 'max': 3}], 'Subscript'),
+    ([{'expressao': '().__class__'}], 'não é permitido'),
+])
+def test_erros_de_configuracao(lista, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        Restricoes(lista, _espaco())
+
+def test_projecao_fica_viavel_e_na_malha():
+    espaco = _espaco()
+    restricoes = Restricoes([{'coeficientes': {'x1': 1, 'x2': 1}, 'max': 11},
+                             {'coeficientes': {'x1': 1, 'x2': -1}, 'min': -2}], espaco)
+    pontos = np.array([[8, 8, 0], [10, 0, 1], [0, 10, 0], [2, 3, 1]], dtype=float)
+    projetados = restricoes.projetar(pontos)
+    assert np.array_equal(projetados, np.round(projetados))
+    assert restricoes.viaveis_vetores(projetados).all()
+    assert np.array_equal(projetados[3], pontos[3])  # Já viável: não se move
+    assert np.array_equal(projetados[:, 2], pontos[:, 2])  # Categórico fora das lineares
+
+def test_reparar_recua_o_inteiro_mais_empurrado():
+    restricoes = Restricoes([{'coeficientes': {'x1': 1, 'x2': 1}, 'max': 11}], _espaco())
+    # Projeção contínua em (5.9, 5.5): o arredondamento leva a (6, 6), soma 12
+    reparado = restricoes._reparar(np.array([6.0, 6.0, 0.0]), np.array([5.9, 5.5, 0.0]))
+    assert reparado.tolist() == [6.0, 5.0, 0.0]
+    # Coeficiente negativo (x1 - x2 <= -1): o x2, que o arredondamento mais puxou, sobe em vez de descer
+    restricoes = Restricoes([{'coeficientes': {'x1': 1, 'x2': -1}, 'max': -1}], _espaco())
+    reparado = restricoes._reparar(np.array([4.0, 4.0, 0.0]), np.array([3.9, 4.6, 0.0]))
+    assert reparado.tolist() == [4.0, 5.0, 0.0]
+
+def test_avaliador_rejeita_sem_rodar_o_modelo(abrir_avaliador, config_provab2):
+    config = dict(config_provab2, restricoes=[{'nome': 'orcamento', 'coeficientes': {'x1': 1, 'x2': 1}, 'max': 1100}])
+    avaliador = abrir_avaliador(config)
+    dentro = params_iniciais('provab2')
+    fora = dict(dentro, x1=600, x2=600)
+    assert avaliador.avaliar(fora) is None
+    assert avaliador.avaliar(dentro) is not None
+    assert (avaliador.execucoes, avaliador.rejeitadas) == (1, 1)
+    ajustado = avaliador.ajustar([fora])[0]
+    assert ajustado['x1'] + ajustado['x2'] <= 1100
@@ -0,0 +1,40 @@
+import numpy as np
+from spsa import SPSA
+from modelos_sinteticos import MODELOS, gerar_config
+from conftest import params_iniciais
+
+def _spsa(avaliador, nome, **opcoes):
+    inicial = params_iniciais(nome)
+    return SPSA(avaliador, MODELOS[nome]['objetivo'], 1, inicial, avaliador.avaliar(inicial), **opcoes)
+
+def test_converge_na_malha_inteira_e_nos_limites(abrir_avaliador, config_provab2):
+    avaliador = abrir_avaliador(config_provab2)
+    avaliados, avaliar = [], avaliador.avaliar
+    avaliador.avaliar = lambda params: avaliados.append(dict(params)) or avaliar(params)
+    spsa = _spsa(avaliador, 'provab2', semente=1)
+    assert spsa.rodar() == "CONVERGIU (MALHA MÍNIMA)"
+    assert spsa.valor_base >= MODELOS['provab2']['alvo']
+    assert avaliados and all(type(v) is int and 1 <= v <= 1000 for p in avaliados for v in p.values())
+
+def test_mesma_semente_mesmo_caminho(abrir_avaliador, config_provab2):
+    caminhos = []
+    for _ in range(2):
+        spsa = _spsa(abrir_avaliador(config_provab2), 'provab2', semente=7)
+        for _ in range(5): spsa.iterar()
+        caminhos.append((spsa.base, spsa.valor_base, spsa.escala, spsa.salto))
+    assert caminhos[0] == caminhos[1]
+
+def test_diferencas_recuperam_o_gradiente_linear(abrir_avaliador, config_provab2):
+    spsa = _spsa(abrir_avaliador(config_provab2), 'provab2', semente=3)
+    pesos = np.arange(1.0, 11.0)
+    mais, menos = spsa._pares(spsa._h(), True)
+    assert len(mais) == 10 and np.all(np.count_nonzero(mais - menos, axis=1) == 1)  # Um eixo por par
+    # Maximizar: o custo é -f, então o gradiente do custo é -pesos
+    gradiente = spsa._estimar(mais, menos, [float(v @ pesos) for v in np.vstack((mais, menos))])
+    assert np.allclose(gradiente, -pesos)
+
+def test_diferencas_e_categoricos(abrir_avaliador):
+    spsa = _spsa(abrir_avaliador(gerar_config('modelo10')), 'modelo10', gradiente='diferencas')
+    assert spsa.rodar() == "CONVERGIU (MALHA MÍNIMA)"
+    # O categórico fica fora do gradiente, mas as outras categorias são testadas antes de convergir
+    assert spsa.base['x1'] == 'alto' and spsa.valor_base >= MODELOS['modelo10']['alvo']
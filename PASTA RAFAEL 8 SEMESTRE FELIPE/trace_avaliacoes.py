@@ -0,0 +1,148 @@
+import json
+import argparse
+import os
+import threading
+import time
+import numpy as np
+
+# ==============================================================================
+# TRACE DE AVALIAÇÕES + EMULADOR (REPLAY)
+# Com --trace arquivo.jsonl, cada execução real do modelo vira uma linha JSON:
+#     {"t": ..., "params": {...}, "resultado": 478.0, "duracao": 0.52, "status": "ok"}
+# (a primeira linha de cada execução guarda a config usada). Acertos de cache
+# não entram: o trace só registra o que o modelo realmente respondeu.
+#
+# Depois, o backend "replay" responde a partir do trace como se fosse o .exe:
+#     "backend": "replay", "replay": {"trace": "trace_provab2.jsonl", "modo": "idw", "vizinhos": 4}
+#   - ponto já visto : devolve o resultado gravado (inclusive falhas)
+#   - ponto novo     : "vizinho" = valor do vizinho mais próximo
+#                      "idw"     = média dos k vizinhos ponderada pelo inverso da distância
+# Distância: numéricos normalizados pelos limites; categórico diferente conta 1.
+# Gerar a config de replay: python trace_avaliacoes.py --trace trace.jsonl --saida config_replay.json
+# ==============================================================================
+MODOS_REPLAY = ('vizinho', 'idw')
+
+class GravadorTrace:
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self.registros = 0
+        self._lock = threading.Lock()
+        self._f = open(arquivo, 'a', encoding='utf-8')
+
+    def _escrever(self, dados):
+        with self._lock:
+            self._f.write(json.dumps(dados, ensure_ascii=False) + '\n')
+            self._f.flush()  # Um crash não perde o que já foi avaliado
+
+    def registrar_config(self, config):
+        self._escrever({'t': time.time(), 'tipo': 'config', 'config': config})
+
+    def registrar(self, params, resultado, duracao):
+        self._escrever({'t': time.time(), 'params': params, 'resultado': resultado,
+                        'duracao': round(duracao, 6), 'status': 'ok' if resultado is not None else 'falha'})
+        self.registros += 1
+
+    def fechar(self):
+        with self._lock:
+            if not self._f.closed: self._f.close()
+
+def ler_trace(arquivo):
+    """Retorna (config_mais_recente, lista_de_avaliacoes)"""
+    config, avaliacoes = None, []
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha: continue
+            try: dados = json.loads(linha)
+            except ValueError: continue  # Linha cortada por um kill no meio da escrita
+            if dados.get('tipo') == 'config': config = dados['config']
+            elif 'params' in dados: avaliacoes.append(dados)
+    return config, avaliacoes
+
+def abrir_trace(args):
+    arquivo = getattr(args, 'trace', None)
+    if not arquivo: return None
+    try:
+        return GravadorTrace(arquivo)
+    except OSError as e:
+        print(f"[TRACE] Não foi possível abrir {arquivo} ({e}). Seguindo sem trace.")
+        return None
+
+def adicionar_argumentos_trace(parser):
+    parser.add_argument('--trace', type=str, default=None, help="Grava cada avaliação real do modelo (JSONL)")
+
+# --- EMULADOR ---
+class EmuladorTrace:
+    def __init__(self, arquivo, lista_de_parametros, modo='idw', vizinhos=4):
+        if modo not in MODOS_REPLAY: raise ValueError(f"Modo de replay desconhecido: {modo} (use {', '.join(MODOS_REPLAY)})")
+        self.lista_de_parametros = lista_de_parametros
+        self.modo = modo
+        self.vizinhos = max(1, int(vizinhos))
+        _, avaliacoes = ler_trace(arquivo)
+
+        self.exatos = {}
+        pontos, valores = [], []
+        for a in avaliacoes:
+            try: chave = self._chave(a['params'])
+            except KeyError: continue  # Trace de outra config
+            self.exatos[chave] = a['resultado']
+            if a['resultado'] is not None:
+                pontos.append(self._vetor(a['params']))
+                valores.append(a['resultado'])
+        if not pontos: raise ValueError(f"O trace {arquivo} não tem avaliações válidas para esta config")
+        self.pontos = np.array(pontos)
+        self.valores = np.array(valores)
+        self._categoricos = np.array([p['tipo'] == 'categorico' for p in lista_de_parametros])
+
+    def _chave(self, params):
+        return tuple(str(params[p['nome']]) for p in self.lista_de_parametros)
+
+    def _vetor(self, params):
+        vetor = []
+        for p in self.lista_de_parametros:
+            valor = params[p['nome']]
+            if p['tipo'] == 'categorico':
+                vetor.append(float(p['limites'].index(valor)) if valor in p['limites'] else -1.0)
+            else:
+                mini, maxi = p['limites']
+                vetor.append((float(valor) - mini) / ((maxi - mini) or 1))
+        return vetor
+
+    def avaliar(self, params):
+        chave = self._chave(params)
+        if chave in self.exatos: return self.exatos[chave]
+
+        x = np.array(self._vetor(params))
+        diferenca = np.abs(self.pontos - x)
+        diferenca[:, self._categoricos] = (diferenca[:, self._categoricos] > 0).astype(float)
+        distancias = np.sqrt((diferenca ** 2).sum(axis=1))
+
+        if self.modo == 'vizinho' or len(distancias) == 1:
+            return float(self.valores[int(np.argmin(distancias))])
+        k = min(self.vizinhos, len(distancias))
+        proximos = np.argpartition(distancias, k - 1)[:k]
+        pesos = 1.0 / np.maximum(distancias[proximos], 1e-12) ** 2
+        return float((pesos * self.valores[proximos]).sum() / pesos.sum())
+
+# ==============================================================================
+# EXECUÇÃO: gera a config de replay a partir de um trace
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera a config JSON que usa um trace como modelo (backend replay)")
+    parser.add_argument('--trace', required=True, help="Trace gravado com --trace")
+    parser.add_argument('--saida', required=True, help="Config JSON de saída")
+    parser.add_argument('--modo', choices=MODOS_REPLAY, default='idw')
+    parser.add_argument('--vizinhos', type=int, default=4)
+    parser.add_argument('--latencia', type=float, default=0.0, help="Segundos de espera por avaliação")
+    args = parser.parse_args()
+
+    config, avaliacoes = ler_trace(args.trace)
+    if config is None: parser.error("o trace não tem a linha de config (gravado por uma versão antiga?)")
+    config = dict(config)
+    for chave in ('modo_avaliacao', 'lote', 'python', 'biblioteca', 'argumentos_servidor'): config.pop(chave, None)
+    config['executavel'] = os.path.splitext(os.path.basename(config.get('executavel', 'modelo')))[0] + '_replay'
+    config['backend'] = 'replay'
+    config['replay'] = {'trace': os.path.abspath(args.trace), 'modo': args.modo, 'vizinhos': args.vizinhos,
+                        'latencia': args.latencia}
+    with open(args.saida, 'w', encoding='utf-8') as f: json.dump(config, f, indent=4, ensure_ascii=False)
+    print(f"{len(avaliacoes)} avaliações no trace. Config de replay salva em {args.saida}")
@@ -0,0 +1,139 @@
+import threading
+import numpy as np
+
+# ==============================================================================
+# TRIAGEM POR MODELO SUBSTITUTO (SURROGATE RBF)
+# Com --triagem, toda avaliação (real ou do cache) alimenta um interpolador RBF
+# (thin plate spline + termo linear, coordenadas normalizadas pelos limites).
+# Ele prevê o valor de candidatos antes de gastar uma execução do .exe:
+#   - Pattern Search / Hooke-Jeeves: os vizinhos são ordenados pela previsão e
+#     só a fração mais promissora vai ao .exe; o resto fica adiado e só roda se
+#     nenhum dos promissores melhorar (a convergência continua exata).
+#   - Simplex: um ponto previsto bem pior que os vértices recentes recebe a
+#     previsão em vez de rodar (o Nelder-Mead o rejeitaria de qualquer jeito).
+# O relatório mostra quantas execuções a triagem poupou e o erro das previsões.
+# ==============================================================================
+JANELA_AJUSTE = 400  # Pontos mais recentes usados no ajuste (o RBF é O(n³))
+
+class TriagemSurrogate:
+    def __init__(self, espaco, fracao=0.5, minimo_pontos=None, margem=2.0):
+        self.espaco = espaco  # O EspacoBusca do Avaliador
+        self.fracao = min(1.0, max(0.0, fracao))
+        self.minimo_pontos = minimo_pontos or 2 * espaco.n + 1
+        self.margem = margem
+        self.pontos = {}  # chave dos argumentos -> (vetor, valor), na ordem de chegada
+        self.previsoes = 0
+        self.adiadas = 0
+        self.poupadas = 0
+        self.erros = []  # |previsto - real| dos pontos previstos que depois rodaram de verdade
+        self._previstos = {}
+        self._modelo = None
+        self._desatualizado = False
+        self._lock = threading.Lock()
+
+    # --- HISTÓRICO ---
+    def _chave(self, params):
+        chave = self.espaco.chave(params)
+        if chave is None: raise KeyError("combinação incompleta")
+        return chave
+
+    def _vetor(self, params):
+        return self.espaco.normalizar(self.espaco.codificar(params))
+
+    def registrar(self, params, valor):
+        """Chamado pelo Avaliador a cada resultado (falhas não entram no ajuste)"""
+        if valor is None: return
+        try: chave = self._chave(params)
+        except KeyError: return
+        with self._lock:
+            previsto = self._previstos.pop(chave, None)
+            if previsto is not None: self.erros.append(abs(previsto - valor))
+            self.pontos.pop(chave, None)
+            self.pontos[chave] = (self._vetor(params), float(valor))
+            self._desatualizado = True
+
+    def _ajustar(self):
+        if not self._desatualizado: return self._modelo
+        self._desatualizado = False
+        if len(self.pontos) < self.minimo_pontos:
+            self._modelo = None
+            return None
+        recentes = list(self.pontos.values())[-JANELA_AJUSTE:]
+        x = np.array([v for v, _ in recentes])
+        y = np.array([r for _, r in recentes])
+        from scipy.interpolate import RBFInterpolator  # Só com --triagem: o import do scipy custa ~1 s na partida
+        try:
+            self._modelo = RBFInterpolator(x, y, kernel='thin_plate_spline', degree=1, smoothing=1e-9)
+        except (np.linalg.LinAlgError, ValueError):
+            self._modelo = None  # Pontos degenerados (ex.: todos numa reta): segue sem triagem
+        return self._modelo
+
+    def prever(self, lista_params):
+        """Previsões para cada combinação, ou None enquanto não há histórico suficiente"""
+        with self._lock:
+            modelo = self._ajustar()
+            if modelo is None: return None
+            previsoes = modelo(self.espaco.normalizar(self.espaco.codificar_varios(lista_params)))
+            self.previsoes += len(lista_params)
+            for params, previsto in zip(lista_params, previsoes):
+                self._previstos[self._chave(params)] = float(previsto)
+            return previsoes
+
+    def erro_tipico(self):
+        if self.erros: return float(np.mean(self.erros[-50:]))
+        valores = [r for _, r in self.pontos.values()]
+        return float(np.std(valores)) if valores else 0.0
+
+    # --- USO PELAS ESTRATÉGIAS ---
+    def ordenar(self, candidatos, objetivo_escolhido):
+        """
+        Retorna (ordem, n_promissores): índices do mais ao menos promissor e quantos
+        vão direto ao .exe. Sem modelo ajustado, (None, None).
+        """
+        previsoes = self.prever(candidatos)
+        if previsoes is None: return None, None
+        ordem = list(np.argsort(-previsoes if objetivo_escolhido == 'maximizar' else previsoes, kind='stable'))
+        n_promissores = max(1, int(np.ceil(self.fracao * len(candidatos))))
+        return [int(i) for i in ordem], n_promissores
+
+    def pular(self, params, referencia, objetivo_escolhido):
+        """Simplex: devolve a previsão se o ponto é claramente pior que `referencia` (senão None)"""
+        if referencia is None: return None
+        previsoes = self.prever([params])
+        if previsoes is None: return None
+        previsto = float(previsoes[0])
+        folga = self.margem * self.erro_tipico()
+        ruim = previsto < referencia - folga if objetivo_escolhido == 'maximizar' else previsto > referencia + folga
+        if not ruim: return None
+        with self._lock:
+            self._previstos.pop(self._chave(params), None)  # Não vai rodar: não mede erro
+            self.poupadas += 1
+        return previsto
+
+    def contar_adiadas(self, adiadas, executadas):
+        with self._lock:
+            self.adiadas += adiadas
+            self.poupadas += adiadas - executadas
+
+    def resumo(self):
+        return f"{self.poupadas} execuções poupadas ({self.adiadas} adiadas, {self.previsoes} previsões)"
+
+    def texto_relatorio(self):
+        erro = f"{np.mean(self.erros):.6g} (média de {len(self.erros)} conferências)" if self.erros else '-'
+        return '\n'.join([
+            f"Triagem (Surrogate RBF) : {self.resumo()}",
+            f"Erro da Previsão        : {erro}",
+        ])
+
+def abrir_triagem(args, avaliador):
+    """Liga o substituto (--triagem) no Avaliador, sobre o espaço de busca já compilado nele"""
+    if getattr(args, 'triagem', False):
+        avaliador.triagem = TriagemSurrogate(avaliador.espaco, args.triagem_fracao, args.triagem_minimo)
+
+def adicionar_argumentos_triagem(parser):
+    parser.add_argument('--triagem', action='store_true',
+                        help="Modelo substituto (RBF) escolhe quais candidatos vão ao .exe")
+    parser.add_argument('--triagem-fracao', type=float, default=0.5,
+                        help="Fração dos vizinhos (os mais promissores) avaliada antes dos adiados")
+    parser.add_argument('--triagem-minimo', type=int, default=None,
+                        help="Avaliações antes de confiar no substituto (padrão: 2N+1)")
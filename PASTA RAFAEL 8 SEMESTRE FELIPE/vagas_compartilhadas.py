@@ -0,0 +1,187 @@
+import asyncio
+import os
+import socket
+import threading
+from collections import deque
+
+# ==============================================================================
+# VAGAS DE AVALIAÇÃO COMPARTILHADAS ENTRE PROCESSOS (usadas pelo servico.py)
+# O serviço abre um servidor TCP local com N vagas. Cada execução do modelo,
+# em qualquer trabalho, segura uma vaga enquanto roda:
+#   cliente: conecta, manda "VAGA <trabalho>\n", espera "OK\n", roda o modelo
+#            e fecha a conexão (fechar = devolver a vaga; um processo que
+#            morre devolve as dele sozinho)
+#   serviço: vaga livre vai para o trabalho com MENOS vagas em uso entre os que
+#            estão esperando (empate: o que recebeu vaga há mais tempo). Um
+#            trabalho curto ganha a sua parte na hora, sem esperar atrás de um
+#            de várias horas que pede vagas sem parar.
+# Os processos dos trabalhos recebem o endereço por variável de ambiente; sem
+# ela (execução normal pela linha de comando), nada muda.
+# ==============================================================================
+VARIAVEL_ENDERECO = 'OTIMIZADOR_VAGAS'      # "host:porta" do servidor de vagas
+VARIAVEL_TRABALHO = 'OTIMIZADOR_TRABALHO'   # id do trabalho dono das vagas
+
+def _endereco():
+    texto = os.environ.get(VARIAVEL_ENDERECO)
+    if not texto: return None
+    host, _, porta = texto.rpartition(':')
+    return host or '127.0.0.1', int(porta)
+
+class _VagaSincrona:
+    """with vaga: ... (backends que rodam no próprio processo ou no servidor persistente)"""
+    def __init__(self, endereco, trabalho):
+        self.endereco = endereco
+        self.trabalho = trabalho
+        self.conexao = None
+
+    def __enter__(self):
+        try:
+            self.conexao = socket.create_connection(self.endereco)
+            self.conexao.sendall(f"VAGA {self.trabalho}\n".encode())
+            if self.conexao.makefile('rb').readline() != b'OK\n': raise OSError("resposta inválida")
+        except OSError:
+            self.__exit__()  # Serviço fora do ar: avalia sem vaga em vez de travar o trabalho
+        return self
+
+    def __exit__(self, *_):
+        if self.conexao is not None:
+            try: self.conexao.close()
+            except OSError: pass
+            self.conexao = None
+
+class ClienteVagas:
+    def __init__(self, endereco, trabalho):
+        self.endereco = endereco
+        self.trabalho = trabalho
+
+    def vaga(self):
+        return _VagaSincrona(self.endereco, self.trabalho)
+
+    async def pedir_async(self):
+        """Espera uma vaga no event loop do executor. Retorna o writer (fechar = devolver) ou None"""
+        try:
+            reader, writer = await asyncio.open_connection(*self.endereco)
+        except OSError:
+            return None
+        try:
+            writer.write(f"VAGA {self.trabalho}\n".encode())
+            await writer.drain()
+            if await reader.readline() == b'OK\n': return writer
+        except OSError:
+            pass
+        except asyncio.CancelledError:
+            writer.close()
+            raise
+        writer.close()
+        return None
+
+def cliente_vagas():
+    """Cliente das vagas do serviço, ou None quando o processo não foi lançado pelo servico.py"""
+    endereco = _endereco()
+    if endereco is None: return None
+    return ClienteVagas(endereco, os.environ.get(VARIAVEL_TRABALHO, str(os.getpid())))
+
+# --- LADO DO SERVIÇO ---
+class EscalonadorVagas:
+    """Partilha justa das vagas entre trabalhos (só mexido pelo event loop do servidor)"""
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self.em_uso = {}       # trabalho -> vagas ocupadas agora
+        self.concedidas = {}   # trabalho -> vagas concedidas no total (= execuções do modelo)
+        self._filas = {}       # trabalho -> deque de futures esperando
+        self._ultima = {}      # trabalho -> ordem da última concessão
+        self._relogio = 0
+
+    def livres(self):
+        return self.capacidade - sum(self.em_uso.values())
+
+    def esperando(self, trabalho=None):
+        if trabalho is not None: return len(self._filas.get(trabalho, ()))
+        return sum(len(f) for f in self._filas.values())
+
+    def pedir(self, trabalho):
+        futuro = asyncio.get_running_loop().create_future()
+        self._filas.setdefault(trabalho, deque()).append(futuro)
+        self._distribuir()
+        return futuro
+
+    def desistir(self, trabalho, futuro):
+        fila = self._filas.get(trabalho)
+        if fila is not None and futuro in fila: fila.remove(futuro)
+
+    def liberar(self, trabalho):
+        self.em_uso[trabalho] -= 1
+        self._distribuir()
+
+    def _distribuir(self):
+        while self.livres() > 0:
+            candidatos = [t for t, fila in self._filas.items() if fila]
+            if not candidatos: return
+            trabalho = min(candidatos, key=lambda t: (self.em_uso.get(t, 0), self._ultima.get(t, -1)))
+            futuro = self._filas[trabalho].popleft()
+            if futuro.done(): continue
+            self.em_uso[trabalho] = self.em_uso.get(trabalho, 0) + 1
+            self.concedidas[trabalho] = self.concedidas.get(trabalho, 0) + 1
+            self._relogio += 1
+            self._ultima[trabalho] = self._relogio
+            futuro.set_result(True)
+
+class ServidorVagas:
+    """Servidor TCP das vagas, num event loop em thread de fundo (o HTTP do serviço fica na principal)"""
+    def __init__(self, capacidade, host='127.0.0.1', porta=0):
+        self.escalonador = EscalonadorVagas(capacidade)
+        self.host = host
+        self.porta = porta
+        self._loop = asyncio.new_event_loop()
+        pronto = threading.Event()
+        def rodar_loop():
+            asyncio.set_event_loop(self._loop)
+            servidor = self._loop.run_until_complete(asyncio.start_server(self._atender, host, porta))
+            self.porta = servidor.sockets[0].getsockname()[1]
+            pronto.set()
+            self._loop.run_forever()
+        self._thread = threading.Thread(target=rodar_loop, name='servidor-vagas', daemon=True)
+        self._thread.start()
+        pronto.wait()
+
+    @property
+    def endereco(self):
+        return f"{self.host}:{self.porta}"
+
+    async def _atender(self, reader, writer):
+        try:
+            partes = (await reader.readline()).decode(errors='replace').split()
+            if len(partes) != 2 or partes[0] != 'VAGA': return
+            trabalho = partes[1]
+            futuro = self.escalonador.pedir(trabalho)
+            fim = asyncio.ensure_future(reader.read())  # EOF = o cliente desistiu ou terminou
+            await asyncio.wait({futuro, fim}, return_when=asyncio.FIRST_COMPLETED)
+            if not futuro.done():
+                futuro.cancel()
+                self.escalonador.desistir(trabalho, futuro)
+                return
+            try:
+                if not fim.done():
+                    writer.write(b'OK\n')
+                    await writer.drain()
+                    await fim  # A vaga fica com o cliente até ele fechar a conexão
+            except (OSError, ConnectionError):
+                pass
+            finally:
+                self.escalonador.liberar(trabalho)
+        finally:
+            writer.close()
+
+    def situacao(self):
+        """Cópia das contagens (chamada de outras threads)"""
+        async def copiar():
+            e = self.escalonador
+            trabalhos = set(e.em_uso) | set(e.concedidas) | set(e._filas)
+            return {'capacidade': e.capacidade, 'livres': e.livres(),
+                    'trabalhos': {t: {'em_uso': e.em_uso.get(t, 0), 'esperando': e.esperando(t),
+                                      'execucoes': e.concedidas.get(t, 0)} for t in trabalhos}}
+        return asyncio.run_coroutine_threadsafe(copiar(), self._loop).result(timeout=10)
+
+    def fechar(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)